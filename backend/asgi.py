@@ -0,0 +1,26 @@
+import os
+
+from src.asgi import create_asgi_app
+
+# Listagens GET de veículos, clientes e vendas e o stream de eventos em asyncio: `python asgi.py`
+# ou `uvicorn asgi:app --workers N` dentro de backend/. O resto da API
+# continua no app WSGI (wsgi.py); o proxy separa pelas rotas.
+app = create_asgi_app()
+
+if __name__ == '__main__':
+    import uvicorn
+
+    # Um processo por núcleo: dentro dele o event loop atende as conexões.
+    nucleos = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    host, _, porta = os.getenv('ASGI_BIND', '0.0.0.0:8001').rpartition(':')
+    workers        = int(os.getenv('ASGI_WORKERS') or nucleos)
+
+    # Os workers importam o app de novo e herdam o ambiente: com mais de um,
+    # o cache padrão é um que todos enxerguem (ver _cache_padrao).
+    os.environ['WEB_PROCESSOS'] = str(workers)
+    uvicorn.run(
+        'asgi:app',
+        host    = host,
+        port    = int(porta),
+        workers = workers,
+    )
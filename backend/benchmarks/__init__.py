@@ -0,0 +1,4 @@
+"""Suíte de benchmarks HTTP da API, roda offline contra um SQLite temporário.
+
+Uso, dentro de `backend/`:  python -m benchmarks --volume 1k
+"""
@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from datetime import datetime, timezone
+
+VOLUMES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+PASTA   = os.path.dirname(__file__)
+PADRAO  = os.path.join(PASTA, 'baseline.json')
+
+
+def argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks HTTP da API.')
+    parser.add_argument('--volume',       default='1k', help='linhas por tabela: 1k, 100k, 1m ou um número')
+    parser.add_argument('--modo',         default='ambos', choices=('processo', 'socket', 'ambos'))
+    parser.add_argument('--requisicoes',  type=int,   default=200, help='requisições medidas por cenário')
+    parser.add_argument('--aquecimento',  type=int,   default=20,  help='requisições descartadas antes de medir')
+    parser.add_argument('--concorrencia', type=int,   default=8,   help='clientes simultâneos no modo socket')
+    parser.add_argument('--cenarios',     default='',  help='nomes separados por vírgula (padrão: todos)')
+    parser.add_argument('--cache',        default='desligado', help='CACHE_BACKEND durante a medição')
+    parser.add_argument('--saida',        default=os.path.join(PASTA, 'resultados.json'))
+    parser.add_argument('--base',         default=PADRAO, help='resultados de referência para comparar')
+    parser.add_argument('--gravar-base',  action='store_true', help='grava os resultados como nova base')
+    parser.add_argument('--limite',       type=float, default=0.20, help='regressão tolerada (fração)')
+    parser.add_argument('--folga-ms',     type=float, default=0.5,  help='diferença mínima de p95 em ms')
+    parser.add_argument('--manter-banco', action='store_true', help='não apaga o banco temporário no fim')
+    parser.add_argument('--capturar-sql', default='', help='grava os comandos SQL medidos e mostra o relatório de índices')
+    return parser.parse_args()
+
+
+def main() -> int:
+    args   = argumentos()
+    volume = VOLUMES.get(args.volume.lower()) or int(args.volume)
+
+    # Logs e .env são lidos no import e no create_app: o ambiente tem que estar pronto antes.
+    pasta = tempfile.mkdtemp(prefix='benchmark-')
+    os.environ['DB_PERFIL']     = 'desenvolvimento'
+    os.environ['DB_URL']        = f"sqlite:///{os.path.join(pasta, 'benchmark.db')}"
+    os.environ['LOG_DIR']       = os.path.join(pasta, 'logs')
+    os.environ['CACHE_BACKEND'] = args.cache
+    os.environ.setdefault('AUTH_OBRIGATORIA', '0')
+
+    from src                  import create_app, db
+    from src.database         import CapturaSQL, relatorio_indices
+    from benchmarks.seed      import popular
+    from benchmarks.cenarios  import montar_cenarios, rotas_sem_cenario
+    from benchmarks.medicao   import iniciar_servidor, medir_processo, medir_socket, comparar
+
+    app = create_app()
+
+    print(f'Banco temporário em {pasta}; populando {volume} linhas por tabela...', flush=True)
+    inicio = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+        totais = popular(volume)
+    print(f'Carga inicial em {time.perf_counter() - inicio:.1f}s: {totais}', flush=True)
+
+    cenarios = montar_cenarios(volume)
+    for rota in rotas_sem_cenario(app, cenarios):
+        print(f'AVISO: rota sem cenário de benchmark: {rota}', file=sys.stderr)
+
+    if args.cenarios:
+        nomes    = set(args.cenarios.split(','))
+        cenarios = [cenario for cenario in cenarios if cenario.nome in nomes]
+
+    modos    = ('processo', 'socket') if args.modo == 'ambos' else (args.modo,)
+    servidor = None
+    porta    = None
+    if 'socket' in modos:
+        servidor, porta = iniciar_servidor(app)
+
+    captura = None
+    if args.capturar_sql:
+        with app.app_context():
+            captura = CapturaSQL().iniciar(db.engine)
+
+    resultados = {}
+    total      = args.aquecimento + args.requisicoes
+    try:
+        for modo in modos:
+            for cenario in cenarios:
+                if cenario.preparar:
+                    with app.app_context():
+                        cenario.preparar(total)
+
+                if modo == 'processo':
+                    medir_processo(app, cenario, args.aquecimento)
+                    resultado = medir_processo(app, cenario, args.requisicoes, inicio=args.aquecimento)
+                else:
+                    medir_socket(porta, cenario, args.aquecimento, args.concorrencia)
+                    resultado = medir_socket(porta, cenario, args.requisicoes, args.concorrencia, inicio=args.aquecimento)
+
+                chave = f'{modo} {cenario.metodo} {cenario.rota} [{cenario.nome}]'
+                resultados[chave] = resultado
+                print(
+                    f"{chave:<75} {resultado['req_s']:>9.1f} req/s  p50 {resultado['p50_ms']:>8.3f}  "
+                    f"p95 {resultado['p95_ms']:>8.3f}  p99 {resultado['p99_ms']:>8.3f} ms  erros {resultado['erros']}",
+                    flush=True
+                )
+
+        if captura:
+            captura.parar()
+            print(f'{captura.gravar(args.capturar_sql)} comandos SQL gravados em {args.capturar_sql}.')
+            with app.app_context():
+                indices = relatorio_indices(list(captura.comandos.values()))
+            print(f"Índices sem uso: {', '.join(indices['sem_uso']) or 'nenhum'}")
+            for item in indices['varreduras']:
+                print(f"Varredura completa: {item['tabela']} por {', '.join(item['colunas']) or '?'} ({item['execucoes']}x)")
+    finally:
+        if servidor:
+            servidor.shutdown()
+        if not args.manter_banco:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    relatorio = {
+        'meta': {
+            'data'         : datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'volume'       : volume,
+            'requisicoes'  : args.requisicoes,
+            'concorrencia' : args.concorrencia,
+            'cache'        : args.cache,
+            'python'       : platform.python_version(),
+            'sqlite'       : sqlite3.sqlite_version,
+            'plataforma'   : platform.platform(),
+        },
+        'resultados': resultados,
+    }
+
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f'Resultados gravados em {args.saida}.')
+
+    if args.gravar_base:
+        with open(args.base, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f'Base gravada em {args.base}.')
+        return 0
+
+    if not os.path.exists(args.base):
+        print(f'Sem base em {args.base}; nada para comparar (use --gravar-base).')
+        return 0
+
+    with open(args.base, encoding='utf-8') as arquivo:
+        base = json.load(arquivo)
+
+    if base['meta'].get('volume') != volume:
+        print(f"AVISO: a base foi gravada com volume {base['meta'].get('volume')}, não {volume}.", file=sys.stderr)
+
+    regressoes = comparar(resultados, base['resultados'], args.limite, args.folga_ms)
+    for regressao in regressoes:
+        print(f'REGRESSÃO: {regressao}', file=sys.stderr)
+
+    return 1 if regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
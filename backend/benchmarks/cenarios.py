@@ -0,0 +1,228 @@
+import itertools
+import json
+import random
+
+from datetime       import datetime, timedelta
+from src.services   import tokens, ACESSO, RENOVACAO
+from src.utils      import codificar_cursor
+from benchmarks.seed import SENHA
+
+# Offset dos registros criados durante o benchmark, para não colidir com a carga inicial.
+NOVOS       = 10_000_000
+LINHAS_BULK = 100
+IDS_LOTE    = 300
+
+
+class Cenario:
+    """Uma requisição repetida N vezes contra uma rota da API.
+
+    `caminho` e `corpo` podem ser valores fixos ou funções do número da
+    repetição, para as rotas que precisam de dados diferentes a cada chamada.
+    `preparar(n)` roda dentro do app_context antes da medição.
+    """
+
+    def __init__(
+        self,
+        nome     : str,
+        metodo   : str,
+        rota     : str,
+        caminho  = None,
+        corpo    = None,
+        tipo     : str   = 'application/json',
+        esperado : tuple = (200,),
+        headers  = None,
+        preparar = None
+    ):
+        self.nome     = nome
+        self.metodo   = metodo
+        self.rota     = rota
+        self.caminho  = caminho or rota
+        self.corpo    = corpo
+        self.tipo     = tipo
+        self.esperado = esperado
+        self.headers  = headers
+        self.preparar = preparar
+
+    def requisicao(self, i: int) -> tuple[str, str, bytes | None, dict]:
+        caminho = self.caminho(i) if callable(self.caminho) else self.caminho
+        corpo   = self.corpo(i)   if callable(self.corpo)   else self.corpo
+        headers = self.headers(i) if callable(self.headers) else dict(self.headers or {})
+
+        if corpo is not None and not isinstance(corpo, (bytes, str)):
+            corpo = json.dumps(corpo)
+        if isinstance(corpo, str):
+            corpo = corpo.encode()
+        if corpo is not None:
+            headers['Content-Type'] = self.tipo
+
+        return self.metodo, caminho, corpo, headers
+
+
+def montar_cenarios(volume: int, semente: int = 42) -> list[Cenario]:
+    """Cenários de todas as rotas de src/routes para uma base criada por seed.popular()."""
+    aleatorio = random.Random(semente)
+    vendas    = volume // 2
+    novos     = itertools.count(NOVOS)
+    estado    = {}
+
+    def qualquer(maximo: int) -> int:
+        return aleatorio.randint(1, max(maximo, 1))
+
+    # Usuários da metade de baixo nunca são excluídos, então servem para login.
+    def usuario_ativo() -> int:
+        return qualquer(volume // 2)
+
+    # Veículos livres são vendidos de baixo para cima e excluídos de cima para
+    # baixo; as vendas só usam clientes da metade de baixo, e os da metade de
+    # cima (sem vendas) são excluídos de cima para baixo. As reservas usam o
+    # meio da faixa livre, longe das vendas e das exclusões.
+    veiculo_a_vender   = itertools.count(vendas + 1)
+    veiculo_a_excluir  = itertools.count(volume, -1)
+    veiculo_a_reservar = itertools.count(vendas + (volume - vendas) // 2)
+    veiculo_a_liberar  = itertools.count(vendas + (volume - vendas) // 2)
+    cliente_a_excluir  = itertools.count(volume, -1)
+    usuario_a_excluir  = itertools.count(volume, -1)
+    venda_a_cancelar   = itertools.count(1)
+    venda_a_excluir    = itertools.count(vendas, -1)
+
+    def cliente(i: int) -> dict:
+        n = next(novos)
+        return {'nome': f'Cliente {n}', 'cpf': f'{n:011d}', 'telefone': '11999999999', 'status': 'Ativo'}
+
+    def veiculo(i: int) -> dict:
+        n = next(novos)
+        return {
+            'placa' : f'N{n:08d}', 'marca': 'Fiat', 'modelo': 'Uno', 'preco': 35000, 'ano': 2020,
+            'tipo'  : 'Carro', 'status': 'Disponivel'
+        }
+
+    def ids_lote(i: int) -> list[int]:
+        return aleatorio.sample(range(1, volume + 1), min(IDS_LOTE, volume))
+
+    def ndjson(gerar) -> callable:
+        return lambda i: '\n'.join(json.dumps(gerar(i)) for _ in range(LINHAS_BULK))
+
+    # Cursor de quem sincronizou há um minuto: só o que os cenários
+    # anteriores escreveram volta na resposta.
+    def cursor_recente(n: int) -> None:
+        agora = datetime.utcnow()
+        estado['desde'] = codificar_cursor((agora - timedelta(minutes=1)).isoformat(), 0, 0, agora.isoformat())
+
+    def emitir_tokens(tipo: str):
+        def preparar(n: int) -> None:
+            estado[tipo] = [tokens.emitir(tipo, {'sub': usuario_ativo()})[0] for _ in range(n)]
+        return preparar
+
+    return [
+        Cenario('listar_veiculos',        'GET',    '/api/veiculos', '/api/veiculos?limit=50'),
+        Cenario('buscar_veiculos',        'GET',    '/api/veiculos', '/api/veiculos?busca=toyota&limit=50'),
+        Cenario('busca_facetada',         'GET',    '/api/veiculos/busca',
+                '/api/veiculos/busca?status=Disponivel&preco_min=40000&preco_max=90000&limit=50'),
+        Cenario('listar_veiculos_campos', 'GET',    '/api/veiculos', '/api/veiculos?limit=50&fields=id,placa,modelo,preco'),
+        Cenario('obter_veiculo',          'GET',    '/api/veiculos/<int:id>',
+                lambda i: f'/api/veiculos/{qualquer(volume)}', esperado=(200, 404)),
+        Cenario('sincronizar_veiculos',   'GET',    '/api/veiculos/changes', '/api/veiculos/changes?limit=500'),
+        Cenario('criar_veiculo',          'POST',   '/api/veiculos', corpo=veiculo, esperado=(201,)),
+        Cenario('importar_veiculos',      'POST',   '/api/veiculos/bulk',
+                corpo=ndjson(veiculo), tipo='application/x-ndjson'),
+        Cenario('alterar_veiculos_lote',  'PATCH',  '/api/veiculos',
+                corpo=lambda i: {'ids': ids_lote(i), 'alteracoes': {'cor': 'Prata'}}),
+        Cenario('reprecificar_marca',     'PATCH',  '/api/veiculos',
+                corpo={'filtro': {'marca': 'Fiat', 'status': 'Disponivel'}, 'alteracoes': {'preco': {'multiplicar': 1}}}),
+        Cenario('atualizar_veiculo',      'PUT',    '/api/veiculos/<int:id>',
+                lambda i: f'/api/veiculos/{qualquer(volume)}', {'cor': 'Azul'}, esperado=(200, 404)),
+        Cenario('excluir_veiculo',        'DELETE', '/api/veiculos/<int:id>',
+                lambda i: f'/api/veiculos/{next(veiculo_a_excluir)}', esperado=(200, 404)),
+        Cenario('reservar_veiculo',       'POST',   '/api/veiculos/<int:id>/reserva',
+                lambda i: f'/api/veiculos/{next(veiculo_a_reservar)}/reserva',
+                lambda i: {'cliente': qualquer(volume // 2), 'minutos': 30}, esperado=(201, 404, 409)),
+        Cenario('obter_reserva',          'GET',    '/api/veiculos/<int:id>/reserva',
+                lambda i: f'/api/veiculos/{qualquer(volume)}/reserva', esperado=(200, 404)),
+        Cenario('liberar_reserva',        'DELETE', '/api/veiculos/<int:id>/reserva',
+                lambda i: f'/api/veiculos/{next(veiculo_a_liberar)}/reserva', esperado=(200, 404, 409)),
+
+        Cenario('listar_clientes',        'GET',    '/api/clientes', '/api/clientes?limit=50'),
+        Cenario('buscar_clientes',        'GET',    '/api/clientes', '/api/clientes?busca=maria&limit=50'),
+        Cenario('obter_cliente',          'GET',    '/api/clientes/<int:id>',
+                lambda i: f'/api/clientes/{qualquer(volume)}?fields=nome,cpf', esperado=(200, 404)),
+        Cenario('criar_cliente',          'POST',   '/api/clientes', corpo=cliente, esperado=(201,)),
+        Cenario('importar_clientes',      'POST',   '/api/clientes/bulk',
+                corpo=ndjson(cliente), tipo='application/x-ndjson'),
+        Cenario('alterar_clientes_lote',  'PATCH',  '/api/clientes',
+                corpo=lambda i: {'ids': ids_lote(i), 'alteracoes': {'status': 'Ativo'}}),
+        Cenario('atualizar_cliente',      'PUT',    '/api/clientes/<int:id>',
+                lambda i: f'/api/clientes/{qualquer(volume)}', {'telefone': '11988887777'}, esperado=(200, 404)),
+        Cenario('excluir_cliente',        'DELETE', '/api/clientes/<int:id>',
+                lambda i: f'/api/clientes/{next(cliente_a_excluir)}', esperado=(200, 404)),
+        Cenario('lancar_saldo',           'POST',   '/api/clientes/<int:id>/saldo',
+                lambda i: f'/api/clientes/{qualquer(vendas)}/saldo',
+                lambda i: {'tipo': 'Credito' if i % 3 else 'Debito', 'valor': 100}, esperado=(201, 409)),
+        Cenario('consultar_saldo',        'GET',    '/api/clientes/<int:id>/saldo',
+                lambda i: f'/api/clientes/{qualquer(vendas)}/saldo?data=2026-01-31'),
+        Cenario('extrato_saldo',          'GET',    '/api/clientes/<int:id>/movimentos',
+                lambda i: f'/api/clientes/{qualquer(vendas)}/movimentos?limit=50'),
+        Cenario('sincronizar_clientes',   'GET',    '/api/clientes/changes',
+                lambda i: f"/api/clientes/changes?since={estado['desde']}", preparar=cursor_recente),
+
+        Cenario('listar_usuarios',        'GET',    '/api/usuarios', '/api/usuarios?limit=50'),
+        Cenario('obter_usuario',          'GET',    '/api/usuarios/<int:id>',
+                lambda i: f'/api/usuarios/{qualquer(volume)}', esperado=(200, 404)),
+        Cenario('criar_usuario',          'POST',   '/api/usuarios', corpo=lambda i: {
+                    'nome': 'Usuário', 'email': f'novo{next(novos)}@exemplo.com', 'senha': SENHA,
+                    'tipo': 'Vendedor', 'status': 'Ativo'
+                }, esperado=(201,)),
+        Cenario('atualizar_usuario',      'PUT',    '/api/usuarios/<int:id>',
+                lambda i: f'/api/usuarios/{qualquer(volume)}', {'nome': 'Usuário Alterado'}, esperado=(200, 404)),
+        Cenario('excluir_usuario',        'DELETE', '/api/usuarios/<int:id>',
+                lambda i: f'/api/usuarios/{next(usuario_a_excluir)}', esperado=(200, 404)),
+        Cenario('sincronizar_usuarios',   'GET',    '/api/usuarios/changes',
+                lambda i: f"/api/usuarios/changes?since={estado['desde']}", preparar=cursor_recente),
+
+        Cenario('listar_vendas',          'GET',    '/api/vendas', '/api/vendas?limit=50'),
+        Cenario('filtrar_vendas',         'GET',    '/api/vendas', '/api/vendas?status=Concluida&limit=50'),
+        Cenario('obter_venda',            'GET',    '/api/vendas/<int:id>',
+                lambda i: f'/api/vendas/{qualquer(vendas)}', esperado=(200, 404)),
+        Cenario('relatorio_vendas',       'GET',    '/api/vendas/relatorios',
+                '/api/vendas/relatorios?agrupar=mes,marca'),
+        Cenario('criar_venda',            'POST',   '/api/vendas', corpo=lambda i: {
+                    'veiculo': next(veiculo_a_vender), 'cliente': qualquer(vendas)
+                }, esperado=(201, 404, 409)),
+        Cenario('atualizar_venda',        'PUT',    '/api/vendas/<int:id>',
+                lambda i: f'/api/vendas/{qualquer(vendas)}', {'valor': 50000}, esperado=(200, 404)),
+        Cenario('cancelar_venda',         'POST',   '/api/vendas/<int:id>/cancelar',
+                lambda i: f'/api/vendas/{next(venda_a_cancelar)}/cancelar', esperado=(200, 404, 409)),
+        Cenario('excluir_venda',          'DELETE', '/api/vendas/<int:id>',
+                lambda i: f'/api/vendas/{next(venda_a_excluir)}', esperado=(200, 404)),
+        Cenario('sincronizar_vendas',     'GET',    '/api/vendas/changes',
+                lambda i: f"/api/vendas/changes?since={estado['desde']}", preparar=cursor_recente),
+
+        Cenario('login',                  'POST',   '/api/login',
+                corpo=lambda i: {'email': f'usuario{usuario_ativo()}@exemplo.com', 'senha': SENHA}),
+        Cenario('renovar_token',          'POST',   '/api/login/refresh',
+                corpo=lambda i: {'refresh_token': estado[RENOVACAO][i]}, preparar=emitir_tokens(RENOVACAO)),
+        Cenario('logout',                 'POST',   '/api/logout',
+                headers=lambda i: {'Authorization': f'Bearer {estado[ACESSO][i]}'}, preparar=emitir_tokens(ACESSO)),
+
+        Cenario('estatisticas_cache',     'GET',    '/api/cache'),
+        Cenario('estatisticas_banco',     'GET',    '/api/banco/pool'),
+        Cenario('exportar_metricas',      'GET',    '/api/metrics'),
+    ]
+
+
+# Streams que não terminam não têm latência por requisição para medir.
+ROTAS_CONTINUAS = {('GET', '/api/eventos')}
+
+
+def rotas_sem_cenario(app, cenarios: list[Cenario]) -> list[str]:
+    """Rotas /api registradas no app que nenhum cenário exercita."""
+    cobertas = {(cenario.metodo, cenario.rota) for cenario in cenarios} | ROTAS_CONTINUAS
+    faltando = []
+
+    for regra in app.url_map.iter_rules():
+        if not regra.rule.startswith('/api'):
+            continue
+        for metodo in sorted(regra.methods - {'HEAD', 'OPTIONS'}):
+            if (metodo, regra.rule) not in cobertas:
+                faltando.append(f'{metodo} {regra.rule}')
+
+    return faltando
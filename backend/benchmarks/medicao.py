@@ -0,0 +1,131 @@
+import http.client
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving   import make_server, WSGIRequestHandler
+
+
+class ManterConexao(WSGIRequestHandler):
+    # HTTP/1.1 para os clientes reaproveitarem a conexão entre requisições.
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs) -> None:
+        pass
+
+
+def iniciar_servidor(app) -> tuple:
+    """Sobe o app em uma porta livre de 127.0.0.1, numa thread; retorna (servidor, porta)."""
+    servidor = make_server('127.0.0.1', 0, app, threaded=True, request_handler=ManterConexao)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, servidor.server_port
+
+
+def medir_processo(app, cenario, repeticoes: int, inicio: int = 0) -> dict:
+    """Chama a rota pelo test_client, em série: mede o custo do handler sem rede."""
+    cliente    = app.test_client()
+    latencias  = []
+    erros      = 0
+    comeco     = time.perf_counter()
+
+    for i in range(inicio, inicio + repeticoes):
+        metodo, caminho, corpo, headers = cenario.requisicao(i)
+
+        antes    = time.perf_counter()
+        resposta = cliente.open(caminho, method=metodo, data=corpo, headers=headers)
+        resposta.get_data()
+        latencias.append(time.perf_counter() - antes)
+
+        if resposta.status_code not in cenario.esperado:
+            erros += 1
+
+    return resumir(latencias, erros, time.perf_counter() - comeco)
+
+
+def medir_socket(porta: int, cenario, repeticoes: int, concorrencia: int, inicio: int = 0) -> dict:
+    """Chama a rota por HTTP em 127.0.0.1 com `concorrencia` clientes simultâneos."""
+    locais    = threading.local()
+    trava     = threading.Lock()
+    latencias = []
+    erros     = [0]
+
+    def chamar(i: int) -> None:
+        conexao = getattr(locais, 'conexao', None)
+        if conexao is None:
+            conexao = locais.conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=60)
+
+        metodo, caminho, corpo, headers = cenario.requisicao(i)
+
+        antes = time.perf_counter()
+        try:
+            conexao.request(metodo, caminho, body=corpo, headers=headers)
+            resposta = conexao.getresponse()
+            resposta.read()
+            status = resposta.status
+        except (http.client.HTTPException, OSError):
+            conexao.close()
+            locais.conexao = None
+            status = None
+        duracao = time.perf_counter() - antes
+
+        with trava:
+            latencias.append(duracao)
+            if status not in cenario.esperado:
+                erros[0] += 1
+
+    comeco = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(chamar, range(inicio, inicio + repeticoes)))
+
+    return resumir(latencias, erros[0], time.perf_counter() - comeco)
+
+
+def resumir(latencias: list, erros: int, duracao: float) -> dict:
+    ordenadas = sorted(latencias)
+    return {
+        'requisicoes' : len(ordenadas),
+        'erros'       : erros,
+        'req_s'       : round(len(ordenadas) / duracao, 2) if duracao else 0.0,
+        'media_ms'    : round(sum(ordenadas) / len(ordenadas) * 1000, 3) if ordenadas else 0.0,
+        'p50_ms'      : percentil(ordenadas, 50),
+        'p95_ms'      : percentil(ordenadas, 95),
+        'p99_ms'      : percentil(ordenadas, 99),
+    }
+
+
+def percentil(ordenadas: list, p: float) -> float:
+    """Percentil por interpolação linear, em ms, de uma lista já ordenada (em segundos)."""
+    if not ordenadas:
+        return 0.0
+
+    posicao = (len(ordenadas) - 1) * p / 100
+    baixo   = int(posicao)
+    alto    = min(baixo + 1, len(ordenadas) - 1)
+    valor   = ordenadas[baixo] + (ordenadas[alto] - ordenadas[baixo]) * (posicao - baixo)
+    return round(valor * 1000, 3)
+
+
+def comparar(resultados: dict, base: dict, limite: float, folga_ms: float) -> list[str]:
+    """Lista as regressões contra a base: p95 acima ou vazão abaixo de `limite` (fração).
+
+    Diferenças de p95 menores que `folga_ms` são ignoradas, para rotas de
+    fração de milissegundo não falharem por ruído.
+    """
+    regressoes = []
+
+    for chave, atual in resultados.items():
+        anterior = base.get(chave)
+        if not anterior:
+            continue
+
+        p95_base, p95 = anterior['p95_ms'], atual['p95_ms']
+        if p95 > p95_base * (1 + limite) and p95 - p95_base > folga_ms:
+            regressoes.append(f'{chave}: p95 {p95_base} -> {p95} ms')
+
+        if anterior['req_s'] and atual['req_s'] < anterior['req_s'] * (1 - limite):
+            regressoes.append(f"{chave}: vazão {anterior['req_s']} -> {atual['req_s']} req/s")
+
+        if atual['erros'] > anterior['erros']:
+            regressoes.append(f"{chave}: erros {anterior['erros']} -> {atual['erros']}")
+
+    return regressoes
@@ -0,0 +1,89 @@
+import random
+
+from datetime    import date, timedelta
+from decimal     import Decimal
+from flask       import current_app
+from sqlalchemy  import insert
+from werkzeug.security import generate_password_hash
+
+from src         import db
+from src.models  import Clientes, Veiculos, Vendas, Usuarios, indice_clientes, indice_veiculos
+from src.services import ResumoVendasService
+from src.enums   import (
+    ClienteStatusEnum, VeiculoStatusEnum, VeiculoTipoEnum, VendaStatusEnum, UsuariosTipoEnum, UsuariosStatusEnum
+)
+
+LOTE   = 10_000
+SENHA  = 'benchmark'
+MARCAS = ['Fiat', 'Volkswagen', 'Chevrolet', 'Ford', 'Toyota', 'Honda', 'Hyundai', 'Renault', 'Jeep', 'Nissan']
+NOMES  = ['Ana', 'João', 'Maria', 'José', 'Luíza', 'Carlos', 'Fernanda', 'Paulo', 'Mariana', 'Lucas']
+CORES  = ['Preto', 'Branco', 'Prata', 'Vermelho', 'Azul', 'Cinza']
+
+
+def popular(volume: int, semente: int = 42) -> dict:
+    """Cria `volume` clientes, veículos e usuários e `volume // 2` vendas.
+
+    As vendas usam os veículos 1..volume/2 (que ficam Vendido) e clientes da
+    mesma metade; a outra metade fica livre para os cenários que vendem ou
+    excluem registros.
+    """
+    aleatorio  = random.Random(semente)
+    hash_senha = generate_password_hash(SENHA, method=current_app.config['SENHA_METODO'])
+    vendas     = volume // 2
+    hoje       = date.today()
+    marcas     = {}
+
+    _inserir(Clientes, volume, lambda i: {
+        'CLI_NOME'     : f'{aleatorio.choice(NOMES)} Cliente {i}',
+        'CLI_CPF'      : f'{i:011d}',
+        'CLI_TELEFONE' : f'119{i:08d}',
+        'CLI_EMAIL'    : f'cliente{i}@exemplo.com',
+        'CLI_CIDADE'   : 'São Paulo',
+        'CLI_UF'       : 'SP',
+        'CLI_SALDO'    : Decimal('0.00'),
+        'CLI_STATUS'   : ClienteStatusEnum.Ativo,
+    })
+
+    _inserir(Veiculos, volume, lambda i: {
+        'VEI_PLACA'  : f'BEN{i:07d}',
+        'VEI_MARCA'  : marcas.setdefault(i, aleatorio.choice(MARCAS)),
+        'VEI_MODELO' : f'Modelo {i % 200}',
+        'VEI_PRECO'  : Decimal(aleatorio.randint(20_000, 300_000)),
+        'VEI_ANO'    : aleatorio.randint(2000, 2026),
+        'VEI_KM'     : Decimal(aleatorio.randint(0, 200_000)),
+        'VEI_COR'    : aleatorio.choice(CORES),
+        'VEI_TIPO'   : VeiculoTipoEnum.Carro,
+        'VEI_STATUS' : VeiculoStatusEnum.Vendido if i <= vendas else VeiculoStatusEnum.Disponivel,
+    })
+
+    _inserir(Usuarios, volume, lambda i: {
+        'USU_NOME'   : f'Usuário {i}',
+        'USU_EMAIL'  : f'usuario{i}@exemplo.com',
+        'USU_SENHA'  : hash_senha,
+        'USU_TIPO'   : UsuariosTipoEnum.Vendedor,
+        'USU_STATUS' : UsuariosStatusEnum.Ativo,
+    })
+
+    _inserir(Vendas, vendas, lambda i: {
+        'VEI_CODIGO' : i,
+        'CLI_CODIGO' : aleatorio.randint(1, max(vendas, 1)),
+        'USU_CODIGO' : aleatorio.randint(1, min(vendas, 20) or 1),
+        'VEN_DATA'   : hoje - timedelta(days=aleatorio.randint(0, 730)),
+        'VEN_VALOR'  : Decimal(aleatorio.randint(20_000, 300_000)),
+        'VEN_STATUS' : VendaStatusEnum.Concluida,
+        'VEN_MARCA'  : marcas[i],
+        'VEN_TIPO'   : VeiculoTipoEnum.Carro.name,
+    })
+
+    indice_clientes.reconstruir()
+    indice_veiculos.reconstruir()
+    ResumoVendasService().reconstruir()
+
+    return {'clientes': volume, 'veiculos': volume, 'usuarios': volume, 'vendas': vendas}
+
+
+def _inserir(modelo, total: int, linha) -> None:
+    for inicio in range(1, total + 1, LOTE):
+        fim = min(inicio + LOTE, total + 1)
+        db.session.execute(insert(modelo), [linha(i) for i in range(inicio, fim)])
+        db.session.commit()
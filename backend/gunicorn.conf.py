@@ -0,0 +1,70 @@
+import gc
+import os
+import shutil
+import tempfile
+
+# Configuração do gunicorn para produção: `gunicorn -c gunicorn.conf.py`
+# dentro de backend/. WEB_BIND, WEB_WORKERS, WEB_THREADS e WEB_TIMEOUT
+# sobrescrevem os valores abaixo.
+
+
+def _nucleos() -> int:
+    # Respeita a afinidade de CPU (contêiner, taskset), não o total da máquina.
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+NUCLEOS = _nucleos()
+
+wsgi_app = 'wsgi:app'
+bind     = os.getenv('WEB_BIND', '0.0.0.0:8000')
+
+# Um processo por núcleo para o trabalho de CPU (JSON, hash de senha) e
+# threads em cada um para sobrepor as esperas de banco e cache. Cada thread
+# segura uma conexão: mantenha WEB_THREADS <= DB_POOL_SIZE.
+worker_class = 'gthread'
+workers      = int(os.getenv('WEB_WORKERS') or NUCLEOS)
+threads      = int(os.getenv('WEB_THREADS') or 4)
+
+# Cada worker tem a sua memória: o app usa WEB_PROCESSOS para escolher um
+# cache que todos enxerguem, e /api/metrics soma os workers pelos arquivos
+# de METRICAS_DIR.
+os.environ['WEB_PROCESSOS'] = str(workers)
+os.environ.setdefault('METRICAS_DIR', os.path.join(tempfile.gettempdir(), f'metricas-gunicorn-{os.getuid()}'))
+
+# O app é importado uma vez no master e os workers nascem por fork, dividindo
+# as páginas de memória (código, índices) por copy-on-write.
+preload_app = True
+
+# Reinício gracioso: no HUP ou ao reciclar um worker, as requisições em
+# andamento têm graceful_timeout segundos para terminar. Reciclar depois de
+# max_requests (com jitter, para não reiniciar todos juntos) limita o
+# crescimento de memória de cada processo.
+timeout             = int(os.getenv('WEB_TIMEOUT', 60))
+graceful_timeout    = 30
+keepalive           = 5
+max_requests        = 5000
+max_requests_jitter = 500
+
+
+def on_starting(server) -> None:
+    # Métricas de uma execução anterior saem; no USR2 (GUNICORN_PID definido)
+    # o diretório é dividido com os workers do processo antigo e fica.
+    if 'GUNICORN_PID' not in os.environ:
+        shutil.rmtree(os.environ['METRICAS_DIR'], ignore_errors=True)
+
+
+def pre_fork(server, worker) -> None:
+    # Tira os objetos do master da coleta de lixo: sem isso, a primeira coleta
+    # em cada worker escreve em todas as páginas e desfaz o compartilhamento.
+    gc.freeze()
+
+
+def post_fork(server, worker) -> None:
+    # Conexões abertas pelo master não podem ser usadas por dois processos: o
+    # worker descarta as herdadas, sem fechá-las, e abre as suas.
+    from src import db
+
+    with worker.app.wsgi().app_context():
+        db.engine.dispose(close=False)
@@ -1,7 +1,6 @@
-from src import app, db
+from src import create_app
 
-if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
+app = create_app()
 
+if __name__ == '__main__':
     app.run(debug=True)
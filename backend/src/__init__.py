@@ -3,18 +3,107 @@ import os
 from dotenv import load_dotenv
 from flask import Flask
 from flask_cors import CORS
-from src.database import db
+from src.database   import db, configurar_banco, preparar_engine
+from src.utils      import cache, metricas, registrar_requisicoes, ProvedorJson, canal_eventos
+from src.routes     import BLUEPRINTS
+from src.services   import agendador_reservas
+from src.commands   import comandos
+from src.decorators import autenticar_requisicao
 
-app = Flask(__name__)
 
-load_dotenv()
+def create_app(config: dict = None) -> Flask:
+    """Monta o app com a configuração do ambiente (.env), sobrescrita por `config`.
 
-# app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///teste.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    Não cria nem altera o schema: isso é o `flask migrar`, rodado uma vez por
+    deploy, e não a cada processo que sobe.
+    """
+    app      = Flask(__name__)
+    app.json = ProvedorJson(app)
 
-db.init_app(app)
+    load_dotenv()
 
-CORS(app)
+    app.config.update(_config_ambiente())
+    app.config.update(config or {})
 
-from src.routes import route_customers, route_sales, route_users, route_vehicles
+    configurar_banco(app)
+    _chave_assinatura(app)
+
+    db.init_app(app)
+    preparar_engine(app)
+    cache.init_app(app)
+    canal_eventos.init_app(app)
+    agendador_reservas.init_app(app)
+    registrar_requisicoes(app)
+    metricas.init_app(app)
+
+    CORS(app)
+
+    for blueprint in (*BLUEPRINTS, comandos):
+        app.register_blueprint(blueprint)
+
+    app.before_request(autenticar_requisicao)
+
+    return app
+
+
+def _chave_assinatura(app: Flask) -> None:
+    """Os tokens valem em qualquer processo só se todos assinam com a mesma
+    SECRET_KEY (workers, o app ASGI, o processo depois de um restart). Só os
+    perfis de desenvolvimento e teste sobem sem ela, com uma chave aleatória.
+    """
+    if app.config.get('SECRET_KEY'):
+        return
+
+    if app.config['DB_PERFIL'] not in ('desenvolvimento', 'teste'):
+        raise ValueError(f"O perfil {app.config['DB_PERFIL']} exige SECRET_KEY.")
+
+    app.config['SECRET_KEY'] = os.urandom(32).hex()
+
+
+def _cache_padrao() -> str:
+    # O cache em memória é de cada processo e só vê as escritas dele: com
+    # vários workers (WEB_PROCESSOS, definido pelo gunicorn.conf.py e pelo
+    # asgi.py) um worker serviria listagens antigas até o TTL. Nesse caso o
+    # padrão é o cache compartilhado, se houver servidor, ou nenhum.
+    if os.getenv('CACHE_URL'):
+        return 'compartilhado'
+    if int(os.getenv('WEB_PROCESSOS') or 1) > 1:
+        return 'desligado'
+    return 'memoria'
+
+
+def _config_ambiente() -> dict:
+    return {
+        'SQLALCHEMY_TRACK_MODIFICATIONS' : False,
+
+        'SECRET_KEY'           : os.getenv('SECRET_KEY'),
+        'AUTH_OBRIGATORIA'     : os.getenv('AUTH_OBRIGATORIA', '0') == '1',
+        'TOKEN_ACESSO_MINUTOS' : int(os.getenv('TOKEN_ACESSO_MINUTOS', 15)),
+        'TOKEN_RENOVACAO_DIAS' : int(os.getenv('TOKEN_RENOVACAO_DIAS', 7)),
+        'REVOGACAO_SINCRONIA'  : float(os.getenv('REVOGACAO_SINCRONIA', 10)),
+        'SENHA_METODO'         : os.getenv('SENHA_METODO', 'scrypt:32768:8:1'),
+        'SENHA_WORKERS'        : int(os.getenv('SENHA_WORKERS', 2)),
+
+        'LOG_ACESSO' : os.getenv('LOG_ACESSO', '1') == '1',
+
+        'CACHE_BACKEND' : os.getenv('CACHE_BACKEND') or _cache_padrao(),
+        'CACHE_URL'     : os.getenv('CACHE_URL'),
+        'CACHE_TAMANHO' : int(os.getenv('CACHE_TAMANHO', 1024)),
+        'CACHE_TTL'     : float(os.getenv('CACHE_TTL', 30)),
+
+        'SINCRONIA_MARGEM'        : float(os.getenv('SINCRONIA_MARGEM', 30)),
+        'SINCRONIA_RETENCAO_DIAS' : int(os.getenv('SINCRONIA_RETENCAO_DIAS', 30)),
+
+        'EVENTOS_BACKEND'        : os.getenv('EVENTOS_BACKEND', 'memoria'),
+        'EVENTOS_URL'            : os.getenv('EVENTOS_URL'),
+        'EVENTOS_RETENCAO_HORAS' : int(os.getenv('EVENTOS_RETENCAO_HORAS', 24)),
+        'EVENTOS_SONDAGEM'       : float(os.getenv('EVENTOS_SONDAGEM', 2)),
+        'EVENTOS_MARGEM'         : float(os.getenv('EVENTOS_MARGEM', 5)),
+
+        'RESERVAS_MINUTOS'        : int(os.getenv('RESERVAS_MINUTOS', 30)),
+        'RESERVAS_MINUTOS_MAXIMO' : int(os.getenv('RESERVAS_MINUTOS_MAXIMO', 1440)),
+        'RESERVAS_AGENDADOR'      : os.getenv('RESERVAS_AGENDADOR', '1') == '1',
+        'RESERVAS_SINCRONIA'      : float(os.getenv('RESERVAS_SINCRONIA', 60)),
+
+        'VENDAS_MESES_QUENTES' : int(os.getenv('VENDAS_MESES_QUENTES', 12)),
+    }
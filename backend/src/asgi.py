@@ -0,0 +1,254 @@
+import asyncio
+import time
+import uuid
+
+from contextlib                import asynccontextmanager
+from functools                 import partial
+from flask                     import Flask
+from sqlalchemy.ext.asyncio    import async_sessionmaker
+from starlette.applications    import Starlette
+from starlette.middleware      import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests        import Request
+from starlette.responses       import Response, StreamingResponse
+from starlette.routing         import Route
+from src                       import create_app, db
+from src.database              import criar_engine_assincrono
+from src.services              import VeiculosService, ClientesService, VendasService, EventosService, Entrega, tokens, TokenInvalido, ACESSO
+from src.utils                 import log_info, log_error, ler_paginacao, ler_campos, corpo_listagem, LOTE_STREAM, canal_eventos
+from src.utils.streaming       import TIPO_NDJSON, TIPO_SSE, CABECALHOS_SSE
+
+
+class LeituraAssincrona:
+    """Listagens de leitura intensa servidas por asyncio.
+
+    Cada requisição é uma task do event loop: enquanto uma espera o banco, o
+    worker atende as outras, sem uma thread (e sua pilha) por conexão. As
+    consultas são as dos services, sem cópia: o código síncrono roda numa
+    greenlet do SQLAlchemy (AsyncSession.run_sync), com `db.session`
+    apontando para a sessão da requisição, e cada espera de I/O do driver
+    devolve o controle ao event loop.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self.app     = app
+        self.engine  = criar_engine_assincrono(app)
+        self.sessoes = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def ciclo(self, asgi):
+        yield
+        await self.engine.dispose()
+
+    async def executar(self, token: str | None, funcao, *args, autenticar: bool = True):
+        async with self.sessoes() as sessao:
+            return await sessao.run_sync(self._no_contexto, token if autenticar else False, funcao, args)
+
+    def _no_contexto(self, sessao, token: str | None, funcao, args):
+        # O app context é por task (contextvars), então cada requisição tem
+        # o seu registro em db.session; o teardown do app context fecha a sessão.
+        # token False: já autenticado no início do stream.
+        with self.app.app_context():
+            db.session.registry.set(sessao)
+            if token is not False:
+                self._autenticar(token)
+            return funcao(*args)
+
+    def _autenticar(self, token: str | None) -> None:
+        """Mesma regra do autenticar_requisicao do app WSGI."""
+        if not token:
+            if self.app.config.get('AUTH_OBRIGATORIA'):
+                raise TokenInvalido('Token de acesso ausente.')
+            return
+        tokens.validar(ACESSO, token)
+
+    async def listar_veiculos(self, requisicao: Request) -> Response:
+        service = VeiculosService()
+        termo   = requisicao.query_params.get('busca', '')
+        return await self._listar(requisicao, 'listar_veiculos', 'Erro ao listar veículos.', service.listar_veiculos, termo)
+
+    async def listar_clientes(self, requisicao: Request) -> Response:
+        service = ClientesService()
+        termo   = requisicao.query_params.get('busca', '')
+        return await self._listar(requisicao, 'listar_clientes', 'Erro ao listar clientes.', service.listar_clientes, termo)
+
+    async def listar_vendas(self, requisicao: Request) -> Response:
+        service = VendasService()
+        filtros = dict(requisicao.query_params)
+        return await self._listar(requisicao, 'listar_vendas', 'Erro ao listar vendas.', service.listar_vendas, filtros)
+
+    async def _listar(self, requisicao: Request, origem: str, mensagem: str, listar, filtro) -> Response:
+        inicio = time.perf_counter()
+        token  = self._token(requisicao)
+        try:
+            campos = ler_campos(requisicao.query_params, listar.__self__.LISTAGEM)
+            if self._quer_stream(requisicao):
+                resposta = await self._stream(token, origem, listar, filtro, campos)
+            else:
+                limite, apos, paginado = ler_paginacao(requisicao.query_params)
+                pagina   = await self.executar(token, listar, filtro, limite, apos, campos)
+                resposta = self._json(corpo_listagem(pagina, paginado), 200)
+
+        except TokenInvalido as erro:
+            resposta = self._json({'error': str(erro)}, 401)
+
+        except ValueError as erro:
+            resposta = self._json({'error': str(erro)}, 400)
+
+        except Exception as erro:
+            log_error(origem, erro)
+            resposta = self._json({'error': mensagem}, 500)
+
+        return self._registrar(requisicao, resposta, inicio)
+
+    async def _stream(self, token: str | None, origem: str, listar, filtro, campos: tuple | None) -> Response:
+        """NDJSON lido em páginas de LOTE_STREAM, cada uma numa sessão curta.
+
+        A primeira página é lida antes de responder, para que token e filtros
+        inválidos ainda virem 401/400. As páginas não passam pelo cache.
+        """
+        listar = partial(listar.__wrapped__, listar.__self__)
+        pagina = await self.executar(token, listar, filtro, LOTE_STREAM, None, campos)
+
+        async def gerar():
+            atual = pagina
+            while True:
+                if atual['dados']:
+                    yield ''.join(self.app.json.dumps(linha) + '\n' for linha in atual['dados'])
+                if not atual['next_cursor']:
+                    return
+                try:
+                    atual = await self.executar(token, listar, filtro, LOTE_STREAM, atual['next_cursor'], campos)
+                except Exception as erro:
+                    log_error(origem, erro)
+                    yield self.app.json.dumps({'error': 'Listagem interrompida.'}) + '\n'
+                    return
+
+        return StreamingResponse(gerar(), media_type=TIPO_NDJSON)
+
+    async def eventos(self, requisicao: Request) -> Response:
+        """`GET /api/eventos`: a mesma sequência do EventosService.transmitir, sem thread por conexão."""
+        inicio    = time.perf_counter()
+        token     = self._token(requisicao, na_url=True)
+        service   = EventosService()
+        assinante = None
+        try:
+            entidades, status = service.ler_filtros(requisicao.query_params)
+            desde     = service.ler_ultimo(requisicao.headers.get('Last-Event-ID') or requisicao.query_params.get('last_event_id'))
+            assinante = canal_eventos.assinar(entidades, status, asyncio.get_running_loop())
+            entrega, recarregar = await self.executar(token, service.inicio, desde)
+
+        except TokenInvalido as erro:
+            resposta = self._json({'error': str(erro)}, 401)
+
+        except ValueError as erro:
+            resposta = self._json({'error': str(erro)}, 400)
+
+        except Exception as erro:
+            log_error('transmitir_eventos', erro)
+            resposta = self._json({'error': 'Erro ao abrir o stream de eventos.'}, 500)
+
+        else:
+            mensagens = self._transmitir(service, assinante, entrega, recarregar)
+            resposta  = StreamingResponse(mensagens, media_type=TIPO_SSE, headers=CABECALHOS_SSE)
+
+        if assinante is not None and not isinstance(resposta, StreamingResponse):
+            canal_eventos.cancelar(assinante)
+        return self._registrar(requisicao, resposta, inicio)
+
+    async def _transmitir(self, service: EventosService, assinante, entrega: Entrega, recarregar: bool):
+        """A espera fica no event loop; o banco só é lido para recuperar eventos, cada vez numa sessão curta."""
+        dumps = self.app.json.dumps
+
+        async def ler() -> str:
+            saida = []
+            desde = entrega.corte
+            while True:
+                eventos, mais = await self.executar(
+                    None, service.recuperar, desde, assinante.entidades, assinante.status, autenticar=False
+                )
+                saida += entrega.lidos(eventos, dumps)
+                if not mais:
+                    return ''.join(saida)
+                desde = eventos[-1]['id']
+
+        try:
+            inicial = service.recarregar(entrega.corte) if recarregar else await ler()
+            if inicial:
+                yield inicial
+
+            enviado = leitura = time.monotonic()
+            while True:
+                await assinante.aguardar(service.espera(enviado, leitura))
+                eventos, perdeu = assinante.retirar()
+                saida           = ''.join(entrega.recebidos(eventos, dumps))
+
+                if perdeu or service.ler_agora(leitura):
+                    saida  += await ler()
+                    leitura = time.monotonic()
+
+                if saida or time.monotonic() - enviado >= service.INTERVALO_PING:
+                    yield saida or service.PING
+                    enviado = time.monotonic()
+
+        except Exception as erro:
+            # O status já foi enviado; o EventSource reconecta com o Last-Event-ID.
+            log_error('transmitir_eventos', erro)
+
+        finally:
+            canal_eventos.cancelar(assinante)
+
+    def _json(self, corpo, status: int) -> Response:
+        # O provider JSON do app Flask: mesma serialização das rotas WSGI.
+        return Response(self.app.json.dumps(corpo), status_code=status, media_type='application/json')
+
+    def _registrar(self, requisicao: Request, resposta: Response, inicio: float) -> Response:
+        request_id = requisicao.headers.get('X-Request-ID') or uuid.uuid4().hex
+        resposta.headers['X-Request-ID'] = request_id
+
+        if self.app.config.get('LOG_ACESSO', True):
+            log_info(
+                'acesso', '%s %s %s', requisicao.method, requisicao.url.path, resposta.status_code,
+                request_id  = request_id,
+                metodo      = requisicao.method,
+                rota        = requisicao.url.path,
+                status      = resposta.status_code,
+                latencia_ms = round((time.perf_counter() - inicio) * 1000, 3)
+            )
+        return resposta
+
+    @staticmethod
+    def _token(requisicao: Request, na_url: bool = False) -> str | None:
+        cabecalho = requisicao.headers.get('Authorization', '')
+        if cabecalho.startswith('Bearer '):
+            return cabecalho[7:].strip() or None
+        if na_url:
+            return requisicao.query_params.get('token') or None
+        return None
+
+    @staticmethod
+    def _quer_stream(requisicao: Request) -> bool:
+        if requisicao.query_params.get('stream', '').lower() in ('1', 'true', 'sim'):
+            return True
+        return requisicao.headers.get('Accept', '').split(',')[0].strip() == TIPO_NDJSON
+
+
+def create_asgi_app(config: dict = None) -> Starlette:
+    """App ASGI com as listagens GET de veículos, clientes e vendas e o stream de eventos.
+
+    Roda ao lado do app WSGI, sobre o mesmo banco: o proxy manda os GET
+    dessas rotas para cá e todo o resto para o gunicorn/waitress. Conexões
+    SSE ficam abertas por horas; aqui não ocupam uma thread do gunicorn.
+    """
+    leitura = LeituraAssincrona(create_app(config))
+
+    return Starlette(
+        routes     = [
+            Route('/api/veiculos', leitura.listar_veiculos, methods=['GET']),
+            Route('/api/clientes', leitura.listar_clientes, methods=['GET']),
+            Route('/api/vendas',   leitura.listar_vendas,   methods=['GET']),
+            Route('/api/eventos',  leitura.eventos,         methods=['GET']),
+        ],
+        middleware = [Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+        lifespan   = leitura.ciclo,
+    )
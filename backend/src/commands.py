@@ -0,0 +1,115 @@
+import click
+import json
+
+from flask        import Blueprint
+from src.database import CapturaSQL, migrar as aplicar_migracoes, relatorio_indices as gerar_relatorio_indices
+from src.models   import indice_clientes, indice_veiculos
+from src.services import ResumoVendasService, SaldosService, SincroniaService, EventosService, ReservasService, ArquivoVendasService
+from src.utils    import para_data
+
+# Os comandos ficam num blueprint para o create_app registrá-los; cli_group=None
+# os deixa no nível de cima (`flask migrar`, não `flask comandos migrar`).
+comandos = Blueprint('comandos', __name__, cli_group=None)
+
+
+@comandos.cli.command('migrar')
+def migrar() -> None:
+    """Aplica as migrações de schema pendentes (cria o banco se estiver vazio)."""
+    feitas = aplicar_migracoes()
+    for versao, descricao in feitas:
+        click.echo(f'{versao:04d}: {descricao}')
+    click.echo(f'{len(feitas)} migrações aplicadas.')
+
+
+@comandos.cli.command('reindexar-busca')
+def reindexar_busca() -> None:
+    """Reconstrói os índices de busca de clientes e veículos."""
+    for nome, indice in (('clientes', indice_clientes), ('veiculos', indice_veiculos)):
+        total = indice.reconstruir()
+        click.echo(f'{nome}: {total} registros indexados.')
+
+
+@comandos.cli.command('reconstruir-resumo-vendas')
+def reconstruir_resumo_vendas() -> None:
+    """Recalcula RESUMO_VENDAS a partir de todas as vendas."""
+    total = ResumoVendasService().reconstruir()
+    click.echo(f'resumo de vendas: {total} linhas.')
+
+
+@comandos.cli.command('fechar-saldos')
+@click.option('--ate', default=None, help='Dia a fechar (AAAA-MM-DD); padrão: ontem (UTC).')
+def fechar_saldos(ate: str) -> None:
+    """Grava o fechamento diário dos saldos dos clientes (rodar uma vez por dia)."""
+    try:
+        total = SaldosService().fechar(para_data(ate) if ate else None)
+    except ValueError as erro:
+        raise click.ClickException(str(erro))
+    click.echo(f'saldos fechados: {total} clientes.')
+
+
+@comandos.cli.command('arquivar-vendas')
+@click.option('--antes-de', 'antes', default=None, help='Arquiva as vendas anteriores a este dia (AAAA-MM-DD); padrão: VENDAS_MESES_QUENTES.')
+def arquivar_vendas(antes: str) -> None:
+    """Move as vendas de meses fechados para VENDAS_ARQUIVO (rodar uma vez por mês)."""
+    try:
+        total = ArquivoVendasService().arquivar(para_data(antes) if antes else None)
+    except ValueError as erro:
+        raise click.ClickException(str(erro))
+    click.echo(f'vendas arquivadas: {total}.')
+
+
+@comandos.cli.command('limpar-exclusoes')
+def limpar_exclusoes() -> None:
+    """Apaga as lápides de exclusão mais antigas que SINCRONIA_RETENCAO_DIAS."""
+    total = SincroniaService().limpar()
+    click.echo(f'lápides apagadas: {total}.')
+
+
+@comandos.cli.command('limpar-eventos')
+def limpar_eventos() -> None:
+    """Apaga os eventos de alteração mais antigos que EVENTOS_RETENCAO_HORAS."""
+    total = EventosService().limpar()
+    click.echo(f'eventos apagados: {total}.')
+
+
+@comandos.cli.command('liberar-reservas')
+def liberar_reservas() -> None:
+    """Libera as reservas de veículos já vencidas (para rodar com RESERVAS_AGENDADOR=0)."""
+    total = ReservasService().expirar_vencidas()
+    click.echo(f'reservas liberadas: {total}.')
+
+
+@comandos.cli.command('relatorio-indices')
+@click.argument('captura', type=click.Path(exists=True, dir_okay=False))
+@click.option('--json', 'como_json', is_flag=True, help='Imprime o relatório em JSON.')
+def relatorio_indices(captura: str, como_json: bool) -> None:
+    """EXPLAIN dos comandos capturados (SQL_CAPTURA): índices sem uso e faltando."""
+    relatorio = gerar_relatorio_indices(CapturaSQL.ler(captura))
+
+    if como_json:
+        click.echo(json.dumps(relatorio, ensure_ascii=False, indent=2))
+        return
+
+    click.echo(f"{relatorio['comandos']} comandos analisados.\n")
+
+    click.echo('Índices (execuções que usaram):')
+    for indice in relatorio['indices']:
+        marcas = ''.join((' único' if indice['unico'] else '', ' parcial' if indice['parcial'] else ''))
+        click.echo(f"  {indice['usos']:>10}  {indice['nome']} ({', '.join(indice['colunas'])}){marcas}")
+
+    click.echo('\nSem uso (cada escrita na tabela ainda paga por eles):')
+    escritas = relatorio['escritas']
+    for indice in (indice for indice in relatorio['indices'] if indice['nome'] in relatorio['sem_uso']):
+        click.echo(f"  {indice['nome']} - {escritas.get(indice['tabela'], 0)} escritas em {indice['tabela']}")
+
+    click.echo('\nVarreduras completas com WHERE (possíveis índices faltando):')
+    for item in relatorio['varreduras']:
+        click.echo(f"  {item['execucoes']:>10}  {item['tabela']} por {', '.join(item['colunas']) or '?'}")
+        click.echo(f"              {' '.join(item['sql'].split())[:160]}")
+
+    click.echo('\nOrdenações em árvore temporária:')
+    for item in relatorio['ordenacoes']:
+        click.echo(f"  {item['execucoes']:>10}  {' '.join(item['sql'].split())[:160]}")
+
+    for erro in relatorio['erros']:
+        click.echo(f"\nERRO no EXPLAIN: {erro['error']}\n  {' '.join(erro['sql'].split())[:160]}", err=True)
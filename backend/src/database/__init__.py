@@ -1 +1,6 @@
-from .db_manager import db
\ No newline at end of file
+from .db_manager   import db
+from .search_index import IndiceBusca, somente_alfanumericos
+from .facet_index  import IndiceFacetas
+from .config       import configurar_banco, preparar_engine, estatisticas_pool, criar_engine_assincrono
+from .query_plan   import CapturaSQL, relatorio_indices
+from .migrations   import migrar
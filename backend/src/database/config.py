@@ -0,0 +1,238 @@
+import atexit
+import os
+import threading
+import time
+
+from sqlalchemy      import event, make_url
+from sqlalchemy.pool import QueuePool, StaticPool, AsyncAdaptedQueuePool
+from sqlalchemy.exc  import TimeoutError as PoolTimeoutError
+from src.database.db_manager import db
+from src.database.query_plan import CapturaSQL
+
+# Perfis de banco. Qualquer valor pode ser sobrescrito por variável de
+# ambiente (DB_URL/SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, SQLITE_MMAP_MB...).
+PERFIS = {
+    'desenvolvimento': {
+        'url'             : 'sqlite:///teste.db',
+        'pool_size'       : 5,
+        'max_overflow'    : 10,
+        'pool_timeout'    : 30,
+        'pool_recycle'    : -1,
+        'pool_pre_ping'   : False,
+    },
+    'producao': {
+        'url'             : None,
+        'pool_size'       : 10,
+        'max_overflow'    : 20,
+        'pool_timeout'    : 10,
+        'pool_recycle'    : 1800,
+        'pool_pre_ping'   : True,
+    },
+    'teste': {
+        'url'             : 'sqlite://',
+        'pool_size'       : 1,
+        'max_overflow'    : 0,
+        'pool_timeout'    : 5,
+        'pool_recycle'    : -1,
+        'pool_pre_ping'   : False,
+    },
+}
+
+# Driver asyncio equivalente ao de cada URL síncrona (DB_URL_ASYNC sobrescreve).
+DRIVERS_ASSINCRONOS = {
+    'sqlite'              : 'sqlite+aiosqlite',
+    'sqlite+pysqlite'     : 'sqlite+aiosqlite',
+    'postgresql'          : 'postgresql+asyncpg',
+    'postgresql+psycopg2' : 'postgresql+asyncpg',
+    'postgresql+psycopg'  : 'postgresql+psycopg',
+}
+
+PRAGMAS_SQLITE = {
+    'busy_timeout_ms' : 5000,
+    'synchronous'     : 'NORMAL',
+    'cache_size_kb'   : 64 * 1024,
+    'mmap_mb'         : 256,
+}
+
+
+def _env(nome: str, padrao, tipo=str):
+    valor = os.getenv(nome)
+    if valor is None or valor == '':
+        return padrao
+    if tipo is bool:
+        return valor.lower() in ('1', 'true', 'sim')
+    return tipo(valor)
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que mede o tempo de espera por uma conexão livre."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.estatisticas = EstatisticasPool()
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super().connect()
+        except PoolTimeoutError:
+            self.estatisticas.registrar_timeout()
+            raise
+        self.estatisticas.registrar_espera(time.perf_counter() - inicio)
+        return conexao
+
+    def recreate(self):
+        novo = super().recreate()
+        novo.estatisticas = self.estatisticas
+        return novo
+
+
+class EstatisticasPool:
+    def __init__(self) -> None:
+        self._trava        = threading.Lock()
+        self.checkouts     = 0
+        self.timeouts      = 0
+        self.espera_total  = 0.0
+        self.espera_maxima = 0.0
+        self.conexoes      = 0
+
+    def registrar_espera(self, segundos: float) -> None:
+        with self._trava:
+            self.checkouts    += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+
+    def registrar_timeout(self) -> None:
+        with self._trava:
+            self.timeouts += 1
+
+    def registrar_conexao(self, *args) -> None:
+        with self._trava:
+            self.conexoes += 1
+
+
+def configurar_banco(app) -> None:
+    """Monta SQLALCHEMY_DATABASE_URI e SQLALCHEMY_ENGINE_OPTIONS a partir do perfil.
+
+    Valores já presentes em app.config (passados ao create_app) têm
+    precedência sobre as variáveis de ambiente.
+    """
+    nome_perfil = app.config.get('DB_PERFIL') or _env('DB_PERFIL', 'desenvolvimento')
+    if nome_perfil not in PERFIS:
+        raise ValueError(f'Perfil de banco desconhecido: {nome_perfil}.')
+
+    perfil = PERFIS[nome_perfil]
+    url    = (
+        app.config.get('SQLALCHEMY_DATABASE_URI')
+        or _env('DB_URL', None) or _env('SQLALCHEMY_DATABASE_URI', None) or perfil['url']
+    )
+
+    if not url:
+        raise ValueError(f'O perfil {nome_perfil} exige DB_URL.')
+
+    app.config['DB_PERFIL']               = nome_perfil
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', _opcoes_engine(url, perfil))
+
+
+def _opcoes_engine(url: str, perfil: dict) -> dict:
+    if url.startswith('sqlite') and url in ('sqlite://', 'sqlite:///:memory:'):
+        # Banco em memória: uma única conexão compartilhada, senão cada
+        # conexão enxergaria um banco vazio diferente.
+        return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+
+    opcoes = {
+        'poolclass'     : PoolMedido,
+        'pool_size'     : _env('DB_POOL_SIZE',     perfil['pool_size'],     int),
+        'max_overflow'  : _env('DB_MAX_OVERFLOW',  perfil['max_overflow'],  int),
+        'pool_timeout'  : _env('DB_POOL_TIMEOUT',  perfil['pool_timeout'],  float),
+        'pool_recycle'  : _env('DB_POOL_RECYCLE',  perfil['pool_recycle'],  int),
+        'pool_pre_ping' : _env('DB_POOL_PRE_PING', perfil['pool_pre_ping'], bool),
+    }
+
+    if url.startswith('sqlite'):
+        busy_ms = _env('SQLITE_BUSY_TIMEOUT_MS', PRAGMAS_SQLITE['busy_timeout_ms'], int)
+        opcoes['connect_args'] = {'timeout': busy_ms / 1000, 'check_same_thread': False}
+
+    return opcoes
+
+
+def preparar_engine(app) -> None:
+    """Aplica os PRAGMAs do SQLite em cada conexão nova e liga as estatísticas do pool."""
+    with app.app_context():
+        engine = db.engine
+
+    pool = engine.pool
+    if isinstance(pool, PoolMedido):
+        event.listen(engine, 'connect', pool.estatisticas.registrar_conexao)
+
+    if engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:'):
+        event.listen(engine, 'connect', _aplicar_pragmas_sqlite)
+
+    # SQL_CAPTURA=arquivo.jsonl grava, na saída do processo, os comandos que
+    # ele executou, para o `flask relatorio-indices`.
+    captura = os.getenv('SQL_CAPTURA')
+    if captura:
+        atexit.register(CapturaSQL().iniciar(engine).gravar, captura)
+
+
+def criar_engine_assincrono(app):
+    """Engine asyncio para o mesmo banco do app, com o pool do perfil.
+
+    Usado pelo app ASGI de leitura; o driver sai de DRIVERS_ASSINCRONOS
+    (aiosqlite, asyncpg ou o modo assíncrono do psycopg 3).
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = _env('DB_URL_ASYNC', None)
+    if not url:
+        url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if url.drivername not in DRIVERS_ASSINCRONOS:
+            raise ValueError(f'Sem driver assíncrono para {url.drivername}; defina DB_URL_ASYNC.')
+        if url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:'):
+            raise ValueError('O banco em memória não é compartilhado com o engine assíncrono.')
+        url = url.set(drivername=DRIVERS_ASSINCRONOS[url.drivername])
+
+    opcoes = dict(app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    if opcoes.get('poolclass') is PoolMedido:
+        opcoes['poolclass'] = AsyncAdaptedQueuePool
+
+    engine = create_async_engine(url, **opcoes)
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine.sync_engine, 'connect', _aplicar_pragmas_sqlite)
+
+    return engine
+
+
+def _aplicar_pragmas_sqlite(conexao_dbapi, registro) -> None:
+    cursor = conexao_dbapi.cursor()
+    try:
+        cursor.execute('PRAGMA journal_mode = WAL')
+        cursor.execute(f"PRAGMA synchronous = {_env('SQLITE_SYNCHRONOUS', PRAGMAS_SQLITE['synchronous'])}")
+        cursor.execute(f"PRAGMA busy_timeout = {_env('SQLITE_BUSY_TIMEOUT_MS', PRAGMAS_SQLITE['busy_timeout_ms'], int)}")
+        cursor.execute(f"PRAGMA cache_size = -{_env('SQLITE_CACHE_SIZE_KB', PRAGMAS_SQLITE['cache_size_kb'], int)}")
+        cursor.execute(f"PRAGMA mmap_size = {_env('SQLITE_MMAP_MB', PRAGMAS_SQLITE['mmap_mb'], int) * 1024 * 1024}")
+        cursor.execute('PRAGMA temp_store = MEMORY')
+    finally:
+        cursor.close()
+
+
+def estatisticas_pool() -> dict:
+    pool  = db.engine.pool
+    dados = {'classe': type(pool).__name__, 'status': pool.status()}
+
+    if isinstance(pool, PoolMedido):
+        est = pool.estatisticas
+        dados.update({
+            'tamanho'           : pool.size(),
+            'em_uso'            : pool.checkedout(),
+            'ociosas'           : pool.checkedin(),
+            'overflow'          : pool.overflow(),
+            'conexoes_abertas'  : est.conexoes,
+            'checkouts'         : est.checkouts,
+            'timeouts'          : est.timeouts,
+            'espera_media_ms'   : round(est.espera_total / est.checkouts * 1000, 3) if est.checkouts else 0.0,
+            'espera_maxima_ms'  : round(est.espera_maxima * 1000, 3),
+        })
+
+    return dados
@@ -0,0 +1,444 @@
+import heapq
+import math
+import threading
+import time
+
+from array                   import array
+from bisect                  import bisect_left, bisect_right
+from datetime                import timedelta
+from sqlalchemy              import select, func, literal
+from src.database.db_manager import db
+
+
+class IndiceFacetas:
+    """Contagens por faceta de uma tabela, mantidas em bitmaps na memória do processo.
+
+    Cada valor de cada dimensão tem um bitmap (um int do Python) com um bit
+    ligado por registro, na posição da chave primária. Filtrar é fazer AND/OR
+    de bitmaps e contar é `int.bit_count()`, então a resposta não depende de
+    varrer a tabela: com 500 mil registros um bitmap tem ~62 KB e a busca
+    inteira custa algumas centenas de operações sobre eles.
+
+    `categorias` são dimensões de valores discretos (marca, status, ano...);
+    `faixas` são numéricas (preço, km), com os limites das faixas exibidas.
+    As categorias em `esparsas` têm muitos valores com poucos registros cada
+    (modelo): um bitmap por valor custaria valores × 62 KB. Cada valor guarda
+    a lista ordenada dos seus códigos, e as contagens percorrem os registros
+    da base uma vez, pela posição do valor em `_linha`; só os
+    MAXIMO_ESPARSAS valores mais frequentes são devolvidos.
+    Para filtros de intervalo arbitrário cada faixa numérica é dividida em
+    SUBFAIXAS internas com a lista ordenada de (valor, código): só as duas
+    subfaixas das pontas precisam ser conferidas valor a valor.
+
+    O índice é montado no primeiro uso e acompanha o banco pela coluna
+    `updated_at`: a cada consulta um `max(updated_at)` (indexado) diz se há
+    linhas novas ou alteradas, que são relidas e aplicadas. Exclusões feitas
+    no próprio processo chegam por `remover()`.
+
+    O updated_at é gravado antes do commit, então uma alteração que demora
+    mais que JANELA para ser confirmada fica atrás da marca e não é relida.
+    Para isso, e para as exclusões de outros processos, a cada SINCRONIA
+    segundos a contagem de linhas e a soma da coluna `versao` (que toda
+    alteração incrementa) são comparadas com as do índice; qualquer
+    diferença força uma remontagem.
+    """
+
+    SINCRONIA       = 30.0
+    JANELA          = timedelta(seconds=5)
+    SUBFAIXAS       = 128
+    LOTE            = 10_000
+    MAXIMO_ESPARSAS = 100
+
+    def __init__(self, modelo, categorias: dict, faixas: dict, versao=None, esparsas: tuple = ()) -> None:
+        self.modelo     = modelo
+        self.chave      = modelo.__mapper__.primary_key[0]
+        self.alterado   = modelo.__table__.c.updated_at
+        self.categorias = categorias
+        self.faixas     = faixas
+        self.esparsas   = frozenset(esparsas)
+        self.versao     = versao if versao is not None else literal(0)
+        self._trava     = threading.RLock()
+        self._pronto    = False
+
+    # ------------------------------------------------------------------ montagem
+
+    def reconstruir(self) -> int:
+        with self._trava:
+            linhas  = []
+            marca   = None
+
+            consulta = select(*self._colunas(), self.alterado).execution_options(yield_per=self.LOTE)
+            for lote in db.session.execute(consulta).partitions():
+                for linha in lote:
+                    linhas.append(tuple(linha[:-1]))
+                    if linha[-1] is not None and (marca is None or linha[-1] > marca):
+                        marca = linha[-1]
+
+            maior = max((linha[0] for linha in linhas), default=0)
+
+            self._valores  = {nome: [] for nome in self.categorias}
+            self._codigos  = {nome: {} for nome in self.categorias}
+            self._mapas    = {nome: [] for nome in self.categorias}
+            self._linha    = {nome: array('i', [-1]) * (maior + 1) for nome in self.categorias}
+            self._numeros  = {nome: array('d', [math.nan]) * (maior + 1) for nome in self.faixas}
+            self._versoes  = array('q', [0]) * (maior + 1)
+            self._limites  = {}
+            self._ordenado = {}
+            self._submapas = {}
+
+            posicoes = {nome: [] for nome in self.categorias}
+            for linha in linhas:
+                codigo = linha[0]
+                for indice, nome in enumerate(self.categorias, start=1):
+                    valor = self._normalizar(linha[indice])
+                    if valor is None:
+                        continue
+                    posicao = self._codigo_do_valor(nome, valor, posicoes)
+                    posicoes[nome][posicao].append(codigo)
+                    self._linha[nome][codigo] = posicao
+
+            for nome in self.categorias:
+                if nome in self.esparsas:
+                    self._mapas[nome] = [array('i', sorted(codigos)) for codigos in posicoes[nome]]
+                else:
+                    self._mapas[nome] = [_bitmap(codigos, maior) for codigos in posicoes[nome]]
+
+            inicio = 1 + len(self.categorias)
+            for deslocamento, nome in enumerate(self.faixas):
+                pares = sorted(
+                    (float(linha[inicio + deslocamento]), linha[0])
+                    for linha in linhas if linha[inicio + deslocamento] is not None
+                )
+                for valor, codigo in pares:
+                    self._numeros[nome][codigo] = valor
+                self._montar_subfaixas(nome, pares, maior)
+
+            for linha in linhas:
+                self._versoes[linha[0]] = linha[-1]
+
+            self._vivos     = _bitmap([linha[0] for linha in linhas], maior)
+            self._total     = len(linhas)
+            self._soma      = sum(linha[-1] for linha in linhas)
+            self._tamanho   = maior + 1
+            self._exibidas  = {}
+            self._marca     = marca
+            self._checado   = time.monotonic()
+            self._pronto    = True
+            return self._total
+
+    def _montar_subfaixas(self, nome: str, pares: list, maior: int) -> None:
+        _, exibidos = self.faixas[nome]
+        quantis     = [pares[i * len(pares) // self.SUBFAIXAS][0] for i in range(1, self.SUBFAIXAS)] if pares else []
+        limites     = sorted(set(exibidos) | set(quantis))
+
+        # Subfaixa i cobre [limites[i - 1], limites[i]); a 0 vai até o primeiro
+        # limite e a última não tem teto.
+        grupos = [[] for _ in range(len(limites) + 1)]
+        for valor, codigo in pares:
+            grupos[bisect_right(limites, valor)].append((valor, codigo))
+
+        self._limites[nome]  = limites
+        self._ordenado[nome] = grupos
+        self._submapas[nome] = [_bitmap([codigo for _, codigo in grupo], maior) for grupo in grupos]
+
+    def _codigo_do_valor(self, nome: str, valor, posicoes: dict = None) -> int:
+        codigos = self._codigos[nome]
+        if valor not in codigos:
+            codigos[valor] = len(self._valores[nome])
+            self._valores[nome].append(valor)
+            if posicoes is not None:
+                posicoes[nome].append([])
+            else:
+                self._mapas[nome].append(array('i') if nome in self.esparsas else 0)
+        return codigos[valor]
+
+    @staticmethod
+    def _normalizar(valor):
+        return getattr(valor, 'value', valor)
+
+    # ------------------------------------------------------------- manutenção
+
+    def sincronizar(self) -> None:
+        """Aplica as linhas alteradas desde a última leitura (ou monta o índice)."""
+        with self._trava:
+            if not self._pronto:
+                self.reconstruir()
+                return
+
+            agora = time.monotonic()
+            if agora - self._checado >= self.SINCRONIA:
+                self._checado = agora
+                total, soma = db.session.execute(
+                    select(func.count(), func.coalesce(func.sum(self.versao), 0)).select_from(self.modelo)
+                ).one()
+                if (total, soma) != (self._total, self._soma):
+                    self.reconstruir()
+                    return
+
+            marca = db.session.scalar(select(func.max(self.alterado)))
+            if marca is None or (self._marca is not None and marca <= self._marca):
+                return
+
+            consulta = select(*self._colunas())
+            if self._marca is not None:
+                # A janela cobre relógios um pouco diferentes entre processos.
+                consulta = consulta.where(self.alterado >= self._marca - self.JANELA)
+
+            for linha in db.session.execute(consulta):
+                self._aplicar(tuple(linha))
+            self._marca = marca
+
+    def _colunas(self) -> list:
+        return [self.chave, *self.categorias.values(), *(coluna for coluna, _ in self.faixas.values()), self.versao]
+
+    def remover(self, *codigos: int) -> None:
+        """Tira registros excluídos pelo próprio processo, depois do commit."""
+        with self._trava:
+            if not self._pronto:
+                return
+            for codigo in codigos:
+                if self._ligado(self._vivos, codigo):
+                    self._retirar(codigo)
+                    self._vivos ^= 1 << codigo
+                    self._total -= 1
+
+    def _aplicar(self, linha: tuple) -> None:
+        codigo = linha[0]
+        self._crescer(codigo)
+        self._exibidas.clear()
+
+        if self._ligado(self._vivos, codigo):
+            self._retirar(codigo)
+        else:
+            self._vivos |= 1 << codigo
+            self._total += 1
+
+        for indice, nome in enumerate(self.categorias, start=1):
+            valor = self._normalizar(linha[indice])
+            if valor is None:
+                continue
+            posicao = self._codigo_do_valor(nome, valor)
+            if nome in self.esparsas:
+                lista = self._mapas[nome][posicao]
+                lista.insert(bisect_left(lista, codigo), codigo)
+            else:
+                self._mapas[nome][posicao] |= 1 << codigo
+            self._linha[nome][codigo] = posicao
+
+        inicio = 1 + len(self.categorias)
+        for deslocamento, nome in enumerate(self.faixas):
+            valor = linha[inicio + deslocamento]
+            if valor is None:
+                continue
+            valor = float(valor)
+            sub   = bisect_right(self._limites[nome], valor)
+            grupo = self._ordenado[nome][sub]
+            grupo.insert(bisect_left(grupo, (valor, codigo)), (valor, codigo))
+            self._submapas[nome][sub] |= 1 << codigo
+            self._numeros[nome][codigo] = valor
+
+        self._versoes[codigo] = linha[-1]
+        self._soma           += linha[-1]
+
+    def _retirar(self, codigo: int) -> None:
+        self._exibidas.clear()
+        self._soma           -= self._versoes[codigo]
+        self._versoes[codigo] = 0
+        for nome in self.categorias:
+            posicao = self._linha[nome][codigo]
+            if posicao < 0:
+                continue
+            if nome in self.esparsas:
+                lista = self._mapas[nome][posicao]
+                del lista[bisect_left(lista, codigo)]
+            else:
+                self._mapas[nome][posicao] ^= 1 << codigo
+            self._linha[nome][codigo] = -1
+
+        for nome in self.faixas:
+            valor = self._numeros[nome][codigo]
+            if math.isnan(valor):
+                continue
+            sub   = bisect_right(self._limites[nome], valor)
+            grupo = self._ordenado[nome][sub]
+            del grupo[bisect_left(grupo, (valor, codigo))]
+            self._submapas[nome][sub] ^= 1 << codigo
+            self._numeros[nome][codigo] = math.nan
+
+    def _crescer(self, codigo: int) -> None:
+        falta = codigo + 1 - self._tamanho
+        if falta > 0:
+            for nome in self.categorias:
+                self._linha[nome].extend(array('i', [-1]) * falta)
+            for nome in self.faixas:
+                self._numeros[nome].extend(array('d', [math.nan]) * falta)
+            self._versoes.extend(array('q', [0]) * falta)
+            self._tamanho += falta
+
+    @staticmethod
+    def _ligado(mapa: int, codigo: int) -> bool:
+        return (mapa >> codigo) & 1 == 1
+
+    # ---------------------------------------------------------------- consulta
+
+    def consultar(self, filtros: dict, limite: int, apos: int = None) -> tuple[list, int | None, int, dict]:
+        """Retorna (códigos da página, último código, total, facetas).
+
+        `filtros` mapeia dimensão → conjunto de valores ou tupla (mínimo, máximo),
+        com None para um lado aberto. As contagens de cada dimensão aplicam
+        todos os filtros menos o da própria dimensão, para a interface mostrar
+        quantos registros cada outra opção traria.
+        """
+        self.sincronizar()
+
+        with self._trava:
+            mascaras = {nome: self._mascara(nome, filtro) for nome, filtro in filtros.items()}
+
+            selecionados = self._vivos
+            for mascara in mascaras.values():
+                selecionados &= mascara
+
+            facetas = {}
+            for nome in (*self.categorias, *self.faixas):
+                base = self._vivos
+                for outro, mascara in mascaras.items():
+                    if outro != nome:
+                        base &= mascara
+                facetas[nome] = self._contar(nome, base)
+
+            codigos = _primeiros(selecionados, (apos or 0) + 1, limite + 1)
+            proximo = codigos[limite - 1] if len(codigos) > limite else None
+
+            return codigos[:limite], proximo, selecionados.bit_count(), facetas
+
+    def _mascara(self, nome: str, filtro) -> int:
+        if nome in self.categorias:
+            if isinstance(filtro, tuple):
+                minimo, maximo = filtro
+                filtro = [
+                    valor for valor in self._valores[nome]
+                    if (minimo is None or valor >= minimo) and (maximo is None or valor <= maximo)
+                ]
+            posicoes = [self._codigos[nome][valor] for valor in filtro if valor in self._codigos[nome]]
+            if nome in self.esparsas:
+                codigos = [codigo for posicao in posicoes for codigo in self._mapas[nome][posicao]]
+                return _bitmap(codigos, max(codigos, default=0))
+
+            mascara = 0
+            for posicao in posicoes:
+                mascara |= self._mapas[nome][posicao]
+            return mascara
+
+        minimo, maximo = filtro
+        limites = self._limites[nome]
+        grupos  = self._ordenado[nome]
+        primeira = 0                if minimo is None else bisect_right(limites, minimo)
+        ultima   = len(grupos) - 1  if maximo is None else bisect_right(limites, maximo)
+
+        # As subfaixas internas entram inteiras; só as das pontas são filtradas
+        # valor a valor, sobre a lista ordenada.
+        mascara = 0
+        for sub in range(primeira + 1, ultima):
+            mascara |= self._submapas[nome][sub]
+
+        pontas = {primeira, ultima}
+        codigos = []
+        for sub in pontas:
+            grupo = grupos[sub]
+            de    = 0          if minimo is None else bisect_left(grupo, (minimo, -1))
+            ate   = len(grupo) if maximo is None else bisect_right(grupo, (maximo, math.inf))
+            codigos.extend(codigo for _, codigo in grupo[de:ate])
+
+        return mascara | _bitmap(codigos, max(codigos, default=0))
+
+    def _contar(self, nome: str, base: int) -> list:
+        if nome in self.esparsas:
+            return self._contar_esparsa(nome, base)
+
+        if nome in self.categorias:
+            contagens = [
+                {'valor': valor, 'total': (mapa & base).bit_count()}
+                for valor, mapa in zip(self._valores[nome], self._mapas[nome])
+            ]
+            return sorted((item for item in contagens if item['total']), key=lambda item: (-item['total'], str(item['valor'])))
+
+        return [
+            {'de': inicio, 'ate': fim, 'total': (mapa & base).bit_count()}
+            for inicio, fim, mapa in self._faixas_exibidas(nome)
+        ]
+
+    def _contar_esparsa(self, nome: str, base: int) -> list:
+        # Sem filtro nas outras dimensões a base é o conjunto dos vivos e a
+        # contagem é o tamanho de cada lista; senão cada registro da base
+        # soma um no seu valor.
+        if base is self._vivos:
+            totais = [len(lista) for lista in self._mapas[nome]]
+        else:
+            totais = [0] * len(self._valores[nome])
+            linha  = self._linha[nome]
+            for codigo in _ligados(base):
+                posicao = linha[codigo]
+                if posicao >= 0:
+                    totais[posicao] += 1
+
+        contagens = (
+            {'valor': valor, 'total': total}
+            for valor, total in zip(self._valores[nome], totais) if total
+        )
+        return heapq.nsmallest(self.MAXIMO_ESPARSAS, contagens, key=lambda item: (-item['total'], str(item['valor'])))
+
+    def _faixas_exibidas(self, nome: str) -> list:
+        """Bitmap de cada faixa exibida (união das subfaixas), guardado até a próxima alteração."""
+        if nome not in self._exibidas:
+            _, exibidos = self.faixas[nome]
+            limites     = self._limites[nome]
+            bordas      = [None, *exibidos, None]
+            faixas      = []
+
+            for inicio, fim in zip(bordas, bordas[1:]):
+                primeira = 0 if inicio is None else bisect_right(limites, inicio)
+                ultima   = len(limites) + 1 if fim is None else bisect_right(limites, fim)
+                mapa     = 0
+                for sub in range(primeira, ultima):
+                    mapa |= self._submapas[nome][sub]
+                faixas.append((inicio, fim, mapa))
+
+            self._exibidas[nome] = faixas
+        return self._exibidas[nome]
+
+
+def _bitmap(codigos, maior: int) -> int:
+    bits = bytearray(maior // 8 + 1)
+    for codigo in codigos:
+        bits[codigo >> 3] |= 1 << (codigo & 7)
+    return int.from_bytes(bits, 'little')
+
+
+# Posições dos bits ligados em cada valor de byte, para percorrer um bitmap
+# byte a byte em vez de deslocar o int inteiro a cada bit.
+_BITS_DO_BYTE = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def _ligados(mapa: int):
+    """Posições de todos os bits ligados, em ordem."""
+    for indice, byte in enumerate(mapa.to_bytes((mapa.bit_length() + 7) // 8, 'little')):
+        if byte:
+            inicio = indice << 3
+            for bit in _BITS_DO_BYTE[byte]:
+                yield inicio + bit
+
+
+def _primeiros(mapa: int, desde: int, quantidade: int) -> list:
+    """Posições dos primeiros `quantidade` bits ligados a partir de `desde`."""
+    codigos = []
+    resto   = mapa >> desde
+    posicao = desde
+
+    while resto and len(codigos) < quantidade:
+        salto    = (resto & -resto).bit_length() - 1
+        posicao += salto
+        codigos.append(posicao)
+        resto  >>= salto + 1
+        posicao += 1
+
+    return codigos
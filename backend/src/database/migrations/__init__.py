@@ -0,0 +1,77 @@
+"""Migrações versionadas do schema.
+
+Cada módulo `vNNNN_descricao.py` desta pasta define DESCRICAO e
+`aplicar(conexao)`; a versão é o número do nome do arquivo. As versões
+aplicadas ficam em SCHEMA_MIGRACOES, e cada migração roda na sua própria
+transação. Um banco vazio é criado direto com o schema atual dos modelos e
+recebe todas as versões como aplicadas.
+"""
+import importlib
+import pkgutil
+import re
+
+from datetime                import datetime
+from sqlalchemy              import MetaData, Table, Column, Integer, String, DateTime, select, insert, inspect
+from src.database.db_manager import db
+
+metadata = MetaData()
+
+SCHEMA_MIGRACOES = Table(
+    'SCHEMA_MIGRACOES', metadata,
+    Column('MIG_VERSAO',      Integer,     primary_key=True, autoincrement=False),
+    Column('MIG_DESCRICAO',   String(200), nullable=False),
+    Column('MIG_APLICADA_EM', DateTime,    nullable=False),
+)
+
+
+def migracoes() -> list[tuple[int, str, object]]:
+    """(versão, descrição, módulo) de todas as migrações, em ordem."""
+    encontradas = []
+    for modulo in pkgutil.iter_modules(__path__):
+        versao = re.match(r'v(\d+)_', modulo.name)
+        if versao:
+            carregado = importlib.import_module(f'{__name__}.{modulo.name}')
+            encontradas.append((int(versao.group(1)), carregado.DESCRICAO, carregado))
+    return sorted(encontradas, key=lambda migracao: migracao[0])
+
+
+def versoes_aplicadas(conexao) -> set[int]:
+    if not inspect(conexao).has_table(SCHEMA_MIGRACOES.name):
+        return set()
+    return set(conexao.scalars(select(SCHEMA_MIGRACOES.c.MIG_VERSAO)))
+
+
+def migrar(engine=None) -> list[tuple[int, str]]:
+    """Aplica as migrações pendentes; retorna (versão, descrição) das aplicadas."""
+    engine  = engine or db.engine
+    todas   = migracoes()
+
+    with engine.begin() as conexao:
+        vazio = not any(inspect(conexao).has_table(tabela) for tabela in db.metadata.tables)
+        metadata.create_all(conexao)
+
+        if vazio:
+            db.metadata.create_all(conexao)
+            _registrar(conexao, todas)
+            return []
+
+        aplicadas = versoes_aplicadas(conexao)
+
+    feitas = []
+    for versao, descricao, modulo in todas:
+        if versao in aplicadas:
+            continue
+        with engine.begin() as conexao:
+            modulo.aplicar(conexao)
+            _registrar(conexao, [(versao, descricao, modulo)])
+        feitas.append((versao, descricao))
+
+    return feitas
+
+
+def _registrar(conexao, lista: list) -> None:
+    if lista:
+        conexao.execute(insert(SCHEMA_MIGRACOES), [
+            {'MIG_VERSAO': versao, 'MIG_DESCRICAO': descricao, 'MIG_APLICADA_EM': datetime.utcnow()}
+            for versao, descricao, _ in lista
+        ])
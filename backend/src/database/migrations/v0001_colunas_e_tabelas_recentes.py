@@ -0,0 +1,32 @@
+"""Bancos criados antes do controle de versões: colunas e tabelas que o
+create_all não acrescenta em tabelas já existentes.
+
+Depois desta migração rode `flask reconstruir-resumo-vendas` e
+`flask reindexar-busca` para preencher as tabelas derivadas.
+"""
+from sqlalchemy              import inspect, text
+from src.database.db_manager import db
+
+DESCRICAO = 'VEI_VERSAO, VENDAS.USU_CODIGO, tokens revogados, resumo de vendas e índices de busca'
+
+COLUNAS = {
+    'VEICULOS' : {'VEI_VERSAO': 'INTEGER NOT NULL DEFAULT 1'},
+    'VENDAS'   : {'USU_CODIGO': 'INTEGER REFERENCES "USUARIOS" ("USU_CODIGO")'},
+}
+
+TABELAS = ('TOKENS_REVOGADOS', 'RESUMO_VENDAS')
+
+
+def aplicar(conexao) -> None:
+    inspetor = inspect(conexao)
+
+    for tabela, colunas in COLUNAS.items():
+        existentes = {coluna['name'] for coluna in inspetor.get_columns(tabela)}
+        for nome, definicao in colunas.items():
+            if nome not in existentes:
+                conexao.execute(text(f'ALTER TABLE "{tabela}" ADD COLUMN "{nome}" {definicao}'))
+
+    # O create_all com a lista de tabelas cria só as que faltam e dispara o
+    # after_create do metadata, que cria os índices de busca (BUSCA_*) que
+    # ainda não existirem.
+    db.metadata.create_all(conexao, tables=[db.metadata.tables[tabela] for tabela in TABELAS])
@@ -0,0 +1,37 @@
+"""Troca os índices de coluna única (index=True em quase tudo) pelos que as
+consultas dos services usam, segundo o `flask relatorio-indices`.
+
+Saem os índices nunca usados, que só encareciam cada INSERT e UPDATE:
+as chaves primárias reindexadas, os filtros que hoje são resolvidos pelos
+índices de busca e de facetas, e VEN_VALOR. VENDAS.USU_CODIGO passa a ser
+parcial (vendas sem vendedor não entram) e a lista de tokens revogados
+ganha um índice de cobertura.
+"""
+from sqlalchemy import text
+
+DESCRICAO = 'Índices compostos e parciais no lugar dos índices de coluna única'
+
+REMOVIDOS = (
+    'ix_CLIENTES_CLI_CODIGO', 'ix_CLIENTES_CLI_NOME', 'ix_CLIENTES_CLI_TELEFONE', 'ix_CLIENTES_CLI_EMAIL',
+    'ix_CLIENTES_CLI_CEP', 'ix_CLIENTES_CLI_ENDERECO', 'ix_CLIENTES_CLI_CIDADE', 'ix_CLIENTES_CLI_UF',
+    'ix_CLIENTES_CLI_STATUS',
+    'ix_VEICULOS_VEI_CODIGO', 'ix_VEICULOS_VEI_MARCA', 'ix_VEICULOS_VEI_MODELO', 'ix_VEICULOS_VEI_PRECO',
+    'ix_VEICULOS_VEI_ANO', 'ix_VEICULOS_VEI_COR', 'ix_VEICULOS_VEI_TIPO', 'ix_VEICULOS_VEI_STATUS',
+    'ix_VENDAS_VEN_CODIGO', 'ix_VENDAS_VEN_VALOR', 'ix_VENDAS_USU_CODIGO',
+    'ix_USUARIOS_USU_TIPO', 'ix_USUARIOS_USU_STATUS',
+    'ix_TOKENS_REVOGADOS_TOK_EXPIRA_EM',
+)
+
+CRIADOS = (
+    'CREATE INDEX IF NOT EXISTS "ix_VEICULOS_updated_at" ON "VEICULOS" (updated_at)',
+    'CREATE INDEX IF NOT EXISTS "ix_VENDAS_vendedor" ON "VENDAS" ("USU_CODIGO") WHERE "USU_CODIGO" IS NOT NULL',
+    'CREATE INDEX IF NOT EXISTS "ix_TOKENS_REVOGADOS_expiracao" ON "TOKENS_REVOGADOS" ("TOK_EXPIRA_EM", "TOK_JTI")',
+)
+
+
+def aplicar(conexao) -> None:
+    for nome in REMOVIDOS:
+        conexao.execute(text(f'DROP INDEX IF EXISTS "{nome}"'))
+
+    for comando in CRIADOS:
+        conexao.execute(text(comando))
@@ -0,0 +1,33 @@
+"""Livro de lançamentos do saldo dos clientes (MOVIMENTOS_SALDO) e os
+fechamentos diários (FECHAMENTOS_SALDO).
+
+O saldo que cada cliente já tinha entra no livro como um lançamento
+"Saldo inicial", para que a soma dos lançamentos feche com CLI_SALDO. Os
+saldos nulos passam a ser zero, porque os lançamentos somam sobre eles.
+"""
+from datetime                import datetime
+from sqlalchemy              import text
+from src.database.db_manager import db
+
+DESCRICAO = 'Livro de lançamentos e fechamentos do saldo dos clientes'
+
+TABELAS = ('MOVIMENTOS_SALDO', 'FECHAMENTOS_SALDO')
+
+
+def aplicar(conexao) -> None:
+    db.metadata.create_all(conexao, tables=[db.metadata.tables[tabela] for tabela in TABELAS])
+
+    # No Postgres o tipo é um enum nativo e o texto do CASE precisa de cast.
+    tipo = 'CASE WHEN "CLI_SALDO" > 0 THEN \'Credito\' ELSE \'Debito\' END'
+    if conexao.dialect.name == 'postgresql':
+        tipo = f'CAST({tipo} AS movimento_saldo_tipo_enum)'
+
+    conexao.execute(text('UPDATE "CLIENTES" SET "CLI_SALDO" = 0 WHERE "CLI_SALDO" IS NULL'))
+    conexao.execute(
+        text(
+            'INSERT INTO "MOVIMENTOS_SALDO" ("CLI_CODIGO", "MOV_TIPO", "MOV_VALOR", "MOV_DESCRICAO", "MOV_DATA") '
+            f'SELECT "CLI_CODIGO", {tipo}, "CLI_SALDO", \'Saldo inicial\', :agora '
+            'FROM "CLIENTES" WHERE "CLI_SALDO" <> 0 ORDER BY "CLI_CODIGO"'
+        ),
+        {'agora': datetime.utcnow()}
+    )
@@ -0,0 +1,29 @@
+"""Sincronização incremental (`GET /api/<entidade>/changes`).
+
+Cria EXCLUSOES, onde cada exclusão deixa uma lápide, e os índices
+(updated_at, chave) que a leitura em keyset das alterações usa. O de
+VEICULOS substitui o ix_VEICULOS_updated_at, cuja coluna é o prefixo do
+novo. As linhas sem updated_at recebem o created_at (ou agora), porque um
+updated_at nulo nunca entraria numa sincronização.
+"""
+from datetime                import datetime
+from sqlalchemy              import text
+from src.database.db_manager import db
+
+DESCRICAO = 'Lápides de exclusão e índices de sincronização incremental'
+
+CHAVES = {'VEICULOS': 'VEI_CODIGO', 'CLIENTES': 'CLI_CODIGO', 'USUARIOS': 'USU_CODIGO', 'VENDAS': 'VEN_CODIGO'}
+
+
+def aplicar(conexao) -> None:
+    db.metadata.create_all(conexao, tables=[db.metadata.tables['EXCLUSOES']])
+
+    agora = datetime.utcnow()
+    for tabela, chave in CHAVES.items():
+        conexao.execute(
+            text(f'UPDATE "{tabela}" SET updated_at = COALESCE(created_at, :agora) WHERE updated_at IS NULL'),
+            {'agora': agora}
+        )
+        conexao.execute(text(f'CREATE INDEX IF NOT EXISTS "ix_{tabela}_alteracao" ON "{tabela}" (updated_at, "{chave}")'))
+
+    conexao.execute(text('DROP INDEX IF EXISTS "ix_VEICULOS_updated_at"'))
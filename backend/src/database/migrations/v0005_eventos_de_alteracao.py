@@ -0,0 +1,13 @@
+"""Eventos de alteração (`GET /api/eventos`).
+
+Cria EVENTOS, onde cada commit que altera veículos, clientes ou vendas
+grava seus eventos. A tabela começa vazia: um cliente só acompanha o que
+mudou depois de conectar.
+"""
+from src.database.db_manager import db
+
+DESCRICAO = 'Eventos de alteração para o stream SSE'
+
+
+def aplicar(conexao) -> None:
+    db.metadata.create_all(conexao, tables=[db.metadata.tables['EVENTOS']])
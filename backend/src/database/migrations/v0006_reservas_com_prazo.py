@@ -0,0 +1,26 @@
+"""Reservas de veículos com prazo (`POST /api/veiculos/<id>/reserva`).
+
+Acrescenta a VEICULOS o cliente e o prazo da reserva, e o índice parcial
+pelo qual o agendador lê os prazos que estão vencendo. Os veículos já
+marcados como Reservado ficam sem prazo: continuam reservas feitas à mão.
+"""
+from sqlalchemy              import inspect, text
+from src.database.db_manager import db
+
+DESCRICAO = 'Cliente e prazo da reserva de veículos'
+
+COLUNAS = {
+    'VEI_RESERVA_CLIENTE' : 'INTEGER REFERENCES "CLIENTES" ("CLI_CODIGO")',
+    'VEI_RESERVA_ATE'     : 'TIMESTAMP',
+}
+
+
+def aplicar(conexao) -> None:
+    existentes = {coluna['name'] for coluna in inspect(conexao).get_columns('VEICULOS')}
+    for nome, definicao in COLUNAS.items():
+        if nome not in existentes:
+            conexao.execute(text(f'ALTER TABLE "VEICULOS" ADD COLUMN "{nome}" {definicao}'))
+
+    for indice in db.metadata.tables['VEICULOS'].indexes:
+        if indice.name == 'ix_VEICULOS_reserva':
+            indice.create(conexao, checkfirst=True)
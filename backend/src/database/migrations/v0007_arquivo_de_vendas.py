@@ -0,0 +1,12 @@
+"""Arquivo de vendas (`flask arquivar-vendas`).
+
+Cria VENDAS_ARQUIVO, para onde vão as vendas de meses fechados. A tabela
+começa vazia: nada sai de VENDAS até o comando rodar pela primeira vez.
+"""
+from src.database.db_manager import db
+
+DESCRICAO = 'Arquivo das vendas de períodos fechados'
+
+
+def aplicar(conexao) -> None:
+    db.metadata.create_all(conexao, tables=[db.metadata.tables['VENDAS_ARQUIVO']])
@@ -0,0 +1,41 @@
+"""Marca e tipo do veículo gravados na venda.
+
+Acrescenta VEN_MARCA e VEN_TIPO a VENDAS e VENDAS_ARQUIVO e preenche as
+vendas existentes com a marca e o tipo atuais do veículo, que é o que o
+resumo de vendas usava até aqui. Vendas arquivadas de veículos já
+excluídos ficam sem marca e tipo, e o resumo as conta como antes: marca
+vazia e tipo Indefinido.
+"""
+from sqlalchemy              import inspect, text, select, update, cast, String
+from src.database.db_manager import db
+
+DESCRICAO = 'Marca e tipo do veículo na venda'
+
+COLUNAS = {
+    'VEN_MARCA' : 'VARCHAR(50)',
+    'VEN_TIPO'  : 'VARCHAR(20)',
+}
+
+TABELAS = ('VENDAS', 'VENDAS_ARQUIVO')
+
+
+def aplicar(conexao) -> None:
+    inspetor = inspect(conexao)
+    veiculos = db.metadata.tables['VEICULOS']
+
+    for nome_tabela in TABELAS:
+        existentes = {coluna['name'] for coluna in inspetor.get_columns(nome_tabela)}
+        for nome, definicao in COLUNAS.items():
+            if nome not in existentes:
+                conexao.execute(text(f'ALTER TABLE "{nome_tabela}" ADD COLUMN "{nome}" {definicao}'))
+
+        tabela  = db.metadata.tables[nome_tabela]
+        veiculo = veiculos.c.VEI_CODIGO == tabela.c.VEI_CODIGO
+        conexao.execute(
+            update(tabela)
+            .where(tabela.c.VEN_MARCA.is_(None))
+            .values(
+                VEN_MARCA = select(veiculos.c.VEI_MARCA).where(veiculo).scalar_subquery(),
+                VEN_TIPO  = select(cast(veiculos.c.VEI_TIPO, String)).where(veiculo).scalar_subquery(),
+            )
+        )
@@ -0,0 +1,19 @@
+"""Busca textual indexada no PostgreSQL.
+
+Nos bancos PostgreSQL, ativa a extensão pg_trgm e cria o índice GIN de
+trigramas em TEXTO de cada tabela de busca (BUSCA_*), usado pelo LIKE
+por substring, pela similaridade do ranking e pela busca aproximada. O
+conteúdo das tabelas não muda. No SQLite (FTS5) não há nada a fazer.
+"""
+from src.database.db_manager import db
+
+DESCRICAO = 'Índice de trigramas (pg_trgm) nas tabelas de busca do PostgreSQL'
+
+
+def aplicar(conexao) -> None:
+    if conexao.dialect.name != 'postgresql':
+        return
+
+    # Sem tabelas na lista o create_all não cria nenhuma, mas dispara o
+    # after_create do metadata, que cria extensão e índices que faltarem.
+    db.metadata.create_all(conexao, tables=[])
@@ -0,0 +1,207 @@
+import json
+import re
+import threading
+
+from collections             import defaultdict
+from sqlalchemy              import event, inspect
+from src.database.db_manager import db
+
+COMANDOS_ANALISADOS = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+COMANDOS_ESCRITA    = ('UPDATE', 'DELETE', 'INSERT')
+
+
+class CapturaSQL:
+    """Comandos SQL distintos executados por um engine.
+
+    Guarda o texto de cada comando, os parâmetros da primeira execução (para
+    o EXPLAIN) e quantas vezes ele rodou, que é o peso de cada plano no
+    relatório de índices.
+    """
+
+    def __init__(self) -> None:
+        self.comandos = {}
+        self._trava   = threading.Lock()
+        self._engine  = None
+
+    def iniciar(self, engine) -> 'CapturaSQL':
+        self._engine = engine
+        event.listen(engine, 'before_cursor_execute', self._registrar)
+        return self
+
+    def parar(self) -> None:
+        if self._engine is not None and event.contains(self._engine, 'before_cursor_execute', self._registrar):
+            event.remove(self._engine, 'before_cursor_execute', self._registrar)
+
+    def _registrar(self, conexao, cursor, sql, parametros, contexto, executemany) -> None:
+        with self._trava:
+            item = self.comandos.get(sql)
+            if item is None:
+                # executemany traz uma lista de linhas; o INSERT de várias
+                # linhas (insertmanyvalues) chega aqui já com uma lista só.
+                if executemany and parametros and isinstance(parametros[0], (list, tuple, dict)):
+                    parametros = parametros[0]
+                item = self.comandos[sql] = {'sql': sql, 'parametros': _serializavel(parametros), 'execucoes': 0}
+            item['execucoes'] += 1
+
+    def gravar(self, caminho: str) -> int:
+        with self._trava:
+            itens = list(self.comandos.values())
+
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            for item in itens:
+                arquivo.write(json.dumps(item, ensure_ascii=False) + '\n')
+        return len(itens)
+
+    @staticmethod
+    def ler(caminho: str) -> list[dict]:
+        with open(caminho, encoding='utf-8') as arquivo:
+            return [json.loads(linha) for linha in arquivo if linha.strip()]
+
+
+def _serializavel(parametros):
+    return json.loads(json.dumps(parametros, default=str))
+
+
+def relatorio_indices(comandos: list[dict]) -> dict:
+    """Roda o EXPLAIN de cada comando capturado e cruza com os índices existentes.
+
+    Retorna os índices com o número de execuções que os usaram, os que não
+    foram usados por nenhum comando, as varreduras completas de tabelas com
+    WHERE e as ordenações em árvore temporária (candidatos a índice), e
+    quantas escritas cada tabela recebeu, que é o que cada índice a mais
+    encarece.
+    """
+    usos       = defaultdict(int)
+    varreduras = {}
+    ordenacoes = {}
+    escritas   = defaultdict(int)
+    erros      = []
+    analisados = 0
+
+    with db.engine.connect() as conexao:
+        indices = _indices(conexao)
+        tabelas = {indice['tabela'] for indice in indices.values()} | set(db.metadata.tables)
+
+        for comando in comandos:
+            sql       = comando['sql']
+            execucoes = comando.get('execucoes', 1)
+            verbo     = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+            if verbo not in COMANDOS_ANALISADOS:
+                continue
+
+            if verbo in COMANDOS_ESCRITA:
+                tabela = _tabela_escrita(sql)
+                if tabela:
+                    escritas[tabela] += execucoes
+
+            try:
+                passos = _plano(conexao, sql, comando.get('parametros') or ())
+            except Exception as erro:
+                erros.append({'sql': sql, 'error': str(erro)})
+                continue
+            analisados += 1
+
+            for tipo, nome in passos:
+                if tipo == 'indice':
+                    usos[nome] += execucoes
+                elif tipo == 'varredura' and nome in tabelas and ' WHERE ' in sql.upper():
+                    item = varreduras.setdefault((nome, sql), {
+                        'tabela': nome, 'sql': sql, 'execucoes': 0, 'colunas': _colunas_filtradas(sql, nome)
+                    })
+                    item['execucoes'] += execucoes
+                elif tipo == 'ordenacao':
+                    item = ordenacoes.setdefault(sql, {'sql': sql, 'execucoes': 0})
+                    item['execucoes'] += execucoes
+        conexao.rollback()
+
+    for nome, indice in indices.items():
+        indice['usos'] = usos.get(nome, 0)
+
+    return {
+        'comandos'   : analisados,
+        'indices'    : sorted(indices.values(), key=lambda indice: (indice['tabela'], indice['nome'])),
+        'sem_uso'    : sorted(nome for nome, indice in indices.items() if not indice['usos'] and not indice['unico']),
+        'varreduras' : sorted(varreduras.values(), key=lambda item: -item['execucoes']),
+        'ordenacoes' : sorted(ordenacoes.values(), key=lambda item: -item['execucoes']),
+        'escritas'   : dict(sorted(escritas.items())),
+        'erros'      : erros,
+    }
+
+
+def _indices(conexao) -> dict:
+    inspetor = inspect(conexao)
+    indices  = {}
+
+    for tabela in db.metadata.tables:
+        if not inspetor.has_table(tabela):
+            continue
+        for indice in inspetor.get_indexes(tabela):
+            opcoes = indice.get('dialect_options') or {}
+            indices[indice['name']] = {
+                'nome'    : indice['name'],
+                'tabela'  : tabela,
+                'colunas' : [coluna for coluna in indice['column_names'] if coluna],
+                'unico'   : bool(indice['unique']),
+                'parcial' : any(chave.endswith('_where') for chave in opcoes),
+            }
+
+    return indices
+
+
+def _plano(conexao, sql: str, parametros) -> list[tuple[str, str | None]]:
+    if isinstance(parametros, list):
+        parametros = tuple(parametros)
+
+    if conexao.dialect.name == 'sqlite':
+        linhas = conexao.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', parametros).all()
+        return [passo for linha in linhas if (passo := _passo_sqlite(linha[-1]))]
+
+    if conexao.dialect.name == 'postgresql':
+        plano = conexao.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}', parametros).scalar()
+        if isinstance(plano, str):
+            plano = json.loads(plano)
+        passos = []
+        _passos_postgres(plano[0]['Plan'], passos)
+        return passos
+
+    raise ValueError(f'EXPLAIN não suportado para {conexao.dialect.name}.')
+
+
+def _passo_sqlite(detalhe: str) -> tuple[str, str | None] | None:
+    indice = re.search(r'USING (?:COVERING )?INDEX (\S+)', detalhe)
+    if indice:
+        return 'indice', indice.group(1)
+
+    varredura = re.match(r'SCAN (\S+)(?: AS \S+)?$', detalhe)
+    if varredura:
+        return 'varredura', varredura.group(1)
+
+    if detalhe.startswith('USE TEMP B-TREE'):
+        return 'ordenacao', None
+
+    return None
+
+
+def _passos_postgres(no: dict, passos: list) -> None:
+    if no.get('Index Name'):
+        passos.append(('indice', no['Index Name']))
+    elif no.get('Node Type') == 'Seq Scan':
+        passos.append(('varredura', no.get('Relation Name')))
+    elif no.get('Node Type') in ('Sort', 'Incremental Sort'):
+        passos.append(('ordenacao', None))
+
+    for filho in no.get('Plans', []):
+        _passos_postgres(filho, passos)
+
+
+def _tabela_escrita(sql: str) -> str | None:
+    nome = re.search(r'^\s*(?:INSERT(?: OR \w+)? INTO|UPDATE|DELETE FROM)\s+"?(\w+)"?', sql, re.IGNORECASE)
+    return nome.group(1) if nome else None
+
+
+def _colunas_filtradas(sql: str, tabela: str) -> list[str]:
+    """Colunas da tabela citadas no WHERE: o ponto de partida para um índice."""
+    clausula = re.split(r'\bWHERE\b', sql, maxsplit=1, flags=re.IGNORECASE)[-1]
+    clausula = re.split(r'\b(?:ORDER BY|GROUP BY|LIMIT)\b', clausula, maxsplit=1, flags=re.IGNORECASE)[0]
+    colunas  = re.findall(rf'"?{re.escape(tabela)}"?\."?(\w+)"?', clausula)
+    return list(dict.fromkeys(colunas))
@@ -0,0 +1,271 @@
+import re
+
+from sqlalchemy              import event, select, text
+from src.database.db_manager import db
+from src.utils.utils         import normalizar_busca
+from src.utils.pagination    import codificar_cursor, decodificar_cursor
+
+
+class IndiceBusca:
+    """Índice de busca textual de uma tabela, mantido pelos services.
+
+    No SQLite é uma tabela virtual FTS5 com tokenizer `trigram`, o que dá
+    busca por substring (e portanto por prefixo) usando o índice, ranking por
+    bm25 e uma busca aproximada por trigramas quando a busca exata não
+    encontra nada. No PostgreSQL é uma tabela com o texto concatenado e um
+    índice GIN do pg_trgm, que atende o mesmo LIKE por substring; o ranking
+    é a similaridade de trigramas, e a busca aproximada usa o operador `<%`
+    (similaridade de palavra), também pelo índice. Em outros bancos fica só
+    a tabela com filtro LIKE, sem ranking.
+
+    O texto indexado é sempre o normalizado (sem acentos e em minúsculas),
+    o mesmo aplicado ao termo pesquisado: "Joao" encontra "João".
+    """
+
+    TAMANHO_TRIGRAMA = 3
+    MAXIMO_TRIGRAMAS = 24
+
+    def __init__(self, tabela: str, modelo, colunas: dict, pesos: dict = None) -> None:
+        self.tabela  = tabela
+        self.modelo  = modelo
+        self.chave   = modelo.__mapper__.primary_key[0]
+        self.colunas = colunas
+        self.pesos   = pesos or {}
+        self._fts    = None
+        self._trgm   = None
+
+        event.listen(db.metadata, 'after_create', self._criar)
+        event.listen(db.metadata, 'before_drop',  self._excluir)
+
+    def _criar(self, target, conexao, **kwargs) -> None:
+        nomes = ', '.join(self.colunas)
+
+        if conexao.dialect.name == 'sqlite':
+            existe = conexao.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :nome"), {'nome': self.tabela}
+            ).first()
+            if existe:
+                return
+
+            conexao.execute(text(
+                f"CREATE VIRTUAL TABLE {self.tabela} USING fts5({nomes}, tokenize = 'trigram')"
+            ))
+            pesos = ', '.join(str(float(self.pesos.get(nome, 1.0))) for nome in self.colunas)
+            conexao.execute(text(
+                f"INSERT INTO {self.tabela}({self.tabela}, rank) VALUES ('rank', 'bm25({pesos})')"
+            ))
+        else:
+            conexao.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.tabela} (CODIGO INTEGER PRIMARY KEY, TEXTO TEXT NOT NULL)"
+            ))
+
+        if conexao.dialect.name == 'postgresql':
+            conexao.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conexao.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{self.tabela}_trgm ON {self.tabela} USING gin (TEXTO gin_trgm_ops)"
+            ))
+
+    def _excluir(self, target, conexao, **kwargs) -> None:
+        conexao.execute(text(f"DROP TABLE IF EXISTS {self.tabela}"))
+
+    @property
+    def fts(self) -> bool:
+        if self._fts is None:
+            self._fts = db.engine.dialect.name == 'sqlite'
+        return self._fts
+
+    @property
+    def trgm(self) -> bool:
+        if self._trgm is None:
+            self._trgm = db.engine.dialect.name == 'postgresql'
+        return self._trgm
+
+    def _textos(self, objeto) -> dict:
+        return {nome: normalizar_busca(extrator(objeto)) for nome, extrator in self.colunas.items()}
+
+    def indexar(self, *objetos, novos: bool = False) -> None:
+        """(Re)indexa os objetos na transação corrente; aceita instâncias ou Rows.
+
+        `novos=True` pula a remoção das entradas antigas, para registros que
+        acabaram de ser inseridos.
+        """
+        if not objetos:
+            return
+
+        codigos = [{'codigo': getattr(objeto, self.chave.key)} for objeto in objetos]
+        if not novos:
+            self.remover(*(item['codigo'] for item in codigos))
+
+        if self.fts:
+            nomes   = ', '.join(self.colunas)
+            valores = ', '.join(f':{nome}' for nome in self.colunas)
+            sql     = f"INSERT INTO {self.tabela}(rowid, {nomes}) VALUES (:codigo, {valores})"
+            params  = [{**codigo, **self._textos(objeto)} for codigo, objeto in zip(codigos, objetos)]
+        else:
+            sql     = f"INSERT INTO {self.tabela}(CODIGO, TEXTO) VALUES (:codigo, :texto)"
+            params  = [
+                {**codigo, 'texto': ' '.join(self._textos(objeto).values())}
+                for codigo, objeto in zip(codigos, objetos)
+            ]
+
+        db.session.execute(text(sql), params)
+
+    def remover(self, *codigos: int) -> None:
+        if not codigos:
+            return
+
+        coluna = 'rowid' if self.fts else 'CODIGO'
+        db.session.execute(
+            text(f"DELETE FROM {self.tabela} WHERE {coluna} = :codigo"),
+            [{'codigo': codigo} for codigo in codigos]
+        )
+
+    def reconstruir(self, lote: int = 1000) -> int:
+        """Recria o índice inteiro a partir da tabela do modelo (backfill)."""
+        db.session.execute(text(f"DELETE FROM {self.tabela}"))
+
+        total = 0
+        for objetos in db.session.scalars(select(self.modelo).execution_options(yield_per=lote)).partitions():
+            self.indexar(*objetos, novos=True)
+            total += len(objetos)
+
+        db.session.commit()
+        return total
+
+    def buscar(self, termo: str, limite: int, apos: str = None) -> tuple[list, str | None]:
+        """Retorna (códigos, próximo cursor) ordenados por relevância.
+
+        A paginação é por chave sobre (rank, código), então o cursor continua
+        válido mesmo com inserções entre uma página e outra.
+        """
+        tokens     = normalizar_busca(termo).split()
+        rank       = None
+        ultimo     = None
+        aproximada = False
+
+        if apos:
+            rank, ultimo, aproximada = decodificar_cursor(apos)
+
+        if self.fts or self.trgm:
+            buscar = self._buscar_fts if self.fts else self._buscar_trgm
+            linhas = buscar(tokens, limite, rank, ultimo, aproximada)
+
+            if not linhas and not apos and not aproximada:
+                aproximada = True
+                linhas     = buscar(tokens, limite, rank, ultimo, aproximada)
+        else:
+            linhas = self._buscar_like(tokens, limite, ultimo)
+
+        proximo = None
+        if len(linhas) > limite:
+            linhas  = linhas[:limite]
+            proximo = codificar_cursor(linhas[-1][1], linhas[-1][0], aproximada)
+
+        return [codigo for codigo, _ in linhas], proximo
+
+    def _buscar_fts(self, tokens: list, limite: int, rank, ultimo, aproximada: bool) -> list:
+        longos = [token for token in tokens if len(token) >= self.TAMANHO_TRIGRAMA]
+        curtos = [token for token in tokens if len(token) <  self.TAMANHO_TRIGRAMA]
+
+        if aproximada:
+            if not longos:
+                return []
+            longos = self._trigramas(longos)
+            curtos = []
+
+        filtros = []
+        params  = {'limite': limite + 1}
+
+        if longos:
+            operador = ' OR ' if aproximada else ' AND '
+            filtros.append(f"{self.tabela} MATCH :consulta")
+            params['consulta'] = operador.join(self._aspas(token) for token in longos)
+
+        for indice, token in enumerate(curtos):
+            filtros.append('(' + ' OR '.join(
+                f"{nome} LIKE :curto{indice} ESCAPE '\\'" for nome in self.colunas
+            ) + ')')
+            params[f'curto{indice}'] = f'%{self._escapar_like(token)}%'
+
+        ordem = 'rank, rowid' if longos else 'rowid'
+        if ultimo is not None:
+            if longos:
+                filtros.append("(rank > :rank OR (rank = :rank AND rowid > :ultimo))")
+                params['rank'] = rank
+            else:
+                filtros.append("rowid > :ultimo")
+            params['ultimo'] = ultimo
+
+        campo_rank = 'rank' if longos else '0'
+        where      = ' AND '.join(filtros) or '1 = 1'
+        sql        = f"SELECT rowid, {campo_rank} FROM {self.tabela} WHERE {where} ORDER BY {ordem} LIMIT :limite"
+
+        return [tuple(linha) for linha in db.session.execute(text(sql), params)]
+
+    def _buscar_trgm(self, tokens: list, limite: int, rank, ultimo, aproximada: bool) -> list:
+        # O rank é a similaridade negativa, para ordenar como o bm25 do FTS5:
+        # menor é melhor, e o cursor é o mesmo (rank, código).
+        filtros = []
+        params  = {'limite': limite + 1, 'termo': ' '.join(tokens)}
+
+        if aproximada:
+            if not any(len(token) >= self.TAMANHO_TRIGRAMA for token in tokens):
+                return []
+            filtros.append("CAST(:termo AS TEXT) <% TEXTO")
+            campo_rank = "-word_similarity(:termo, TEXTO)"
+        else:
+            for indice, token in enumerate(tokens):
+                filtros.append(f"TEXTO LIKE :token{indice} ESCAPE '\\'")
+                params[f'token{indice}'] = f'%{self._escapar_like(token)}%'
+            campo_rank = "-similarity(TEXTO, :termo)"
+
+        pagina = ''
+        if ultimo is not None:
+            pagina = "WHERE RANK > :rank OR (RANK = :rank AND CODIGO > :ultimo)"
+            params.update(rank=rank, ultimo=ultimo)
+
+        where = ' AND '.join(filtros) or '1 = 1'
+        sql   = (
+            f"SELECT CODIGO, RANK FROM (SELECT CODIGO, {campo_rank} AS RANK FROM {self.tabela} WHERE {where}) AS BUSCA "
+            f"{pagina} ORDER BY RANK, CODIGO LIMIT :limite"
+        )
+
+        return [tuple(linha) for linha in db.session.execute(text(sql), params)]
+
+    def _buscar_like(self, tokens: list, limite: int, ultimo) -> list:
+        filtros = []
+        params  = {'limite': limite + 1}
+
+        for indice, token in enumerate(tokens):
+            filtros.append(f"TEXTO LIKE :token{indice} ESCAPE '\\'")
+            params[f'token{indice}'] = f'%{self._escapar_like(token)}%'
+
+        if ultimo is not None:
+            filtros.append("CODIGO > :ultimo")
+            params['ultimo'] = ultimo
+
+        where = ' AND '.join(filtros) or '1 = 1'
+        sql   = f"SELECT CODIGO, 0 FROM {self.tabela} WHERE {where} ORDER BY CODIGO LIMIT :limite"
+
+        return [tuple(linha) for linha in db.session.execute(text(sql), params)]
+
+    def _trigramas(self, tokens: list) -> list:
+        vistos = []
+        for token in tokens:
+            for inicio in range(len(token) - self.TAMANHO_TRIGRAMA + 1):
+                trigrama = token[inicio:inicio + self.TAMANHO_TRIGRAMA]
+                if trigrama not in vistos:
+                    vistos.append(trigrama)
+        return vistos[:self.MAXIMO_TRIGRAMAS]
+
+    @staticmethod
+    def _aspas(token: str) -> str:
+        return '"' + token.replace('"', '""') + '"'
+
+    @staticmethod
+    def _escapar_like(token: str) -> str:
+        return re.sub(r'([\\%_])', r'\\\1', token)
+
+
+def somente_alfanumericos(texto: str) -> str:
+    return re.sub(r'[^0-9A-Za-z]', '', texto or '')
@@ -1 +1,2 @@
-from .decorator_exceptions import exception, exception_rollback
\ No newline at end of file
+from .decorator_exceptions import exception, exception_rollback
+from .decorator_auth import rota_publica, requer_autenticacao, autenticar_requisicao, token_da_requisicao, token_na_url
\ No newline at end of file
@@ -0,0 +1,66 @@
+from functools    import wraps
+from flask        import current_app, g, request, make_response, jsonify
+from src.services import tokens, TokenInvalido, ACESSO
+
+
+def rota_publica(func):
+    """Marca a rota como acessível sem token (login, renovação)."""
+    func.rota_publica = True
+    return func
+
+
+def token_na_url(func):
+    """Aceita o token também em `?token=`, para clientes que não enviam cabeçalhos (EventSource)."""
+    func.token_na_url = True
+    return func
+
+
+def token_da_requisicao() -> str | None:
+    cabecalho = request.headers.get('Authorization', '')
+    if cabecalho.startswith('Bearer '):
+        return cabecalho[7:].strip() or None
+
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, 'token_na_url', False):
+        return request.args.get('token') or None
+    return None
+
+
+def autenticar_requisicao():
+    """before_request: valida o token de acesso e preenche `g.usuario`.
+
+    Só confere assinatura, validade e revogação; não consulta USUARIOS. Com
+    AUTH_OBRIGATORIA desligada, requisições sem token seguem anônimas, mas um
+    token presente e inválido é sempre recusado.
+    """
+    g.usuario = None
+
+    if request.method == 'OPTIONS' or request.endpoint is None:
+        return None
+
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, 'rota_publica', False):
+        return None
+
+    token = token_da_requisicao()
+    if not token:
+        if current_app.config.get('AUTH_OBRIGATORIA'):
+            return make_response(jsonify({'error': 'Token de acesso ausente.'}), 401)
+        return None
+
+    try:
+        g.usuario = tokens.validar(ACESSO, token)
+    except TokenInvalido as erro:
+        return make_response(jsonify({'error': str(erro)}), 401)
+
+    return None
+
+
+def requer_autenticacao(func):
+    """Exige token válido na rota mesmo com AUTH_OBRIGATORIA desligada."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not g.get('usuario'):
+            return make_response(jsonify({'error': 'Token de acesso ausente.'}), 401)
+        return func(*args, **kwargs)
+    return wrapper
@@ -1,4 +1,5 @@
-from .enum_customers import ClienteStatusEnum
+from .enum_customers import ClienteStatusEnum, MovimentoSaldoTipoEnum
 from .enum_sales     import VendaStatusEnum
 from .enum_vehicles  import VeiculoStatusEnum, VeiculoTipoEnum
-from .enum_users     import UsuariosStatusEnum, UsuariosTipoEnum
\ No newline at end of file
+from .enum_users     import UsuariosStatusEnum, UsuariosTipoEnum
+from .enum_events    import EventoTipoEnum
\ No newline at end of file
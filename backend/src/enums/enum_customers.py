@@ -6,4 +6,11 @@ class ClienteStatusEnum(Enum):
     Bloqueado = 'Bloqueado'
     
     def __str__(self) -> str:
-        return self.value
\ No newline at end of file
+        return self.value
+
+class MovimentoSaldoTipoEnum(Enum):
+    Credito = 'Credito'
+    Debito  = 'Debito'
+    
+    def __str__(self) -> str:
+        return self.value
@@ -0,0 +1,9 @@
+from enum import Enum
+
+class EventoTipoEnum(Enum):
+    Criado   = 'Criado'
+    Alterado = 'Alterado'
+    Excluido = 'Excluido'
+
+    def __str__(self) -> str:
+        return self.value
@@ -1,4 +1,10 @@
-from .model_customers import Clientes
-from .model_sales     import Vendas
-from .model_vehicles  import Veiculos
-from .model_users     import Usuarios
\ No newline at end of file
+from .model_customers        import Clientes, indice_clientes
+from .model_customer_balance import MovimentosSaldo, FechamentosSaldo
+from .model_sales            import Vendas
+from .model_sales_archive    import VendasArquivo
+from .model_sales_summary    import ResumoVendas
+from .model_vehicles         import Veiculos, indice_veiculos, facetas_veiculos
+from .model_users            import Usuarios
+from .model_tokens           import TokensRevogados
+from .model_deletions        import Exclusoes
+from .model_events           import Eventos
\ No newline at end of file
@@ -0,0 +1,79 @@
+from datetime     import datetime, date
+from decimal      import Decimal
+from sqlalchemy   import Enum
+from src.database import db
+from src.enums    import MovimentoSaldoTipoEnum
+
+class MovimentosSaldo(db.Model):
+    """Lançamentos do saldo dos clientes. A tabela só recebe INSERT.
+
+    MOV_VALOR tem sinal: positivo no crédito e negativo no débito. Assim o
+    saldo em qualquer momento é a soma dos lançamentos até ali.
+    CLIENTES.CLI_SALDO guarda o total corrente. Ele é atualizado com
+    `CLI_SALDO + delta` na mesma transação de cada lançamento. Lançamentos
+    feitos por uma venda (pagamento com saldo e estorno no cancelamento)
+    ficam ligados a ela por VEN_CODIGO.
+    """
+    __tablename__ = 'MOVIMENTOS_SALDO'
+
+    MOV_CODIGO    = db.Column(db.Integer,        primary_key=True)
+    CLI_CODIGO    = db.Column(db.Integer,        db.ForeignKey('CLIENTES.CLI_CODIGO'), nullable=False)
+    VEN_CODIGO    = db.Column(db.Integer,        db.ForeignKey('VENDAS.VEN_CODIGO'),   nullable=True)
+    USU_CODIGO    = db.Column(db.Integer,        db.ForeignKey('USUARIOS.USU_CODIGO'), nullable=True)
+    MOV_VALOR     = db.Column(db.Numeric(10, 2), nullable=False)
+    MOV_DESCRICAO = db.Column(db.String(200))
+    MOV_DATA      = db.Column(db.DateTime,       nullable=False, default=datetime.utcnow)
+
+    MOV_TIPO      = db.Column(
+        Enum(MovimentoSaldoTipoEnum, name="movimento_saldo_tipo_enum"),
+        nullable = False,
+        comment  = "Tipo = Credito, Debito")
+
+    # O extrato e o saldo numa data leem os lançamentos de um cliente por
+    # período; só os lançamentos de vendas entram no índice por venda.
+    __table_args__ = (
+        db.Index('ix_MOVIMENTOS_SALDO_cliente', CLI_CODIGO, MOV_DATA),
+        db.Index(
+            'ix_MOVIMENTOS_SALDO_venda', VEN_CODIGO,
+            sqlite_where     = VEN_CODIGO.isnot(None),
+            postgresql_where = VEN_CODIGO.isnot(None)
+        ),
+    )
+
+    def __init__(
+        self,
+        cliente_cod : int,
+        valor       : Decimal,
+        descricao   : str = None,
+        venda_cod   : int = None,
+        usuario_cod : int = None
+    ):
+        self.CLI_CODIGO    = cliente_cod
+        self.MOV_VALOR     = valor
+        self.MOV_TIPO      = MovimentoSaldoTipoEnum.Credito if valor >= 0 else MovimentoSaldoTipoEnum.Debito
+        self.MOV_DESCRICAO = descricao
+        self.VEN_CODIGO    = venda_cod
+        self.USU_CODIGO    = usuario_cod
+
+
+class FechamentosSaldo(db.Model):
+    """Saldo de um cliente no fim do dia FEC_DATA (UTC).
+
+    Gravado por `flask fechar-saldos` só para os clientes com lançamentos
+    desde o fechamento anterior. O saldo numa data parte do último
+    fechamento até ela e soma só os lançamentos posteriores, sem reler o
+    histórico inteiro. MOV_CODIGO é o último lançamento incluído.
+    """
+    __tablename__  = 'FECHAMENTOS_SALDO'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    CLI_CODIGO = db.Column(db.Integer,        db.ForeignKey('CLIENTES.CLI_CODIGO'), primary_key=True)
+    FEC_DATA   = db.Column(db.Date,           primary_key=True)
+    FEC_SALDO  = db.Column(db.Numeric(12, 2), nullable=False)
+    MOV_CODIGO = db.Column(db.Integer,        nullable=False)
+
+    def __init__(self, cliente_cod: int, data: date, saldo: Decimal, movimento_cod: int):
+        self.CLI_CODIGO = cliente_cod
+        self.FEC_DATA   = data
+        self.FEC_SALDO  = saldo
+        self.MOV_CODIGO = movimento_cod
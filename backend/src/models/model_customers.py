@@ -1,33 +1,35 @@
 from datetime     import datetime
 from decimal      import Decimal
 from sqlalchemy   import Enum
-from src.database import db
+from src.database import db, IndiceBusca, somente_alfanumericos
 from src.enums    import ClienteStatusEnum
 
 class Clientes(db.Model):
     __tablename__ = 'CLIENTES'
 
-    CLI_CODIGO   = db.Column(db.Integer,        primary_key=True, index=True)
-    CLI_NOME     = db.Column(db.String(100),    nullable=False,   index=True)
+    CLI_CODIGO   = db.Column(db.Integer,        primary_key=True)
+    CLI_NOME     = db.Column(db.String(100),    nullable=False)
     CLI_CPF      = db.Column(db.String(20),     nullable=False,   unique=True, index=True)
-    CLI_TELEFONE = db.Column(db.String(20),     nullable=False,   index=True)
-    CLI_EMAIL    = db.Column(db.String(100),    index=True)
-    CLI_CEP      = db.Column(db.String(10),     index=True)
-    CLI_ENDERECO = db.Column(db.String(150),    index=True)
-    CLI_CIDADE   = db.Column(db.String(50),     index=True)
-    CLI_UF       = db.Column(db.String(2),      index=True)
+    CLI_TELEFONE = db.Column(db.String(20),     nullable=False)
+    CLI_EMAIL    = db.Column(db.String(100))
+    CLI_CEP      = db.Column(db.String(10))
+    CLI_ENDERECO = db.Column(db.String(150))
+    CLI_CIDADE   = db.Column(db.String(50))
+    CLI_UF       = db.Column(db.String(2))
     CLI_SALDO    = db.Column(db.Numeric(10, 2), default=0.00)
     
     CLI_STATUS   = db.Column(
         Enum(ClienteStatusEnum, name="cliente_status_enum"), 
         nullable = False,   
         default  = ClienteStatusEnum.Ativo, 
-        comment  = "Status = Ativo, Inativo, Bloqueado", 
-        index    = True)
+        comment  = "Status = Ativo, Inativo, Bloqueado")
     
     created_at   = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at   = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Sincronização incremental: keyset em (updated_at, CLI_CODIGO).
+    __table_args__ = (db.Index('ix_CLIENTES_alteracao', updated_at, CLI_CODIGO),)
+
     def __init__(
         self, 
         nome     : str, 
@@ -51,3 +53,15 @@ class Clientes(db.Model):
         self.CLI_UF       = uf
         self.CLI_SALDO    = saldo
         self.CLI_STATUS   = status
+
+
+indice_clientes = IndiceBusca(
+    'BUSCA_CLIENTES',
+    Clientes,
+    colunas = {
+        'nome'  : lambda cliente: cliente.CLI_NOME,
+        'cpf'   : lambda cliente: f'{cliente.CLI_CPF} {somente_alfanumericos(cliente.CLI_CPF)}',
+        'email' : lambda cliente: cliente.CLI_EMAIL,
+    },
+    pesos = {'nome': 10.0, 'cpf': 5.0, 'email': 2.0}
+)
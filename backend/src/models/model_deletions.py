@@ -0,0 +1,29 @@
+from datetime     import datetime
+from src.database import db
+
+class Exclusoes(db.Model):
+    """Lápides dos registros excluídos, uma por `excluir_*`.
+
+    A sincronização incremental (`GET /api/<entidade>/changes`) só enxerga
+    pelo updated_at o que ainda existe; o que saiu da tabela é lido daqui,
+    em ordem de EXC_CODIGO. `flask limpar-exclusoes` apaga as lápides mais
+    antigas que a retenção.
+    """
+    __tablename__ = 'EXCLUSOES'
+
+    EXC_CODIGO   = db.Column(db.Integer,    primary_key=True)
+    EXC_TABELA   = db.Column(db.String(30), nullable=False)
+    EXC_REGISTRO = db.Column(db.Integer,    nullable=False)
+    EXC_DATA     = db.Column(db.DateTime,   nullable=False, default=datetime.utcnow)
+
+    # Cada sincronização lê as lápides de uma tabela a partir de um EXC_CODIGO.
+    # AUTOINCREMENT no SQLite: sem ele, uma limpeza que esvaziasse a tabela
+    # faria os códigos recomeçarem do 1, atrás dos cursores já entregues.
+    __table_args__ = (
+        db.Index('ix_EXCLUSOES_tabela', EXC_TABELA, EXC_CODIGO),
+        {'sqlite_autoincrement': True},
+    )
+
+    def __init__(self, tabela: str, registro: int):
+        self.EXC_TABELA   = tabela
+        self.EXC_REGISTRO = registro
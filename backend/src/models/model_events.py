@@ -0,0 +1,34 @@
+from datetime     import datetime
+from sqlalchemy   import Enum
+from src.database import db
+from src.enums    import EventoTipoEnum
+
+class Eventos(db.Model):
+    """Alterações de veículos, clientes e vendas.
+
+    Gravados na mesma transação da alteração e publicados no canal de
+    eventos depois do commit. EVT_CODIGO é o `id` do Server-Sent Event: um
+    cliente que reconecta com `Last-Event-ID` recebe daqui o que perdeu.
+    EVT_STATUS é o status do registro depois da alteração.
+    """
+    __tablename__ = 'EVENTOS'
+
+    EVT_CODIGO   = db.Column(db.Integer,    primary_key=True)
+    EVT_ENTIDADE = db.Column(db.String(20), nullable=False)
+    EVT_REGISTRO = db.Column(db.Integer,    nullable=False)
+    EVT_STATUS   = db.Column(db.String(20))
+    EVT_DATA     = db.Column(db.DateTime,   nullable=False, default=datetime.utcnow)
+
+    EVT_TIPO     = db.Column(
+        Enum(EventoTipoEnum, name="evento_tipo_enum"),
+        nullable = False,
+        comment  = "Tipo = Criado, Alterado, Excluido")
+
+    # Os códigos nunca voltam atrás, nem depois de uma limpeza que esvazie a tabela.
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    def __init__(self, entidade: str, registro: int, tipo: EventoTipoEnum, status: str = None):
+        self.EVT_ENTIDADE = entidade
+        self.EVT_REGISTRO = registro
+        self.EVT_TIPO     = tipo
+        self.EVT_STATUS   = status
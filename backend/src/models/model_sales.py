@@ -7,11 +7,17 @@ from src.enums    import VendaStatusEnum
 class Vendas(db.Model):
     __tablename__ = 'VENDAS'
     
-    VEN_CODIGO = db.Column(db.Integer,        primary_key=True, index=True)
+    VEN_CODIGO = db.Column(db.Integer,        primary_key=True)
     VEI_CODIGO = db.Column(db.Integer,        db.ForeignKey('VEICULOS.VEI_CODIGO'), nullable=False, index=True)
     CLI_CODIGO = db.Column(db.Integer,        db.ForeignKey('CLIENTES.CLI_CODIGO'), nullable=False, index=True)
+    USU_CODIGO = db.Column(db.Integer,        db.ForeignKey('USUARIOS.USU_CODIGO'), nullable=True)
     VEN_DATA   = db.Column(db.Date,           default=date.today, nullable=False, index=True)
-    VEN_VALOR  = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, index=True)
+    VEN_VALOR  = db.Column(db.Numeric(10, 2), nullable=False, default=0.00)
+    
+    # Marca e tipo do veículo no momento da venda: o resumo de vendas agrupa
+    # por eles, e uma alteração posterior do veículo não muda a venda.
+    VEN_MARCA  = db.Column(db.String(50))
+    VEN_TIPO   = db.Column(db.String(20))
     
     VEN_STATUS = db.Column(
         Enum(VendaStatusEnum, name="venda_status_enum"), 
@@ -22,8 +28,21 @@ class Vendas(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Vendas sem vendedor (anteriores ao cadastro dele) ficam fora do índice;
+    # `USU_CODIGO = ?` ainda o usa, porque a igualdade implica NOT NULL.
+    # A sincronização incremental lê em keyset sobre (updated_at, VEN_CODIGO).
+    __table_args__ = (
+        db.Index(
+            'ix_VENDAS_vendedor', USU_CODIGO,
+            sqlite_where     = USU_CODIGO.isnot(None),
+            postgresql_where = USU_CODIGO.isnot(None)
+        ),
+        db.Index('ix_VENDAS_alteracao', updated_at, VEN_CODIGO),
+    )
+
     veiculo    = db.relationship('Veiculos', backref='vendas')
     cliente    = db.relationship('Clientes', backref='vendas')
+    vendedor   = db.relationship('Usuarios', backref='vendas')
 
     def __init__(
         self, 
@@ -31,10 +50,16 @@ class Vendas(db.Model):
         cliente_cod : int, 
         data        : date, 
         valor       : Decimal, 
-        status      : VendaStatusEnum = VendaStatusEnum.Concluida
+        status      : VendaStatusEnum = VendaStatusEnum.Concluida,
+        vendedor    : int             = None,
+        marca       : str             = None,
+        tipo        : str             = None
     ):
         self.VEI_CODIGO = veiculo_cod
         self.CLI_CODIGO = cliente_cod
         self.VEN_DATA   = data or date.today()
         self.VEN_VALOR  = valor
-        self.VEN_STATUS = status
\ No newline at end of file
+        self.VEN_STATUS = status
+        self.USU_CODIGO = vendedor
+        self.VEN_MARCA  = marca
+        self.VEN_TIPO   = tipo
\ No newline at end of file
@@ -0,0 +1,40 @@
+from datetime     import datetime, date
+from sqlalchemy   import Enum
+from src.database import db
+from src.enums    import VendaStatusEnum
+
+class VendasArquivo(db.Model):
+    """Vendas de períodos fechados, tiradas de VENDAS por `flask arquivar-vendas`.
+
+    Mesmas colunas e mesmos códigos de VENDAS: as listagens juntam as duas
+    tabelas pela chave, e a consulta por código procura aqui quando a venda
+    não está mais em VENDAS. As linhas só entram pelo INSERT ... SELECT do
+    arquivamento e não mudam mais. Sem chaves estrangeiras: o histórico não
+    segura a exclusão de veículos, clientes ou usuários.
+    """
+    __tablename__ = 'VENDAS_ARQUIVO'
+
+    VEN_CODIGO = db.Column(db.Integer,        primary_key=True, autoincrement=False)
+    VEI_CODIGO = db.Column(db.Integer,        nullable=False, index=True)
+    CLI_CODIGO = db.Column(db.Integer,        nullable=False, index=True)
+    USU_CODIGO = db.Column(db.Integer,        nullable=True)
+    VEN_DATA   = db.Column(db.Date,           default=date.today, nullable=False, index=True)
+    VEN_VALOR  = db.Column(db.Numeric(10, 2), nullable=False, default=0.00)
+    VEN_MARCA  = db.Column(db.String(50))
+    VEN_TIPO   = db.Column(db.String(20))
+
+    VEN_STATUS = db.Column(
+        Enum(VendaStatusEnum, name="venda_status_enum"),
+        nullable = False,
+        comment  = "Status = Concluida, Cancelada")
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index(
+            'ix_VENDAS_ARQUIVO_vendedor', USU_CODIGO,
+            sqlite_where     = USU_CODIGO.isnot(None),
+            postgresql_where = USU_CODIGO.isnot(None)
+        ),
+    )
@@ -0,0 +1,41 @@
+from datetime     import date
+from decimal      import Decimal
+from src.database import db
+
+class ResumoVendas(db.Model):
+    """Totais de vendas por período, marca, tipo de veículo e vendedor.
+
+    Cada venda é somada em dois grãos: RES_PERIODO = 'D' (RES_DATA é o dia) e
+    'M' (RES_DATA é o primeiro dia do mês), para relatórios mensais lerem ~30
+    vezes menos linhas. Mantido pelo VendasService na mesma transação de cada
+    venda, cancelamento, alteração ou exclusão; `flask reconstruir-resumo-vendas`
+    recalcula a tabela a partir de VENDAS. Marca e tipo são os gravados na
+    venda (VEN_MARCA, VEN_TIPO), não os atuais do veículo. USU_CODIGO = 0
+    agrupa as vendas sem vendedor.
+    """
+    __tablename__  = 'RESUMO_VENDAS'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    DIA = 'D'
+    MES = 'M'
+
+    RES_PERIODO         = db.Column(db.String(1),      primary_key=True)
+    RES_DATA            = db.Column(db.Date,           primary_key=True)
+    RES_MARCA           = db.Column(db.String(50),     primary_key=True)
+    RES_TIPO            = db.Column(db.String(20),     primary_key=True)
+    USU_CODIGO          = db.Column(db.Integer,        primary_key=True, default=0)
+    RES_QTD_VENDAS      = db.Column(db.Integer,        nullable=False, default=0)
+    RES_VALOR_BRUTO     = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    RES_QTD_CANCELADAS  = db.Column(db.Integer,        nullable=False, default=0)
+    RES_VALOR_CANCELADO = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+    def __init__(self, periodo: str, data: date, marca: str, tipo: str, vendedor: int = 0):
+        self.RES_PERIODO         = periodo
+        self.RES_DATA            = data
+        self.RES_MARCA           = marca
+        self.RES_TIPO            = tipo
+        self.USU_CODIGO          = vendedor
+        self.RES_QTD_VENDAS      = 0
+        self.RES_VALOR_BRUTO     = Decimal('0.00')
+        self.RES_QTD_CANCELADAS  = 0
+        self.RES_VALOR_CANCELADO = Decimal('0.00')
@@ -0,0 +1,18 @@
+from datetime     import datetime
+from src.database import db
+
+class TokensRevogados(db.Model):
+    __tablename__ = 'TOKENS_REVOGADOS'
+
+    TOK_JTI       = db.Column(db.String(36), primary_key=True)
+    TOK_EXPIRA_EM = db.Column(db.DateTime,   nullable=False)
+
+    created_at    = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Cobre a carga da lista de revogados (TOK_JTI dos ainda não expirados)
+    # sem ler a tabela.
+    __table_args__ = (db.Index('ix_TOKENS_REVOGADOS_expiracao', TOK_EXPIRA_EM, TOK_JTI),)
+
+    def __init__(self, jti: str, expira_em: datetime):
+        self.TOK_JTI       = jti
+        self.TOK_EXPIRA_EM = expira_em
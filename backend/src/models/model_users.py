@@ -15,18 +15,19 @@ class Usuarios(db.Model):
     USU_TIPO   = db.Column(
         Enum(UsuariosTipoEnum, name="usuarios_tipo_enum"),   
         nullable = False,   
-        comment  = "Tipo: Comum, Administrador, Vendedor, Gerente, Financeiro, Mecânico, Estoquista, Caixa, Atendente", 
-        index    = True)
+        comment  = "Tipo: Comum, Administrador, Vendedor, Gerente, Financeiro, Mecânico, Estoquista, Caixa, Atendente")
     
     USU_STATUS = db.Column(
         Enum(UsuariosStatusEnum, name="usuarios_status_enum"),
         nullable = False,   
         default  = UsuariosStatusEnum.Ativo, 
-        comment  = "Status: Ativo, Inativo, Bloqueado", 
-        index    = True)
+        comment  = "Status: Ativo, Inativo, Bloqueado")
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Sincronização incremental: keyset em (updated_at, USU_CODIGO).
+    __table_args__ = (db.Index('ix_USUARIOS_alteracao', updated_at, USU_CODIGO),)
     
     def __init__(
         self,
@@ -1,37 +1,58 @@
 from datetime     import datetime
 from decimal      import Decimal
 from sqlalchemy   import Enum
-from src.database import db
+from src.database import db, IndiceBusca, IndiceFacetas, somente_alfanumericos
 from src.enums    import VeiculoTipoEnum, VeiculoStatusEnum
 
 class Veiculos(db.Model):
     __tablename__ = 'VEICULOS'
 
-    VEI_CODIGO = db.Column(db.Integer,        primary_key=True, index=True)
+    VEI_CODIGO = db.Column(db.Integer,        primary_key=True)
     VEI_PLACA  = db.Column(db.String(10),     nullable=False,   unique=True)    
-    VEI_MARCA  = db.Column(db.String(50),     nullable=False,   index=True)
-    VEI_MODELO = db.Column(db.String(50),     nullable=False,   index=True)
-    VEI_PRECO  = db.Column(db.Numeric(10, 2), nullable=False,   default=0.00, index=True)
-    VEI_ANO    = db.Column(db.Integer,        nullable=False,   index=True)
+    VEI_MARCA  = db.Column(db.String(50),     nullable=False)
+    VEI_MODELO = db.Column(db.String(50),     nullable=False)
+    VEI_PRECO  = db.Column(db.Numeric(10, 2), nullable=False,   default=0.00)
+    VEI_ANO    = db.Column(db.Integer,        nullable=False)
     VEI_KM     = db.Column(db.Numeric(10, 2), default=0)
-    VEI_COR    = db.Column(db.String(30),     index=True)
+    VEI_COR    = db.Column(db.String(30))
     
     VEI_TIPO   = db.Column(
         Enum(VeiculoTipoEnum, name="veiculo_tipo_enum"),   
         nullable = False,   
         default  = VeiculoTipoEnum.Indefinido, 
-        comment  = "Tipo = Moto, Carro, Caminhao, Indefinido", 
-        index    = True)
+        comment  = "Tipo = Moto, Carro, Caminhao, Indefinido")
     
     VEI_STATUS = db.Column(
         Enum(VeiculoStatusEnum, name="veiculo_status_enum"), 
         nullable = False,   
         default  = VeiculoStatusEnum.Disponivel, 
-        comment  = "Status = Disponivel, Indisponivel, Vendido, Manutencao, Reservado", 
-        index    = True)
+        comment  = "Status = Disponivel, Indisponivel, Vendido, Manutencao, Reservado")
     
+    # Versão para concorrência otimista: todo UPDATE confere a versão lida e a
+    # incrementa. Os UPDATEs condicionais (venda, cancelamento) também a
+    # incrementam, então um objeto carregado antes deles falha no flush.
+    VEI_VERSAO = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # Reserva com prazo (`POST /api/veiculos/<id>/reserva`): para quem e até
+    # quando. Um Reservado sem prazo é uma reserva feita à mão, sem validade.
+    VEI_RESERVA_CLIENTE = db.Column(db.Integer,  db.ForeignKey('CLIENTES.CLI_CODIGO'), nullable=True)
+    VEI_RESERVA_ATE     = db.Column(db.DateTime, nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Sincronização incremental (keyset em updated_at, VEI_CODIGO) e o
+    # max(updated_at) do índice de facetas. Os prazos de reserva são lidos
+    # por faixa pelo agendador; veículos sem reserva ficam fora do índice.
+    __table_args__  = (
+        db.Index('ix_VEICULOS_alteracao', updated_at, VEI_CODIGO),
+        db.Index(
+            'ix_VEICULOS_reserva', VEI_RESERVA_ATE,
+            sqlite_where     = VEI_RESERVA_ATE.isnot(None),
+            postgresql_where = VEI_RESERVA_ATE.isnot(None)
+        ),
+    )
+    __mapper_args__ = {'version_id_col': VEI_VERSAO}
     
     def __init__(
         self, 
@@ -52,5 +73,35 @@ class Veiculos(db.Model):
         self.VEI_PRECO  = preco
         self.VEI_ANO    = ano
         self.VEI_COR    = cor
-        self.KM         = km
+        self.VEI_KM     = km
         self.VEI_STATUS = status
+
+
+indice_veiculos = IndiceBusca(
+    'BUSCA_VEICULOS',
+    Veiculos,
+    colunas = {
+        'marca'  : lambda veiculo: veiculo.VEI_MARCA,
+        'modelo' : lambda veiculo: veiculo.VEI_MODELO,
+        'placa'  : lambda veiculo: f'{veiculo.VEI_PLACA} {somente_alfanumericos(veiculo.VEI_PLACA)}',
+    },
+    pesos = {'marca': 5.0, 'modelo': 10.0, 'placa': 5.0}
+)
+
+
+facetas_veiculos = IndiceFacetas(
+    Veiculos,
+    categorias = {
+        'marca'  : Veiculos.VEI_MARCA,
+        'modelo' : Veiculos.VEI_MODELO,
+        'tipo'   : Veiculos.VEI_TIPO,
+        'status' : Veiculos.VEI_STATUS,
+        'ano'    : Veiculos.VEI_ANO,
+    },
+    faixas     = {
+        'preco' : (Veiculos.VEI_PRECO, (30000, 50000, 80000, 120000, 200000)),
+        'km'    : (Veiculos.VEI_KM,    (10000, 30000, 60000, 100000, 150000)),
+    },
+    versao     = Veiculos.VEI_VERSAO,
+    esparsas   = ('modelo',)
+)
@@ -0,0 +1,14 @@
+from .route_vehicles  import rotas as rotas_veiculos
+from .route_customers import rotas as rotas_clientes
+from .route_users     import rotas as rotas_usuarios
+from .route_sales     import rotas as rotas_vendas
+from .route_login     import rotas as rotas_login
+from .route_cache     import rotas as rotas_cache
+from .route_database  import rotas as rotas_banco
+from .route_metrics   import rotas as rotas_metricas
+from .route_events    import rotas as rotas_eventos
+
+BLUEPRINTS = (
+    rotas_veiculos, rotas_clientes, rotas_usuarios, rotas_vendas,
+    rotas_login, rotas_cache, rotas_banco, rotas_metricas, rotas_eventos,
+)
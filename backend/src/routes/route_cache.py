@@ -0,0 +1,9 @@
+from flask     import Blueprint, make_response, jsonify, Response
+from src.utils import cache
+
+rotas = Blueprint('cache', __name__)
+
+
+@rotas.route('/api/cache', methods=['GET'])
+def estatisticas_cache() -> Response:
+    return make_response(jsonify(cache.estatisticas()), 200)
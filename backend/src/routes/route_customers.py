@@ -1,11 +1,14 @@
-from flask          import request, make_response, jsonify, Response
+from flask          import Blueprint, g, request, make_response, jsonify, Response
 from sqlalchemy.exc import SQLAlchemyError
-from src            import app, db
-from src.utils      import log_info, log_error
-from src.services   import ClientesService
+from src            import db
+from src.utils      import log_info, log_error, ler_paginacao, corpo_listagem, quer_stream, resposta_ndjson, ler_importacao
+from src.utils      import ler_campos, LIMITE_PADRAO, LIMITE_MAXIMO
+from src.services   import ClientesService, SaldosService
 
+rotas = Blueprint('clientes', __name__)
 
-@app.route('/api/clientes', methods=['POST'])
+
+@rotas.route('/api/clientes', methods=['POST'])
 def adicionar_cliente() -> Response:
     dados   = request.get_json()
     service = ClientesService()
@@ -18,7 +21,40 @@ def adicionar_cliente() -> Response:
         return make_response(jsonify({'error': 'Erro ao adicionar cliente no banco de dados.'}), 500)
 
 
-@app.route('/api/clientes/<int:id>', methods=['PUT'])
+@rotas.route('/api/clientes/bulk', methods=['POST'])
+def importar_clientes() -> Response:
+    service = ClientesService()
+    try:
+        relatorio = service.importar_clientes(ler_importacao(request))
+        return make_response(jsonify(relatorio), 200)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('importar_clientes', erro)
+        return make_response(jsonify({'error': 'Erro ao importar clientes no banco de dados.'}), 500)
+
+
+@rotas.route('/api/clientes', methods=['PATCH'])
+def editar_clientes_em_lote() -> Response:
+    dados   = request.get_json()
+    service = ClientesService()
+    try:
+        response, status = service.atualizar_em_lote(dados)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('editar_clientes_em_lote', erro)
+        return make_response(jsonify({'error': 'Erro ao atualizar clientes no banco de dados.'}), 500)
+
+
+@rotas.route('/api/clientes/<int:id>', methods=['PUT'])
 def editar_cliente(id) -> Response:
     dados   = request.get_json()
     service = ClientesService()
@@ -35,7 +71,7 @@ def editar_cliente(id) -> Response:
         return make_response(jsonify({'error': 'Erro ao atualizar cliente no banco de dados.'}), 500)
 
 
-@app.route('/api/clientes/<int:id>', methods=['DELETE'])
+@rotas.route('/api/clientes/<int:id>', methods=['DELETE'])
 def excluir_cliente(id) -> Response:
     service = ClientesService()
     try:
@@ -51,13 +87,114 @@ def excluir_cliente(id) -> Response:
         return make_response(jsonify({'error': 'Erro ao deletar cliente do banco de dados.'}), 500)
  
 
-@app.route('/api/clientes', methods=['GET'])
+@rotas.route('/api/clientes', methods=['GET'])
 def listar_clientes() -> Response:
     termo   = request.args.get('busca', '')
     service = ClientesService()
     try:
-        lista = service.listar_clientes(termo)
-        return make_response(jsonify(lista), 200)
+        campos = ler_campos(request.args, service.LISTAGEM)
+        if quer_stream(request):
+            return resposta_ndjson('listar_clientes', service.iterar_clientes(termo, campos))
+
+        limite, apos, paginado = ler_paginacao(request.args)
+        pagina = service.listar_clientes(termo, limite, apos, campos)
+        return make_response(jsonify(corpo_listagem(pagina, paginado)), 200)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
     except Exception as erro:
         log_error('listar_clientes', erro)
         return make_response(jsonify({'error': 'Erro ao listar clientes.'}), 500)
+
+
+@rotas.route('/api/clientes/<int:id>', methods=['GET'])
+def obter_cliente(id) -> Response:
+    service = ClientesService()
+    try:
+        response, status = service.obter_cliente(id, ler_campos(request.args, service.LISTAGEM))
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('obter_cliente', erro)
+        return make_response(jsonify({'error': 'Erro ao buscar cliente.'}), 500)
+
+
+@rotas.route('/api/clientes/<int:id>/saldo', methods=['POST'])
+def lancar_saldo(id) -> Response:
+    dados   = request.get_json()
+    service = SaldosService()
+    usuario = g.usuario['sub'] if g.get('usuario') else None
+    try:
+        response, status = service.lancar(id, dados, usuario)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 404)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('lancar_saldo', erro)
+        return make_response(jsonify({'error': 'Erro ao registrar lançamento no banco de dados.'}), 500)
+
+
+@rotas.route('/api/clientes/<int:id>/saldo', methods=['GET'])
+def consultar_saldo(id) -> Response:
+    service = SaldosService()
+    try:
+        response, status = service.saldo(id, request.args.get('data'))
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('consultar_saldo', erro)
+        return make_response(jsonify({'error': 'Erro ao consultar saldo.'}), 500)
+
+
+@rotas.route('/api/clientes/<int:id>/movimentos', methods=['GET'])
+def listar_movimentos(id) -> Response:
+    service = SaldosService()
+    try:
+        limite, apos, _ = ler_paginacao(request.args)
+        if not request.args.get('limit'):
+            limite = LIMITE_PADRAO
+
+        response, status = service.extrato(id, limite, apos, ler_campos(request.args, service.EXTRATO))
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('listar_movimentos', erro)
+        return make_response(jsonify({'error': 'Erro ao listar lançamentos.'}), 500)
+
+
+@rotas.route('/api/clientes/changes', methods=['GET'])
+def alteracoes_clientes() -> Response:
+    service = ClientesService()
+    try:
+        limite, _, _ = ler_paginacao(request.args)
+        if not request.args.get('limit'):
+            limite = LIMITE_MAXIMO
+
+        response, status = service.sincronia.alteracoes(
+            service.LISTAGEM, request.args.get('since'), limite, ler_campos(request.args, service.LISTAGEM)
+        )
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('alteracoes_clientes', erro)
+        return make_response(jsonify({'error': 'Erro ao listar alterações de clientes.'}), 500)
\ No newline at end of file
@@ -0,0 +1,9 @@
+from flask        import Blueprint, make_response, jsonify, Response
+from src.database import estatisticas_pool
+
+rotas = Blueprint('banco', __name__)
+
+
+@rotas.route('/api/banco/pool', methods=['GET'])
+def estatisticas_banco() -> Response:
+    return make_response(jsonify(estatisticas_pool()), 200)
@@ -0,0 +1,25 @@
+from flask          import Blueprint, request, make_response, jsonify, Response, current_app
+from src.utils      import log_error, resposta_sse, canal_eventos
+from src.decorators import token_na_url
+from src.services   import EventosService
+
+rotas = Blueprint('eventos', __name__)
+
+
+@rotas.route('/api/eventos', methods=['GET'])
+@token_na_url
+def transmitir_eventos() -> Response:
+    service = EventosService()
+    try:
+        entidades, status = service.ler_filtros(request.args)
+        desde = service.ler_ultimo(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except Exception as erro:
+        log_error('transmitir_eventos', erro)
+        return make_response(jsonify({'error': 'Erro ao abrir o stream de eventos.'}), 500)
+
+    assinante = canal_eventos.assinar(entidades, status)
+    return resposta_sse(service.transmitir(assinante, desde, current_app.json.dumps))
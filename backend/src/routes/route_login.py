@@ -1,34 +1,63 @@
-from flask             import request, make_response, jsonify, Response
-from sqlalchemy.exc    import SQLAlchemyError
-from src               import app, db
-from src.utils         import log_info, log_error
-from src.models        import Usuarios
-from werkzeug.security import check_password_hash
-
-@app.route('/api/login', methods=['POST'])
+from flask          import Blueprint, request, make_response, jsonify, Response
+from sqlalchemy.exc import SQLAlchemyError
+from src            import db
+from src.utils      import log_info, log_error
+from src.services   import AutenticacaoService
+from src.decorators import rota_publica, token_da_requisicao
+
+rotas = Blueprint('login', __name__)
+
+
+@rotas.route('/api/login', methods=['POST'])
+@rota_publica
 def login_usuario() -> Response:
-    dados = request.get_json()
+    dados = request.get_json(silent=True) or {}
     email = dados.get('email')
     senha = dados.get('senha')
 
     if not email or not senha:
         return make_response(jsonify({'error': 'Email e senha são obrigatórios.'}), 400)
 
+    service = AutenticacaoService()
     try:
-        usuario = Usuarios.query.filter_by(email=email).first()
+        response, status = service.login(email, senha)
+        return make_response(jsonify(response), status)
+
+    except Exception as erro:
+        log_error('login_usuario', erro)
+        return make_response(jsonify({'error': 'Erro ao realizar login.'}), 500)
 
-        log_info('login_usuario', f'Tentativa de login para o usuário: {email}')
 
-        if not usuario:
-            return make_response(jsonify({'error': 'Usuário não encontrado.'}), 404)
+@rotas.route('/api/login/refresh', methods=['POST'])
+@rota_publica
+def renovar_token() -> Response:
+    dados = request.get_json(silent=True) or {}
+    token = dados.get('refresh_token')
 
-        log_info('login_usuario', f'{usuario.senha} != {senha}')
+    if not token:
+        return make_response(jsonify({'error': 'refresh_token é obrigatório.'}), 400)
 
-        if not check_password_hash(usuario.senha, senha):
-            return make_response(jsonify({'error': 'Senha incorreta.'}), 401)
+    service = AutenticacaoService()
+    try:
+        response, status = service.renovar(token)
+        return make_response(jsonify(response), status)
 
-        return make_response(jsonify({'message': 'Login realizado com sucesso.'}), 200)
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('renovar_token', erro)
+        return make_response(jsonify({'error': 'Erro ao renovar token.'}), 500)
 
-    except Exception as erro:
-        log_error('login_usuario', erro)
-        return make_response(jsonify({'error': 'Erro ao realizar login.'}), 500)
+
+@rotas.route('/api/logout', methods=['POST'])
+@rota_publica
+def logout_usuario() -> Response:
+    dados   = request.get_json(silent=True) or {}
+    service = AutenticacaoService()
+    try:
+        response, status = service.logout(token_da_requisicao(), dados.get('refresh_token'))
+        return make_response(jsonify(response), status)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('logout_usuario', erro)
+        return make_response(jsonify({'error': 'Erro ao realizar logout.'}), 500)
@@ -0,0 +1,28 @@
+from flask        import Blueprint, Response
+from src.database import estatisticas_pool
+from src.utils    import cache, metricas
+
+rotas = Blueprint('metricas', __name__)
+
+TIPO_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@rotas.route('/api/metrics', methods=['GET'])
+def exportar_metricas() -> Response:
+    return Response(metricas.exportar(_medidores()), content_type=TIPO_PROMETHEUS)
+
+
+def _medidores() -> dict:
+    """Gauges de cache e do pool de conexões, lidos no momento da coleta."""
+    medidores = {
+        f'cache_{nome}': valor
+        for nome, valor in cache.estatisticas().items() if isinstance(valor, (int, float))
+    }
+
+    pool = estatisticas_pool()
+    for nome in ('em_uso', 'ociosas', 'overflow', 'conexoes_abertas', 'checkouts', 'timeouts',
+                 'espera_media_ms', 'espera_maxima_ms'):
+        if nome in pool:
+            medidores[f'banco_pool_{nome}'] = pool[nome]
+
+    return medidores
@@ -1,19 +1,155 @@
-from src.models import Vendas
-from src    import app, db
+from flask          import Blueprint, g, request, make_response, jsonify, Response
+from sqlalchemy.exc import SQLAlchemyError
+from src            import db
+from src.utils      import log_info, log_error, ler_paginacao, corpo_listagem, quer_stream, resposta_ndjson, ler_campos
+from src.utils      import LIMITE_MAXIMO
+from src.services   import VendasService, ResumoVendasService
 
+rotas = Blueprint('vendas', __name__)
 
-@app.route('/api/vendas', methods=['POST'])
-def adicionar_venda():
-    pass
 
-@app.route('/api/vendas/<int:id>', methods=['PUT'])
-def editar_venda(id):
-    pass
+@rotas.route('/api/vendas', methods=['POST'])
+def adicionar_venda() -> Response:
+    dados   = request.get_json()
+    service = VendasService()
 
-@app.route('/api/vendas/<int:id>', methods=['DELETE'])
-def excluir_venda(id):
-    pass
+    # Sem vendedor informado, a venda fica com o usuário autenticado.
+    if isinstance(dados, dict) and g.get('usuario'):
+        dados.setdefault('vendedor', g.usuario['sub'])
 
-@app.route('/api/vendas', methods=['GET'])
-def listar_vendas():
-    pass
\ No newline at end of file
+    try:
+        response, status = service.criar_venda(dados)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 404)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('adicionar_venda', erro)
+        return make_response(jsonify({'error': 'Erro ao registrar venda no banco de dados.'}), 500)
+
+
+@rotas.route('/api/vendas/<int:id>', methods=['PUT'])
+def editar_venda(id) -> Response:
+    dados   = request.get_json()
+    service = VendasService()
+    try:
+        response, status = service.atualizar_venda(id, dados)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 404)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('editar_venda', erro)
+        return make_response(jsonify({'error': 'Erro ao atualizar venda no banco de dados.'}), 500)
+
+
+@rotas.route('/api/vendas/<int:id>/cancelar', methods=['POST'])
+def cancelar_venda(id) -> Response:
+    service = VendasService()
+    try:
+        response, status = service.cancelar_venda(id)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 404)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('cancelar_venda', erro)
+        return make_response(jsonify({'error': 'Erro ao cancelar venda no banco de dados.'}), 500)
+
+
+@rotas.route('/api/vendas/<int:id>', methods=['DELETE'])
+def excluir_venda(id) -> Response:
+    service = VendasService()
+    try:
+        response, status = service.excluir_venda(id)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 404)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('excluir_venda', erro)
+        return make_response(jsonify({'error': 'Erro ao deletar venda do banco de dados.'}), 500)
+
+
+@rotas.route('/api/vendas', methods=['GET'])
+def listar_vendas() -> Response:
+    filtros = request.args.to_dict()
+    service = VendasService()
+    try:
+        campos = ler_campos(request.args, service.LISTAGEM)
+        if quer_stream(request):
+            return resposta_ndjson('listar_vendas', service.iterar_vendas(filtros, campos))
+
+        limite, apos, paginado = ler_paginacao(request.args)
+        pagina = service.listar_vendas(filtros, limite, apos, campos)
+        return make_response(jsonify(corpo_listagem(pagina, paginado)), 200)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except Exception as erro:
+        log_error('listar_vendas', erro)
+        return make_response(jsonify({'error': 'Erro ao listar vendas.'}), 500)
+
+
+@rotas.route('/api/vendas/<int:id>', methods=['GET'])
+def obter_venda(id) -> Response:
+    service = VendasService()
+    try:
+        response, status = service.obter_venda(id, ler_campos(request.args, service.LISTAGEM))
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('obter_venda', erro)
+        return make_response(jsonify({'error': 'Erro ao buscar venda.'}), 500)
+
+
+@rotas.route('/api/vendas/relatorios', methods=['GET'])
+def relatorio_vendas() -> Response:
+    service = ResumoVendasService()
+    try:
+        relatorio = service.relatorio(
+            request.args.get('agrupar', 'mes'), request.args.get('de'), request.args.get('ate')
+        )
+        return make_response(jsonify(relatorio), 200)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except Exception as erro:
+        log_error('relatorio_vendas', erro)
+        return make_response(jsonify({'error': 'Erro ao gerar relatório de vendas.'}), 500)
+
+
+@rotas.route('/api/vendas/changes', methods=['GET'])
+def alteracoes_vendas() -> Response:
+    service = VendasService()
+    try:
+        limite, _, _ = ler_paginacao(request.args)
+        if not request.args.get('limit'):
+            limite = LIMITE_MAXIMO
+
+        response, status = service.sincronia.alteracoes(
+            service.LISTAGEM, request.args.get('since'), limite, ler_campos(request.args, service.LISTAGEM)
+        )
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('alteracoes_vendas', erro)
+        return make_response(jsonify({'error': 'Erro ao listar alterações de vendas.'}), 500)
@@ -1,11 +1,14 @@
-from flask          import request, make_response, jsonify, Response
+from flask          import Blueprint, request, make_response, jsonify, Response
 from sqlalchemy.exc import SQLAlchemyError
-from src            import app, db
-from src.utils      import log_info, log_error
+from src            import db
+from src.utils      import log_info, log_error, ler_paginacao, corpo_listagem, quer_stream, resposta_ndjson, ler_campos
+from src.utils      import LIMITE_MAXIMO
 from src.services   import UsuariosService
 
+rotas = Blueprint('usuarios', __name__)
 
-@app.route('/api/usuarios', methods=['POST'])
+
+@rotas.route('/api/usuarios', methods=['POST'])
 def adicionar_usuario() -> Response:
     dados   = request.get_json()
     service = UsuariosService()
@@ -18,7 +21,7 @@ def adicionar_usuario() -> Response:
         return make_response(jsonify({'error': 'Erro ao adicionar usuário no banco de dados.'}), 500)
 
 
-@app.route('/api/usuarios/<int:id>', methods=['PUT'])
+@rotas.route('/api/usuarios/<int:id>', methods=['PUT'])
 def editar_usuario(id) -> Response:
     dados   = request.get_json()
     service = UsuariosService()
@@ -35,7 +38,7 @@ def editar_usuario(id) -> Response:
         return make_response(jsonify({'error': 'Erro ao atualizar usuário no banco de dados.'}), 500)
 
 
-@app.route('/api/usuarios/<int:id>', methods=['DELETE'])
+@rotas.route('/api/usuarios/<int:id>', methods=['DELETE'])
 def excluir_usuario(id) -> Response:
         service = UsuariosService()
         try:
@@ -51,13 +54,60 @@ def excluir_usuario(id) -> Response:
             return make_response(jsonify({'error': 'Erro ao deletar usuário do banco de dados.'}), 500)
 
 
-@app.route('/api/usuarios', methods=['GET'])
+@rotas.route('/api/usuarios', methods=['GET'])
 def listar_usuarios():
     termo   = request.args.get('busca', '')
     service = UsuariosService()
     try:
-        lista = service.listar_usuarios(termo)
-        return make_response(jsonify(lista), 200)
+        campos = ler_campos(request.args, service.LISTAGEM)
+        if quer_stream(request):
+            return resposta_ndjson('listar_usuarios', service.iterar_usuarios(termo, campos))
+
+        limite, apos, paginado = ler_paginacao(request.args)
+        pagina = service.listar_usuarios(termo, limite, apos, campos)
+        return make_response(jsonify(corpo_listagem(pagina, paginado)), 200)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
     except Exception as erro:
         log_error('listar_usuarios', erro)
-        return make_response(jsonify({'error': 'Erro ao listar usuários.'}), 500)
\ No newline at end of file
+        return make_response(jsonify({'error': 'Erro ao listar usuários.'}), 500)
+
+
+@rotas.route('/api/usuarios/<int:id>', methods=['GET'])
+def obter_usuario(id) -> Response:
+    service = UsuariosService()
+    try:
+        response, status = service.obter_usuario(id, ler_campos(request.args, service.LISTAGEM))
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('obter_usuario', erro)
+        return make_response(jsonify({'error': 'Erro ao buscar usuário.'}), 500)
+
+
+@rotas.route('/api/usuarios/changes', methods=['GET'])
+def alteracoes_usuarios() -> Response:
+    service = UsuariosService()
+    try:
+        limite, _, _ = ler_paginacao(request.args)
+        if not request.args.get('limit'):
+            limite = LIMITE_MAXIMO
+
+        response, status = service.sincronia.alteracoes(
+            service.LISTAGEM, request.args.get('since'), limite, ler_campos(request.args, service.LISTAGEM)
+        )
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('alteracoes_usuarios', erro)
+        return make_response(jsonify({'error': 'Erro ao listar alterações de usuários.'}), 500)
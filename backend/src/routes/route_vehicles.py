@@ -1,11 +1,15 @@
-from flask          import request, make_response, jsonify, Response
-from sqlalchemy.exc import SQLAlchemyError
-from src            import app, db
-from src.utils      import log_info, log_error
-from src.services   import VeiculosService
+from flask              import Blueprint, request, make_response, jsonify, Response
+from sqlalchemy.exc     import SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
+from src                import db
+from src.utils          import log_info, log_error, ler_paginacao, corpo_listagem, quer_stream, resposta_ndjson, ler_importacao
+from src.utils          import LIMITE_PADRAO, LIMITE_MAXIMO, ler_campos
+from src.services       import VeiculosService, ReservasService
 
+rotas = Blueprint('veiculos', __name__)
 
-@app.route('/api/veiculos', methods=['POST'])
+
+@rotas.route('/api/veiculos', methods=['POST'])
 def adicionar_veiculo()  -> Response:
     dados   = request.get_json()
     service = VeiculosService()
@@ -18,7 +22,40 @@ def adicionar_veiculo()  -> Response:
         return make_response(jsonify({'error': 'Erro ao adicionar veículo no banco de dados.'}), 500)
 
 
-@app.route('/api/veiculos/<int:id>', methods=['PUT'])
+@rotas.route('/api/veiculos/bulk', methods=['POST'])
+def importar_veiculos() -> Response:
+    service = VeiculosService()
+    try:
+        relatorio = service.importar_veiculos(ler_importacao(request))
+        return make_response(jsonify(relatorio), 200)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('importar_veiculos', erro)
+        return make_response(jsonify({'error': 'Erro ao importar veículos no banco de dados.'}), 500)
+
+
+@rotas.route('/api/veiculos', methods=['PATCH'])
+def editar_veiculos_em_lote() -> Response:
+    dados   = request.get_json()
+    service = VeiculosService()
+    try:
+        response, status = service.atualizar_em_lote(dados)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('editar_veiculos_em_lote', erro)
+        return make_response(jsonify({'error': 'Erro ao atualizar veículos no banco de dados.'}), 500)
+
+
+@rotas.route('/api/veiculos/<int:id>', methods=['PUT'])
 def editar_veiculo(id) -> Response:
     dados   = request.get_json()
     service = VeiculosService()
@@ -29,13 +66,17 @@ def editar_veiculo(id) -> Response:
     except ValueError as erro:
         return make_response(jsonify({'error': str(erro)}), 404)
 
+    except StaleDataError:
+        db.session.rollback()
+        return make_response(jsonify({'error': 'Veículo alterado por outra operação. Tente novamente.'}), 409)
+
     except SQLAlchemyError as erro:
         db.session.rollback()
         log_error('editar_veiculo', erro)
         return make_response(jsonify({'error': 'Erro ao atualizar veículo no banco de dados.'}), 500)
 
 
-@app.route('/api/veiculos/<int:id>', methods=['DELETE'])
+@rotas.route('/api/veiculos/<int:id>', methods=['DELETE'])
 def excluir_veiculo(id) -> Response:
         service = VeiculosService()
         try:
@@ -45,19 +86,139 @@ def excluir_veiculo(id) -> Response:
         except ValueError as erro:
             return make_response(jsonify({'error': str(erro)}), 404)
 
+        except StaleDataError:
+            db.session.rollback()
+            return make_response(jsonify({'error': 'Veículo alterado por outra operação. Tente novamente.'}), 409)
+
         except SQLAlchemyError as erro:
             db.session.rollback()
             log_error('excluir_veiculo', erro)
             return make_response(jsonify({'error': 'Erro ao deletar veículo do banco de dados.'}), 500)
 
 
-@app.route('/api/veiculos', methods=['GET'])
+@rotas.route('/api/veiculos/<int:id>/reserva', methods=['POST'])
+def reservar_veiculo(id) -> Response:
+    dados   = request.get_json()
+    service = ReservasService()
+    try:
+        response, status = service.reservar(id, dados)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 404)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('reservar_veiculo', erro)
+        return make_response(jsonify({'error': 'Erro ao reservar veículo no banco de dados.'}), 500)
+
+
+@rotas.route('/api/veiculos/<int:id>/reserva', methods=['GET'])
+def obter_reserva(id) -> Response:
+    service = ReservasService()
+    try:
+        response, status = service.obter(id)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 404)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('obter_reserva', erro)
+        return make_response(jsonify({'error': 'Erro ao consultar reserva.'}), 500)
+
+
+@rotas.route('/api/veiculos/<int:id>/reserva', methods=['DELETE'])
+def liberar_reserva(id) -> Response:
+    service = ReservasService()
+    try:
+        response, status = service.liberar(id)
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 404)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('liberar_reserva', erro)
+        return make_response(jsonify({'error': 'Erro ao liberar reserva no banco de dados.'}), 500)
+
+
+@rotas.route('/api/veiculos/busca', methods=['GET'])
+def buscar_veiculos() -> Response:
+    service = VeiculosService()
+    try:
+        limite, apos, _ = ler_paginacao(request.args)
+        if not request.args.get('limit'):
+            limite = LIMITE_PADRAO
+
+        pagina = service.buscar_veiculos(request.args, limite, apos, ler_campos(request.args, service.LISTAGEM))
+        return make_response(jsonify(pagina), 200)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('buscar_veiculos', erro)
+        return make_response(jsonify({'error': 'Erro ao buscar veículos.'}), 500)
+
+
+@rotas.route('/api/veiculos', methods=['GET'])
 def listar_veiculos():
     termo   = request.args.get('busca', '')
     service = VeiculosService()
     try:
-        lista = service.listar_veiculos(termo)
-        return make_response(jsonify(lista), 200)
+        campos = ler_campos(request.args, service.LISTAGEM)
+        if quer_stream(request):
+            return resposta_ndjson('listar_veiculos', service.iterar_veiculos(termo, campos))
+
+        limite, apos, paginado = ler_paginacao(request.args)
+        pagina = service.listar_veiculos(termo, limite, apos, campos)
+        return make_response(jsonify(corpo_listagem(pagina, paginado)), 200)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
     except Exception as erro:
         log_error('listar_veiculos', erro)
-        return make_response(jsonify({'error': 'Erro ao listar veículos.'}), 500)
\ No newline at end of file
+        return make_response(jsonify({'error': 'Erro ao listar veículos.'}), 500)
+
+
+@rotas.route('/api/veiculos/<int:id>', methods=['GET'])
+def obter_veiculo(id) -> Response:
+    service = VeiculosService()
+    try:
+        response, status = service.obter_veiculo(id, ler_campos(request.args, service.LISTAGEM))
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('obter_veiculo', erro)
+        return make_response(jsonify({'error': 'Erro ao buscar veículo.'}), 500)
+
+
+@rotas.route('/api/veiculos/changes', methods=['GET'])
+def alteracoes_veiculos() -> Response:
+    service = VeiculosService()
+    try:
+        limite, _, _ = ler_paginacao(request.args)
+        if not request.args.get('limit'):
+            limite = LIMITE_MAXIMO
+
+        response, status = service.sincronia.alteracoes(
+            service.LISTAGEM, request.args.get('since'), limite, ler_campos(request.args, service.LISTAGEM)
+        )
+        return make_response(jsonify(response), status)
+
+    except ValueError as erro:
+        return make_response(jsonify({'error': str(erro)}), 400)
+
+    except SQLAlchemyError as erro:
+        db.session.rollback()
+        log_error('alteracoes_veiculos', erro)
+        return make_response(jsonify({'error': 'Erro ao listar alterações de veículos.'}), 500)
\ No newline at end of file
@@ -1,3 +1,11 @@
-from .service_customers import ClientesService
-from .service_users     import UsuariosService
-from .service_vehicles  import VeiculosService
\ No newline at end of file
+from .service_customers        import ClientesService
+from .service_customer_balance import SaldosService
+from .service_users            import UsuariosService
+from .service_vehicles         import VeiculosService
+from .service_sales            import VendasService
+from .service_sales_summary    import ResumoVendasService
+from .service_sales_archive    import ArquivoVendasService
+from .service_sync             import SincroniaService
+from .service_auth             import AutenticacaoService, tokens, TokenInvalido, ACESSO, RENOVACAO
+from .service_events           import EventosService, Entrega
+from .service_reservations     import ReservasService, agendador_reservas
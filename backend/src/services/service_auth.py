@@ -0,0 +1,169 @@
+import hashlib
+import threading
+import time
+import uuid
+
+from datetime     import datetime, timedelta
+from flask        import current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from sqlalchemy   import select, delete
+from src          import db
+from src.models   import Usuarios, TokensRevogados
+from src.enums    import UsuariosStatusEnum
+from src.utils    import log_info, verificar_senha
+
+ACESSO    = 'acesso'
+RENOVACAO  = 'renovacao'
+
+
+class TokenInvalido(Exception):
+    pass
+
+
+class GerenciadorTokens:
+    """Tokens assinados (HMAC-SHA256) e com validade, sem estado no servidor.
+
+    Validar um token de acesso é verificar a assinatura e a idade: não há
+    consulta a USUARIOS. A lista de revogação fica na tabela TOKENS_REVOGADOS
+    e é espelhada em memória, sincronizada a cada REVOGACAO_SINCRONIA
+    segundos; como o token de acesso dura pouco, esse atraso é aceitável. Já
+    o token de renovação é sempre conferido direto no banco.
+    """
+
+    def __init__(self) -> None:
+        self._revogados      = set()
+        self._sincronizado   = 0.0
+        self._trava          = threading.Lock()
+        self._serializadores = {}
+
+    def _serializador(self, tipo: str) -> URLSafeTimedSerializer:
+        chave = (current_app.config['SECRET_KEY'], tipo)
+        if chave not in self._serializadores:
+            self._serializadores[chave] = URLSafeTimedSerializer(
+                chave[0],
+                salt          = f'token-{tipo}',
+                signer_kwargs = {'digest_method': hashlib.sha256}
+            )
+        return self._serializadores[chave]
+
+    def _validade(self, tipo: str) -> int:
+        if tipo == ACESSO:
+            return int(current_app.config['TOKEN_ACESSO_MINUTOS']) * 60
+        return int(current_app.config['TOKEN_RENOVACAO_DIAS']) * 86400
+
+    def emitir(self, tipo: str, dados: dict) -> tuple[str, int]:
+        payload = {**dados, 'jti': uuid.uuid4().hex}
+        return self._serializador(tipo).dumps(payload), self._validade(tipo)
+
+    def validar(self, tipo: str, token: str, consultar_banco: bool = False) -> dict:
+        try:
+            payload, emitido_em = self._serializador(tipo).loads(
+                token, max_age=self._validade(tipo), return_timestamp=True
+            )
+        except SignatureExpired:
+            raise TokenInvalido('Token expirado.')
+        except BadSignature:
+            raise TokenInvalido('Token inválido.')
+
+        if self._revogado(payload['jti'], consultar_banco):
+            raise TokenInvalido('Token revogado.')
+
+        payload['exp'] = emitido_em.replace(tzinfo=None) + timedelta(seconds=self._validade(tipo))
+        return payload
+
+    def revogar(self, payload: dict) -> None:
+        """Adiciona o token à lista de revogação (na transação corrente)."""
+        db.session.merge(TokensRevogados(payload['jti'], payload['exp']))
+        db.session.execute(delete(TokensRevogados).where(TokensRevogados.TOK_EXPIRA_EM < datetime.utcnow()))
+
+        with self._trava:
+            self._revogados.add(payload['jti'])
+
+    def _revogado(self, jti: str, consultar_banco: bool) -> bool:
+        if consultar_banco:
+            return db.session.get(TokensRevogados, jti) is not None
+
+        intervalo = float(current_app.config.get('REVOGACAO_SINCRONIA', 10))
+        if time.monotonic() - self._sincronizado > intervalo:
+            self._sincronizar()
+
+        return jti in self._revogados
+
+    def _sincronizar(self) -> None:
+        jtis = set(db.session.scalars(
+            select(TokensRevogados.TOK_JTI).where(TokensRevogados.TOK_EXPIRA_EM >= datetime.utcnow())
+        ))
+
+        with self._trava:
+            self._revogados    = jtis
+            self._sincronizado = time.monotonic()
+
+
+
+tokens = GerenciadorTokens()
+
+
+class AutenticacaoService:
+    def __init__(self) -> None:
+        pass
+
+    def login(self, email: str, senha: str) -> tuple[dict, int]:
+        usuario = db.session.scalars(select(Usuarios).where(Usuarios.USU_EMAIL == email)).first()
+
+        if not usuario:
+            return {'error': 'Usuário não encontrado.'}, 404
+
+        if not verificar_senha(usuario.USU_SENHA, senha):
+            return {'error': 'Senha incorreta.'}, 401
+
+        if usuario.USU_STATUS != UsuariosStatusEnum.Ativo:
+            return {'error': 'Usuário inativo ou bloqueado.'}, 403
+
+        log_info('login', 'Login realizado para o usuário %s.', usuario.USU_CODIGO)
+        return self._par_de_tokens(usuario), 200
+
+    def renovar(self, token_renovacao: str) -> tuple[dict, int]:
+        """Troca um token de renovação válido por um novo par (rotação)."""
+        try:
+            payload = tokens.validar(RENOVACAO, token_renovacao, consultar_banco=True)
+        except TokenInvalido as erro:
+            return {'error': str(erro)}, 401
+
+        usuario = db.session.get(Usuarios, payload['sub'])
+        if not usuario or usuario.USU_STATUS != UsuariosStatusEnum.Ativo:
+            return {'error': 'Usuário inativo ou bloqueado.'}, 401
+
+        tokens.revogar(payload)
+        db.session.commit()
+        return self._par_de_tokens(usuario), 200
+
+    def logout(self, token_acesso: str = None, token_renovacao: str = None) -> tuple[dict, int]:
+        for tipo, token in ((ACESSO, token_acesso), (RENOVACAO, token_renovacao)):
+            if not token:
+                continue
+            try:
+                tokens.revogar(tokens.validar(tipo, token))
+            except TokenInvalido:
+                pass
+
+        db.session.commit()
+        return {'message': 'Logout realizado com sucesso.'}, 200
+
+    def _par_de_tokens(self, usuario: Usuarios) -> dict:
+        dados = {'sub': usuario.USU_CODIGO, 'nome': usuario.USU_NOME, 'tipo': usuario.USU_TIPO.value}
+
+        acesso, expira_em = tokens.emitir(ACESSO,    dados)
+        renovacao, _      = tokens.emitir(RENOVACAO, {'sub': usuario.USU_CODIGO})
+
+        return {
+            'access_token'  : acesso,
+            'refresh_token' : renovacao,
+            'token_type'    : 'Bearer',
+            'expires_in'    : expira_em,
+            'usuario'       : {
+                'id'    : usuario.USU_CODIGO,
+                'nome'  : usuario.USU_NOME,
+                'email' : usuario.USU_EMAIL,
+                'tipo'  : usuario.USU_TIPO.value
+            }
+        }
@@ -0,0 +1,285 @@
+from datetime       import date, datetime, time, timedelta
+from decimal        import Decimal
+from sqlalchemy     import select, insert, update, func, literal
+from src            import db
+from src.models     import Clientes, Vendas, MovimentosSaldo, FechamentosSaldo
+from src.enums      import MovimentoSaldoTipoEnum, EventoTipoEnum
+from src.utils      import log_info, paginar, para_data
+from src.utils      import LIMITE_PADRAO, Serializador, Esquema, Campo, corpo_erros
+from .service_events import EventosService
+
+
+class SaldosService:
+    """Saldo dos clientes como livro de lançamentos.
+
+    Cada crédito ou débito é um INSERT em MOVIMENTOS_SALDO mais um
+    `UPDATE CLIENTES SET CLI_SALDO = CLI_SALDO + :delta` na mesma transação.
+    Nada é lido antes de ser escrito, então dois caixas lançando no mesmo
+    cliente não perdem o lançamento um do outro. O débito só passa se o
+    saldo cobrir o valor: a condição fica no WHERE do UPDATE, como na baixa
+    do veículo numa venda.
+    """
+    EXTRATO    = Serializador({
+        'id'        : MovimentosSaldo.MOV_CODIGO,
+        'tipo'      : MovimentosSaldo.MOV_TIPO,
+        'valor'     : MovimentosSaldo.MOV_VALOR,
+        'descricao' : MovimentosSaldo.MOV_DESCRICAO,
+        'venda'     : MovimentosSaldo.VEN_CODIGO,
+        'usuario'   : MovimentosSaldo.USU_CODIGO,
+        'data'      : MovimentosSaldo.MOV_DATA,
+    })
+    LANCAMENTO = Esquema({
+        'tipo'      : Campo(MovimentosSaldo.MOV_TIPO,      obrigatorio=True),
+        'valor'     : Campo(MovimentosSaldo.MOV_VALOR,     obrigatorio=True),
+        'descricao' : Campo(MovimentosSaldo.MOV_DESCRICAO),
+        'venda'     : Campo(MovimentosSaldo.VEN_CODIGO,    minimo=1),
+    })
+
+    def __init__(self) -> None:
+        self.eventos = EventosService()
+
+    def lancar(self, cliente_cod: int, dados: dict, usuario_cod: int = None) -> tuple[dict, int]:
+        """Lançamento avulso: `tipo` (Credito/Debito), `valor` positivo e,
+        opcionais, `descricao` e `venda` (uma venda do próprio cliente)."""
+        valores, erros = self.LANCAMENTO.validar(dados)
+        if erros:
+            return corpo_erros(erros), 400
+
+        tipo      = valores['MOV_TIPO']
+        valor     = valores['MOV_VALOR']
+        venda_cod = valores.get('VEN_CODIGO')
+
+        if valor <= 0:
+            return {'error': 'Valor deve ser positivo.'}, 400
+
+        if venda_cod is not None:
+            dono = db.session.scalar(select(Vendas.CLI_CODIGO).where(Vendas.VEN_CODIGO == venda_cod))
+            if dono is None:
+                raise ValueError('Venda não encontrada.')
+            if dono != cliente_cod:
+                return {'error': 'A venda é de outro cliente.'}, 400
+
+        delta      = valor if tipo == MovimentoSaldoTipoEnum.Credito else -valor
+        lancamento = self.movimentar(cliente_cod, delta, valores.get('MOV_DESCRICAO'), venda_cod, usuario_cod)
+
+        if lancamento is None:
+            return self._sem_saldo(cliente_cod)
+
+        codigo, saldo = lancamento
+        db.session.commit()
+
+        log_info('lancar_saldo', 'Lançamento %s de %s no cliente %s.', codigo, delta, cliente_cod)
+        return {'message': 'Lançamento registrado com sucesso.', 'id': codigo, 'saldo': float(saldo)}, 201
+
+    def movimentar(
+        self,
+        cliente_cod : int,
+        delta       : Decimal,
+        descricao   : str = None,
+        venda_cod   : int = None,
+        usuario_cod : int = None
+    ) -> tuple[int, Decimal] | None:
+        """Aplica `delta` ao saldo e grava o lançamento, na transação corrente.
+
+        Retorna o código do lançamento e o saldo resultante, ou None quando o
+        cliente não existe ou (débito) o saldo não cobre o valor; nesse caso
+        nada foi escrito.
+        """
+        saldo     = func.coalesce(Clientes.CLI_SALDO, 0)
+        atualizar = (
+            update(Clientes)
+            .where(Clientes.CLI_CODIGO == cliente_cod)
+            .values(CLI_SALDO=saldo + delta)
+            .returning(Clientes.CLI_SALDO, Clientes.CLI_STATUS)
+            .execution_options(synchronize_session=False)
+        )
+        if delta < 0:
+            atualizar = atualizar.where(saldo + delta >= 0)
+
+        novo = db.session.execute(atualizar).first()
+        if novo is None:
+            return None
+        self.eventos.registrar(Clientes, EventoTipoEnum.Alterado, [(cliente_cod, novo.CLI_STATUS)])
+
+        codigo = db.session.execute(
+            insert(MovimentosSaldo).returning(MovimentosSaldo.MOV_CODIGO),
+            [self._lancamento(cliente_cod, delta, descricao, venda_cod, usuario_cod)]
+        ).scalar()
+        return codigo, novo.CLI_SALDO
+
+    def abrir(self, saldos: list[tuple[int, Decimal]]) -> None:
+        """Lançamento de abertura de clientes que já nasceram com saldo.
+
+        CLI_SALDO já foi gravado no INSERT do cliente; aqui só entra no
+        livro a origem desse valor, para que a soma dos lançamentos feche.
+        """
+        linhas = [
+            self._lancamento(cliente_cod, Decimal(saldo), 'Saldo inicial')
+            for cliente_cod, saldo in saldos if saldo
+        ]
+        if linhas:
+            db.session.execute(insert(MovimentosSaldo), linhas)
+
+    def estornar_venda(self, venda: Vendas) -> None:
+        """Devolve ao cliente o que a venda movimentou no saldo (cancelamento)."""
+        liquido = db.session.scalar(
+            select(func.sum(MovimentosSaldo.MOV_VALOR)).where(MovimentosSaldo.VEN_CODIGO == venda.VEN_CODIGO)
+        )
+        if liquido:
+            self.movimentar(venda.CLI_CODIGO, -liquido, f'Estorno da venda {venda.VEN_CODIGO}', venda.VEN_CODIGO)
+
+    def recobrar_venda(self, venda: Vendas) -> bool:
+        """Desfaz o último estorno da venda (reativação de uma venda cancelada).
+
+        Retorna False quando o saldo do cliente já não cobre o débito; nesse
+        caso nada foi escrito.
+        """
+        estorno = db.session.scalar(
+            select(MovimentosSaldo.MOV_VALOR)
+            .where(
+                MovimentosSaldo.VEN_CODIGO    == venda.VEN_CODIGO,
+                MovimentosSaldo.MOV_DESCRICAO == f'Estorno da venda {venda.VEN_CODIGO}'
+            )
+            .order_by(MovimentosSaldo.MOV_CODIGO.desc())
+            .limit(1)
+        )
+        if not estorno:
+            return True
+
+        descricao = f'Pagamento da venda {venda.VEN_CODIGO}'
+        return self.movimentar(venda.CLI_CODIGO, -estorno, descricao, venda.VEN_CODIGO) is not None
+
+    def tem_lancamentos(self, venda_cod: int = None, cliente_cod: int = None) -> bool:
+        consulta = select(MovimentosSaldo.MOV_CODIGO)
+        if venda_cod is not None:
+            consulta = consulta.where(MovimentosSaldo.VEN_CODIGO == venda_cod)
+        if cliente_cod is not None:
+            consulta = consulta.where(MovimentosSaldo.CLI_CODIGO == cliente_cod)
+        return db.session.scalar(consulta.limit(1)) is not None
+
+    def saldo(self, cliente_cod: int, data: str = None) -> tuple[dict, int]:
+        """Saldo corrente ou, com `data`, no fim daquele dia (UTC).
+
+        O saldo numa data é o do último fechamento até ela mais os
+        lançamentos entre o fechamento e o fim do dia pedido.
+        """
+        cliente = db.session.execute(select(Clientes.CLI_SALDO).where(Clientes.CLI_CODIGO == cliente_cod)).first()
+        if cliente is None:
+            return {'error': 'Cliente não encontrado.'}, 404
+
+        if not data:
+            return {'cliente': cliente_cod, 'saldo': float(cliente.CLI_SALDO or 0), 'data': None}, 200
+
+        dia        = para_data(data)
+        fechamento = db.session.execute(
+            select(FechamentosSaldo.FEC_DATA, FechamentosSaldo.FEC_SALDO)
+            .where(FechamentosSaldo.CLI_CODIGO == cliente_cod, FechamentosSaldo.FEC_DATA <= dia)
+            .order_by(FechamentosSaldo.FEC_DATA.desc())
+            .limit(1)
+        ).first()
+
+        consulta = select(func.coalesce(func.sum(MovimentosSaldo.MOV_VALOR), 0)).where(
+            MovimentosSaldo.CLI_CODIGO == cliente_cod,
+            MovimentosSaldo.MOV_DATA < self._fim_do_dia(dia)
+        )
+        base = Decimal('0.00')
+        if fechamento:
+            base     = fechamento.FEC_SALDO
+            consulta = consulta.where(MovimentosSaldo.MOV_DATA >= self._fim_do_dia(fechamento.FEC_DATA))
+
+        saldo = base + Decimal(db.session.scalar(consulta))
+        return {'cliente': cliente_cod, 'saldo': float(saldo), 'data': dia.isoformat()}, 200
+
+    def extrato(
+        self,
+        cliente_cod : int,
+        limite      : int   = LIMITE_PADRAO,
+        apos        : str   = None,
+        campos      : tuple = None
+    ) -> tuple[dict, int]:
+        """Lançamentos do cliente, do mais antigo para o mais recente."""
+        if db.session.scalar(select(Clientes.CLI_CODIGO).where(Clientes.CLI_CODIGO == cliente_cod)) is None:
+            return {'error': 'Cliente não encontrado.'}, 404
+
+        listagem        = self.EXTRATO.restringir(campos)
+        consulta        = listagem.consulta().where(MovimentosSaldo.CLI_CODIGO == cliente_cod)
+        linhas, proximo = paginar(consulta, MovimentosSaldo.MOV_CODIGO, limite, apos)
+
+        return {
+            'dados'       : listagem.listar(linhas),
+            'next_cursor' : proximo
+        }, 200
+
+    def fechar(self, ate: date = None) -> int:
+        """Grava o fechamento do dia `ate` (padrão: ontem, UTC).
+
+        Só entram os clientes com lançamentos depois do último fechamento, e
+        cada saldo é o fechamento anterior do cliente mais esses lançamentos.
+        O dia corrente não pode ser fechado, porque ainda recebe lançamentos.
+        Retorna o número de clientes fechados.
+        """
+        ate    = ate or datetime.utcnow().date() - timedelta(days=1)
+        ultimo = db.session.scalar(select(func.max(FechamentosSaldo.FEC_DATA)))
+
+        if ate >= datetime.utcnow().date():
+            raise ValueError('Só dias encerrados podem ser fechados.')
+        if ultimo and ate <= ultimo:
+            raise ValueError(f'Saldos já fechados até {ultimo.isoformat()}.')
+
+        anterior = (
+            select(FechamentosSaldo.FEC_SALDO)
+            .where(FechamentosSaldo.CLI_CODIGO == MovimentosSaldo.CLI_CODIGO)
+            .order_by(FechamentosSaldo.FEC_DATA.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        consulta = (
+            select(
+                MovimentosSaldo.CLI_CODIGO,
+                literal(ate),
+                func.coalesce(anterior, 0) + func.sum(MovimentosSaldo.MOV_VALOR),
+                func.max(MovimentosSaldo.MOV_CODIGO)
+            )
+            .where(MovimentosSaldo.MOV_DATA < self._fim_do_dia(ate))
+            .group_by(MovimentosSaldo.CLI_CODIGO)
+        )
+        if ultimo:
+            consulta = consulta.where(MovimentosSaldo.MOV_DATA >= self._fim_do_dia(ultimo))
+
+        resultado = db.session.execute(
+            insert(FechamentosSaldo).from_select(['CLI_CODIGO', 'FEC_DATA', 'FEC_SALDO', 'MOV_CODIGO'], consulta)
+        )
+        db.session.commit()
+
+        log_info('fechar_saldos', 'Saldos de %s clientes fechados em %s.', resultado.rowcount, ate.isoformat())
+        return resultado.rowcount
+
+    def _sem_saldo(self, cliente_cod: int) -> tuple[dict, int]:
+        db.session.rollback()
+
+        if not db.session.get(Clientes, cliente_cod):
+            raise ValueError('Cliente não encontrado.')
+
+        return {'error': 'Saldo insuficiente.'}, 409
+
+    @staticmethod
+    def _lancamento(
+        cliente_cod : int,
+        delta       : Decimal,
+        descricao   : str = None,
+        venda_cod   : int = None,
+        usuario_cod : int = None
+    ) -> dict:
+        return {
+            'CLI_CODIGO'    : cliente_cod,
+            'VEN_CODIGO'    : venda_cod,
+            'USU_CODIGO'    : usuario_cod,
+            'MOV_TIPO'      : MovimentoSaldoTipoEnum.Credito if delta >= 0 else MovimentoSaldoTipoEnum.Debito,
+            'MOV_VALOR'     : delta,
+            'MOV_DESCRICAO' : descricao,
+            'MOV_DATA'      : datetime.utcnow(),
+        }
+
+    @staticmethod
+    def _fim_do_dia(dia: date) -> datetime:
+        return datetime.combine(dia + timedelta(days=1), time.min)
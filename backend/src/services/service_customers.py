@@ -1,40 +1,61 @@
-from sqlalchemy.exc import SQLAlchemyError
+from typing         import Iterable, Iterator
+from sqlalchemy     import select, insert, update
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from src            import db
-from src.models     import Clientes
-from src.enums      import ClienteStatusEnum
-from src.utils      import log_info, log_error, validar_enum, remover_acentos
+from src.models     import Clientes, indice_clientes
+from src.enums      import ClienteStatusEnum, EventoTipoEnum
+from src.utils      import log_info, log_error, validar_enum, paginar, LIMITE_PADRAO, LOTE_STREAM, em_cache
+from src.utils      import em_lotes, ler_ids, Serializador, Esquema, Campo, corpo_erros, resumir_erros
+from .service_customer_balance import SaldosService
+from .service_sync             import SincroniaService
+from .service_events           import EventosService
 
 
 class ClientesService:
+    FILTROS_LOTE = {'status': Clientes.CLI_STATUS, 'cidade': Clientes.CLI_CIDADE, 'uf': Clientes.CLI_UF}
+    LISTAGEM     = Serializador({
+        'id'       : Clientes.CLI_CODIGO,
+        'nome'     : Clientes.CLI_NOME,
+        'cpf'      : Clientes.CLI_CPF,
+        'telefone' : Clientes.CLI_TELEFONE,
+        'email'    : Clientes.CLI_EMAIL,
+        'cep'      : Clientes.CLI_CEP,
+        'endereco' : Clientes.CLI_ENDERECO,
+        'cidade'   : Clientes.CLI_CIDADE,
+        'uf'       : Clientes.CLI_UF,
+        'saldo'    : Clientes.CLI_SALDO,
+        'status'   : Clientes.CLI_STATUS,
+    })
+    ESQUEMA      = Esquema({
+        'nome'     : Campo(Clientes.CLI_NOME,     obrigatorio=True),
+        'cpf'      : Campo(Clientes.CLI_CPF,      obrigatorio=True),
+        'telefone' : Campo(Clientes.CLI_TELEFONE, obrigatorio=True),
+        'email'    : Campo(Clientes.CLI_EMAIL,    padrao=''),
+        'cep'      : Campo(Clientes.CLI_CEP,      padrao=''),
+        'endereco' : Campo(Clientes.CLI_ENDERECO, padrao=''),
+        'cidade'   : Campo(Clientes.CLI_CIDADE,   padrao=''),
+        'uf'       : Campo(Clientes.CLI_UF,       padrao='', ajuste=str.upper),
+        'saldo'    : Campo(Clientes.CLI_SALDO,    padrao=0),
+        'status'   : Campo(Clientes.CLI_STATUS,   obrigatorio=True),
+    })
+
     def __init__(self) -> None:
-        pass
+        self.saldos    = SaldosService()
+        self.sincronia = SincroniaService()
+        self.eventos   = EventosService()
         
     def criar_cliente(self, dados: dict) -> tuple[dict, int]:
-        obrigatorios = ['nome', 'cpf', 'telefone', 'status']
-        
-        if not dados or not all(dados.get(campo) for campo in obrigatorios):
-            return {'error': 'Campos obrigatórios ausentes.'}, 400
+        valores, erros = self.ESQUEMA.validar(dados)
+        if erros:
+            return corpo_erros(erros), 400
 
-        status_rmv = remover_acentos(dados['status'])
-        status     = validar_enum(ClienteStatusEnum, status_rmv)
-        
-        if not status:
-            return {'error': 'Status inválido.'}, 400
-        
         try:
-            cliente = Clientes(
-                nome     = dados['nome'],
-                cpf      = dados['cpf'],
-                telefone = dados['telefone'],
-                email    = dados.get('email', ''),
-                cep      = dados.get('cep', ''),
-                endereco = dados.get('endereco', ''),
-                cidade   = dados.get('cidade', ''),
-                uf       = dados.get('uf', ''),
-                saldo    = dados.get('saldo', 0.00),
-                status   = status
-            )
+            cliente = Clientes(**self.ESQUEMA.argumentos(valores))
             db.session.add(cliente)
+            db.session.flush()
+
+            self.saldos.abrir([(cliente.CLI_CODIGO, valores['CLI_SALDO'])])
+            indice_clientes.indexar(cliente, novos=True)
             db.session.commit()
             
             log_info('criar_cliente', 'Cliente adicionado com sucesso.')
@@ -49,27 +70,24 @@ class ClientesService:
 
         if not cliente:
             raise ValueError('Cliente não encontrado.')
-    
-        status = None
-        if 'status' in dados:
-            status_rmv = remover_acentos(dados['status'])
-            status = validar_enum(ClienteStatusEnum, status_rmv)
-            if not status:
-                return {'error': 'Status inválido.'}, 400
-        
-        if 'nome'     in dados: cliente.CLI_NOME     = dados['nome']
-        if 'cpf'      in dados: cliente.CLI_CPF      = dados['cpf']
-        if 'telefone' in dados: cliente.CLI_TELEFONE = dados['telefone']
-        if 'email'    in dados: cliente.CLI_EMAIL    = dados['email']
-        if 'cep'      in dados: cliente.CLI_CEP      = dados['cep']
-        if 'endereco' in dados: cliente.CLI_ENDERECO = dados['endereco']
-        if 'cidade'   in dados: cliente.CLI_CIDADE   = dados['cidade']
-        if 'uf'       in dados: cliente.CLI_UF       = dados['uf']
-        if 'saldo'    in dados: cliente.CLI_SALDO    = dados['saldo']
-        if 'status'   in dados: cliente.CLI_STATUS   = status
+
+        # O saldo só muda por lançamento (POST /api/clientes/<id>/saldo), que
+        # soma no banco em vez de sobrescrever o valor lido pelo cliente HTTP.
+        if 'saldo' in dados:
+            return {'error': 'O saldo é alterado por lançamentos de crédito e débito.'}, 400
+
+        valores, erros = self.ESQUEMA.validar(dados, parcial=True)
+        if erros:
+            return corpo_erros(erros), 400
+
+        for coluna, valor in valores.items():
+            setattr(cliente, coluna, valor)
+
+        if valores.keys() & {'CLI_NOME', 'CLI_CPF', 'CLI_EMAIL'}:
+            indice_clientes.indexar(cliente)
 
         db.session.commit()
-        log_info('atualizar_cliente', f'Cliente ID {id} atualizado com sucesso.')
+        log_info('atualizar_cliente', 'Cliente ID %s atualizado com sucesso.', id)
         return {'message': 'Cliente atualizado com sucesso.'}, 200
 
     def excluir_cliente(self, id: int) -> tuple[dict, int]:
@@ -78,35 +96,181 @@ class ClientesService:
         if not cliente:
             raise ValueError('Cliente não encontrado.')
 
+        if self.saldos.tem_lancamentos(cliente_cod=id):
+            return {'error': 'Cliente com lançamentos de saldo não pode ser excluído.'}, 409
+
         db.session.delete(cliente)
+        indice_clientes.remover(id)
+        self.sincronia.registrar_exclusao(Clientes, id)
         db.session.commit()
 
-        log_info('excluir_cliente', f'Cliente {id} deletado com sucesso.')
+        log_info('excluir_cliente', 'Cliente %s deletado com sucesso.', id)
         return {'message': 'Cliente deletado com sucesso.'}, 200
     
-    def listar_clientes(self, termo: str = '') -> list[dict]:
-        termo    = termo.lower()
-        clientes = Clientes.query.all()
-
-        lista = []
-        for cliente in clientes:
-            if (
-                termo in cliente.CLI_NOME.lower() or
-                termo in cliente.CLI_CPF.lower() or 
-                termo in cliente.CLI_EMAIL.lower()
-            ):
-                lista.append({
-                    'id'       : cliente.CLI_CODIGO,
-                    'nome'     : cliente.CLI_NOME,
-                    'cpf'      : cliente.CLI_CPF,
-                    'telefone' : cliente.CLI_TELEFONE,
-                    'email'    : cliente.CLI_EMAIL,
-                    'cep'      : cliente.CLI_CEP,
-                    'endereco' : cliente.CLI_ENDERECO,
-                    'cidade'   : cliente.CLI_CIDADE,
-                    'uf'       : cliente.CLI_UF,
-                    'saldo'    : float(cliente.CLI_SALDO),
-                    'status'   : cliente.CLI_STATUS.value
-                })
-
-        return lista
\ No newline at end of file
+    def atualizar_em_lote(self, dados: dict) -> tuple[dict, int]:
+        """Muda o status de vários clientes com um único UPDATE.
+
+        `ids` e/ou `filtro` (status, cidade, uf; cada um valor ou lista)
+        escolhem os clientes e `alteracoes` traz o novo status.
+        """
+        if not dados:
+            return {'error': 'Informe ids ou filtro e as alterações.'}, 400
+
+        alteracoes = dados.get('alteracoes')
+        if not isinstance(alteracoes, dict) or not alteracoes:
+            raise ValueError('Informe as alterações.')
+
+        invalidos = alteracoes.keys() - {'status'}
+        if invalidos:
+            raise ValueError(f"Campo não pode ser alterado em lote: {', '.join(sorted(invalidos))}.")
+
+        valores, erros = self.ESQUEMA.validar(alteracoes, parcial=True)
+        if erros:
+            raise ValueError(resumir_erros(erros))
+        status = valores['CLI_STATUS']
+
+        codigos = db.session.scalars(
+            update(Clientes)
+            .where(*self._condicoes_lote(dados))
+            .values(CLI_STATUS=status)
+            .returning(Clientes.CLI_CODIGO)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.eventos.registrar(Clientes, EventoTipoEnum.Alterado, ((codigo, status) for codigo in codigos))
+        db.session.commit()
+
+        log_info('atualizar_clientes_em_lote', '%s clientes atualizados em lote.', len(codigos))
+        return {'message': 'Clientes atualizados com sucesso.', 'atualizados': len(codigos)}, 200
+
+    def _condicoes_lote(self, dados: dict) -> list:
+        condicoes = []
+        if 'ids' in dados:
+            condicoes.append(Clientes.CLI_CODIGO.in_(ler_ids(dados['ids'])))
+
+        filtro = dados.get('filtro') or {}
+        if not isinstance(filtro, dict):
+            raise ValueError('filtro deve ser um objeto.')
+
+        for nome, valor in filtro.items():
+            if nome not in self.FILTROS_LOTE:
+                raise ValueError(f'Filtro inválido: {nome}.')
+
+            valores = valor if isinstance(valor, list) else [valor]
+            if nome == 'status':
+                membros = [validar_enum(ClienteStatusEnum, item) for item in valores]
+                if not all(membros):
+                    raise ValueError('Status inválido.')
+                valores = membros
+
+            condicoes.append(self.FILTROS_LOTE[nome].in_(valores))
+
+        if not condicoes:
+            raise ValueError('Informe ids ou filtro.')
+        return condicoes
+
+    def importar_clientes(self, linhas: Iterable[tuple[int, dict]]) -> dict:
+        """Importação em lote: valida cada bloco de linhas, insere com um único
+        INSERT multi-linha e faz um commit por bloco. Linhas inválidas entram
+        no relatório de erros sem interromper o restante do arquivo."""
+        relatorio = {'total': 0, 'inseridos': 0, 'erros': []}
+
+        for lote in em_lotes(linhas):
+            relatorio['total'] += len(lote)
+
+            validos, erros = self.ESQUEMA.validar_lote(lote)
+            relatorio['erros'].extend(erros)
+
+            validos = self._descartar_cpfs_repetidos(validos, relatorio['erros'])
+            relatorio['inseridos'] += self._inserir_lote(validos, relatorio['erros'])
+
+        relatorio['erros'].sort(key=lambda erro: erro['linha'])
+
+        log_info('importar_clientes', '%s de %s clientes importados.', relatorio['inseridos'], relatorio['total'])
+        return relatorio
+
+    def _descartar_cpfs_repetidos(self, validos: list, erros: list) -> list:
+        cpfs       = [valores['CLI_CPF'] for _, valores in validos]
+        existentes = set(db.session.scalars(select(Clientes.CLI_CPF).where(Clientes.CLI_CPF.in_(cpfs))))
+        restantes  = []
+
+        for numero, valores in validos:
+            if valores['CLI_CPF'] in existentes:
+                erros.append({'linha': numero, 'error': f"CPF {valores['CLI_CPF']} já cadastrado."})
+                continue
+            existentes.add(valores['CLI_CPF'])
+            restantes.append((numero, valores))
+
+        return restantes
+
+    def _inserir_lote(self, validos: list, erros: list) -> int:
+        if not validos:
+            return 0
+
+        inserir = insert(Clientes).returning(
+            Clientes.CLI_CODIGO, Clientes.CLI_NOME, Clientes.CLI_CPF, Clientes.CLI_EMAIL, Clientes.CLI_SALDO, Clientes.CLI_STATUS
+        )
+        try:
+            linhas = db.session.execute(inserir, [valores for _, valores in validos]).all()
+            indice_clientes.indexar(*linhas, novos=True)
+            self.saldos.abrir([(linha.CLI_CODIGO, linha.CLI_SALDO) for linha in linhas])
+            self.eventos.registrar(Clientes, EventoTipoEnum.Criado, ((linha.CLI_CODIGO, linha.CLI_STATUS) for linha in linhas))
+            db.session.commit()
+            return len(linhas)
+
+        except IntegrityError:
+            # Outra requisição cadastrou um dos CPFs entre a checagem e o
+            # INSERT: refaz o bloco linha a linha para achar quem falhou.
+            db.session.rollback()
+
+        inseridos = 0
+        for numero, valores in validos:
+            try:
+                with db.session.begin_nested():
+                    linha = db.session.execute(inserir, valores).one()
+                    indice_clientes.indexar(linha, novos=True)
+                    self.saldos.abrir([(linha.CLI_CODIGO, linha.CLI_SALDO)])
+                self.eventos.registrar(Clientes, EventoTipoEnum.Criado, [(linha.CLI_CODIGO, linha.CLI_STATUS)])
+                inseridos += 1
+            except IntegrityError:
+                erros.append({'linha': numero, 'error': f"CPF {valores['CLI_CPF']} já cadastrado."})
+
+        db.session.commit()
+        return inseridos
+
+    def obter_cliente(self, id: int, campos: tuple = None) -> tuple[dict, int]:
+        cliente = self.LISTAGEM.restringir(campos).obter(id)
+
+        if cliente is None:
+            return {'error': 'Cliente não encontrado.'}, 404
+        return cliente, 200
+
+    @em_cache(Clientes)
+    def listar_clientes(self, termo: str = '', limite: int = LIMITE_PADRAO, apos: str = None, campos: tuple = None) -> dict:
+        listagem = self.LISTAGEM.restringir(campos)
+
+        if termo.strip():
+            codigos, proximo = indice_clientes.buscar(termo, limite, apos)
+            dados            = listagem.por_codigos(codigos)
+        else:
+            linhas, proximo = paginar(listagem.consulta(), Clientes.CLI_CODIGO, limite, apos)
+            dados           = listagem.listar(linhas)
+
+        return {
+            'dados'       : dados,
+            'next_cursor' : proximo
+        }
+
+    def iterar_clientes(self, termo: str = '', campos: tuple = None) -> Iterator[dict]:
+        """Mesma listagem de listar_clientes, lida em lotes para o modo streaming."""
+        listagem = self.LISTAGEM.restringir(campos)
+
+        if termo.strip():
+            apos = None
+            while True:
+                codigos, apos = indice_clientes.buscar(termo, LOTE_STREAM, apos)
+                yield from listagem.por_codigos(codigos)
+                if not apos:
+                    return
+
+        consulta = listagem.consulta().order_by(Clientes.CLI_CODIGO).execution_options(yield_per=LOTE_STREAM)
+        yield from map(listagem, db.session.execute(consulta))
@@ -0,0 +1,350 @@
+import time
+
+from datetime       import datetime, timedelta
+from typing         import Iterable, Iterator
+from flask          import current_app
+from sqlalchemy     import select, insert, delete, func, event
+from sqlalchemy.orm import Session
+from src            import db
+from src.models     import Eventos
+from src.enums      import EventoTipoEnum
+from src.utils      import log_info, log_error, remover_acentos, mensagem_sse, canal_eventos, Assinante
+
+# Tabela -> (entidade na API e no filtro `entidade`, atributo de status).
+ENTIDADES = {
+    'VEICULOS' : ('veiculos', 'VEI_STATUS'),
+    'CLIENTES' : ('clientes', 'CLI_STATUS'),
+    'VENDAS'   : ('vendas',   'VEN_STATUS'),
+}
+
+
+
+class Entrega:
+    """O que uma conexão de `/api/eventos` já recebeu.
+
+    `corte` é o ponto de retomada: todo evento até ele já foi entregue (ou
+    não passa nos filtros). Os eventos acima dele já entregues ficam em
+    `acima` e não saem de novo quando uma leitura seguinte os traz. O `id:`
+    de cada mensagem é o corte depois dela, e assim um Last-Event-ID nunca
+    pula um evento não entregue; no pior caso a reconexão repete os dos
+    últimos segundos.
+
+    No Postgres o código vem da sequência antes do commit, e dois commits
+    simultâneos podem ficar visíveis fora da ordem dos códigos: um código
+    que falta na leitura pode ser de uma transação ainda em andamento. O
+    corte só passa por cima de um código ausente quando o evento seguinte
+    tem mais de `margem` de idade; até lá a conexão entrega os eventos que
+    chegam, mas o corte espera, e a próxima leitura, feita a partir dele,
+    traz o que for confirmado atrasado. No SQLite a escrita é serial e a
+    margem é zero.
+    """
+
+    def __init__(self, corte: int, margem: timedelta = timedelta(0)) -> None:
+        self.corte  = corte
+        self.margem = margem
+        self.acima  = set()
+
+    def lidos(self, eventos: list[dict], dumps) -> list[str]:
+        """Mensagens de uma leitura do banco (eventos depois do corte, em ordem)."""
+        saida    = []
+        anterior = self.corte
+        limite   = datetime.utcnow() - self.margem
+        for evento in eventos:
+            codigo = evento['id']
+            # Já alcançado pelo corte: o canal entregou este e os anteriores.
+            if codigo <= self.corte:
+                continue
+            repetido = codigo in self.acima
+            if not self.margem or codigo == self.corte + 1 or datetime.fromisoformat(evento['data']) < limite:
+                self.corte = codigo
+                self._avancar()
+            else:
+                self.acima.add(codigo)
+            if not repetido:
+                saida.append(mensagem_sse(dumps(evento), evento['entidade'], self.corte))
+
+        self.acima = {codigo for codigo in self.acima if codigo > self.corte}
+        if not saida and self.corte != anterior:
+            # Só repetidos: a mensagem sem dados avança o Last-Event-ID do navegador.
+            saida.append(mensagem_sse(codigo=self.corte))
+        return saida
+
+    def recebidos(self, eventos: list[dict], dumps) -> list[str]:
+        """Mensagens do que o canal entregou e esta conexão ainda não recebeu."""
+        saida = []
+        for evento in sorted(eventos, key=lambda evento: evento['id']):
+            codigo = evento['id']
+            if codigo <= self.corte or codigo in self.acima:
+                continue
+            self.acima.add(codigo)
+            self._avancar()
+            saida.append(mensagem_sse(dumps(evento), evento['entidade'], self.corte))
+        return saida
+
+    def _avancar(self) -> None:
+        while self.corte + 1 in self.acima:
+            self.corte += 1
+            self.acima.discard(self.corte)
+
+
+class EventosService:
+    """Eventos de alteração de veículos, clientes e vendas (`GET /api/eventos`).
+
+    O que passa pelo ORM (criar, atualizar, excluir) é anotado sozinho a
+    cada flush. Os UPDATE e INSERT diretos (lotes, baixa do veículo na
+    venda, lançamentos de saldo) chamam `registrar` com o que o RETURNING
+    devolveu. No commit as anotações viram linhas de EVENTOS, na mesma
+    transação, e depois dele são publicadas no canal de eventos. Um
+    registro alterado várias vezes na transação gera um evento só.
+    """
+    LOTE           = 500
+    # Sem eventos, um comentário a cada tantos segundos mantém a conexão aberta nos proxies.
+    INTERVALO_PING = 15
+    PING           = mensagem_sse(comentario='ping')
+
+    def __init__(self) -> None:
+        pass
+
+    def registrar(self, modelo, tipo: EventoTipoEnum, linhas: Iterable[tuple]) -> None:
+        """Anota (código, status) de registros escritos sem o ORM, na transação corrente."""
+        entidade, _ = ENTIDADES[modelo.__tablename__]
+        for codigo, status in linhas:
+            _anotar(db.session(), entidade, codigo, tipo, status)
+
+    def ler_filtros(self, args) -> tuple[set | None, set | None]:
+        """`entidade` e `status` da query string, cada um com valores separados por vírgula."""
+        entidades = self._valores(args.get('entidade'))
+        invalidas = entidades - {entidade for entidade, _ in ENTIDADES.values()} if entidades else None
+        if invalidas:
+            raise ValueError(f"Entidade inválida: {', '.join(sorted(invalidas))}.")
+
+        status = self._valores(args.get('status'))
+        return entidades, status and {remover_acentos(valor) for valor in status}
+
+    @staticmethod
+    def ler_ultimo(valor: str | None) -> int | None:
+        """Last-Event-ID enviado pelo EventSource ao reconectar."""
+        if valor in (None, ''):
+            return None
+        try:
+            return int(valor)
+        except ValueError:
+            raise ValueError('Last-Event-ID inválido.')
+
+    def recuperar(self, desde: int, entidades: set = None, status: set = None) -> tuple[list[dict], bool]:
+        """Até LOTE eventos depois de `desde`, já filtrados; (eventos, se há mais)."""
+        consulta = select(
+            Eventos.EVT_CODIGO, Eventos.EVT_ENTIDADE, Eventos.EVT_REGISTRO,
+            Eventos.EVT_TIPO, Eventos.EVT_STATUS, Eventos.EVT_DATA
+        ).where(Eventos.EVT_CODIGO > desde)
+
+        if entidades:
+            consulta = consulta.where(Eventos.EVT_ENTIDADE.in_(entidades))
+        if status:
+            consulta = consulta.where(Eventos.EVT_STATUS.in_(status))
+
+        linhas = db.session.execute(consulta.order_by(Eventos.EVT_CODIGO).limit(self.LOTE + 1)).all()
+        return [_evento(*linha) for linha in linhas[:self.LOTE]], len(linhas) > self.LOTE
+
+    def inicio(self, desde: int | None) -> tuple[Entrega, bool]:
+        """Ponto de partida da conexão: (o que ela já recebeu, se precisa recarregar).
+
+        Sem Last-Event-ID a conexão começa do evento mais recente com mais
+        de `margem` de idade; os mais novos ela recebe na primeira leitura.
+        Com um Last-Event-ID anterior aos eventos que a limpeza manteve, o
+        cliente perdeu alterações e tem de recarregar as listagens.
+        """
+        margem  = self.margem()
+        maximo  = func.max(Eventos.EVT_CODIGO)
+        if margem:
+            maximo = maximo.filter(Eventos.EVT_DATA < datetime.utcnow() - margem)
+
+        maximo, minimo = db.session.execute(select(maximo, func.min(Eventos.EVT_CODIGO))).one()
+        if desde is None:
+            return Entrega(maximo or 0, margem), False
+        if minimo is not None and desde < minimo - 1:
+            return Entrega(maximo or 0, margem), True
+        return Entrega(desde, margem), False
+
+    @staticmethod
+    def margem() -> timedelta:
+        """Tempo depois do qual um código ausente é dado como de transação desfeita (ver Entrega)."""
+        if db.engine.dialect.name == 'sqlite':
+            return timedelta(0)
+        return timedelta(seconds=float(current_app.config.get('EVENTOS_MARGEM', 5)))
+
+    def transmitir(self, assinante: Assinante, desde: int | None, dumps) -> Iterator[str]:
+        """Stream de uma conexão WSGI: o que ela perdeu e, depois, o que o canal entregar.
+
+        A cada `canal_eventos.sondagem` segundos (e quando a fila do
+        assinante transborda) a conexão relê do banco o que veio depois do
+        corte: são os eventos de outros processos, que o canal em memória não
+        alcança. Ela só usa o banco nessas leituras e devolve a sessão logo
+        em seguida, para não prender uma conexão do pool enquanto espera.
+        """
+        try:
+            entrega, recarregar = self.inicio(desde)
+            if recarregar:
+                yield self.recarregar(entrega.corte)
+            else:
+                yield from self._ler(assinante, entrega, dumps)
+            db.session.close()
+
+            enviado = leitura = time.monotonic()
+            while True:
+                assinante.esperar(self.espera(enviado, leitura))
+                eventos, perdeu = assinante.retirar()
+                saida           = entrega.recebidos(eventos, dumps)
+
+                if perdeu or self.ler_agora(leitura):
+                    saida  += self._ler(assinante, entrega, dumps)
+                    leitura = time.monotonic()
+                    db.session.close()
+
+                if saida or time.monotonic() - enviado >= self.INTERVALO_PING:
+                    yield from saida or [self.PING]
+                    enviado = time.monotonic()
+
+        except Exception as erro:
+            # O status já foi enviado; o EventSource reconecta com o Last-Event-ID.
+            log_error('transmitir_eventos', erro)
+
+        finally:
+            canal_eventos.cancelar(assinante)
+
+    @staticmethod
+    def recarregar(ultimo: int) -> str:
+        """Aviso de que o Last-Event-ID é anterior à retenção; o cursor pula para `ultimo`."""
+        return mensagem_sse('{}', 'recarregar', ultimo)
+
+    def _ler(self, assinante: Assinante, entrega: Entrega, dumps) -> list[str]:
+        """Tudo o que o banco tem depois do corte da conexão, em páginas de LOTE."""
+        saida = []
+        desde = entrega.corte
+        while True:
+            eventos, mais = self.recuperar(desde, assinante.entidades, assinante.status)
+            saida        += entrega.lidos(eventos, dumps)
+            if not mais:
+                return saida
+            # O corte pode ficar parado atrás de um código ausente; a página seguinte vem depois desta.
+            desde = eventos[-1]['id']
+
+    def espera(self, enviado: float, leitura: float) -> float:
+        """Segundos até o próximo ping ou a próxima leitura do banco, o que vier antes."""
+        agora  = time.monotonic()
+        limite = enviado + self.INTERVALO_PING
+        if canal_eventos.sondagem:
+            limite = min(limite, leitura + canal_eventos.sondagem)
+        return max(limite - agora, 0.0)
+
+    @staticmethod
+    def ler_agora(leitura: float) -> bool:
+        return bool(canal_eventos.sondagem) and time.monotonic() - leitura >= canal_eventos.sondagem
+
+    def limpar(self) -> int:
+        """Apaga os eventos mais antigos que EVENTOS_RETENCAO_HORAS."""
+        limite    = datetime.utcnow() - timedelta(hours=int(current_app.config.get('EVENTOS_RETENCAO_HORAS', 24)))
+        resultado = db.session.execute(delete(Eventos).where(Eventos.EVT_DATA < limite))
+        db.session.commit()
+
+        log_info('limpar_eventos', '%s eventos anteriores a %s apagados.', resultado.rowcount, limite.isoformat())
+        return resultado.rowcount
+
+    @staticmethod
+    def _valores(texto: str | None) -> set | None:
+        if not texto:
+            return None
+        return {valor.strip() for valor in texto.split(',') if valor.strip()} or None
+
+
+def _evento(codigo: int, entidade: str, registro: int, tipo: EventoTipoEnum, status: str, data: datetime) -> dict:
+    return {
+        'id'       : codigo,
+        'entidade' : entidade,
+        'registro' : registro,
+        'tipo'     : tipo.value,
+        'status'   : status,
+        'data'     : data.isoformat(),
+    }
+
+
+def _anotar(session: Session, entidade: str, codigo: int, tipo: EventoTipoEnum, status) -> None:
+    pendentes = session.info.setdefault('eventos_pendentes', {})
+    anterior  = pendentes.pop((entidade, codigo), None)
+    status    = getattr(status, 'value', status)
+
+    if anterior:
+        if anterior[0] == EventoTipoEnum.Criado:
+            # Criado e excluído na mesma transação: ninguém chegou a vê-lo.
+            if tipo == EventoTipoEnum.Excluido:
+                return
+            tipo = EventoTipoEnum.Criado
+        if status is None:
+            status = anterior[1]
+
+    pendentes[(entidade, codigo)] = (tipo, status)
+
+
+# Mesmo ciclo da invalidação do cache: anota nos flushes, grava antes do
+# commit e publica depois dele. Um rollback descarta as anotações.
+
+@event.listens_for(Session, 'after_flush')
+def _anotar_flush(session, contexto) -> None:
+    for tipo, objetos in (
+        (EventoTipoEnum.Criado,   session.new),
+        (EventoTipoEnum.Alterado, session.dirty),
+        (EventoTipoEnum.Excluido, session.deleted),
+    ):
+        for objeto in objetos:
+            entidade = ENTIDADES.get(objeto.__table__.name)
+            if entidade is None:
+                continue
+            if tipo == EventoTipoEnum.Alterado and not session.is_modified(objeto, include_collections=False):
+                continue
+
+            nome, status = entidade
+            codigo       = getattr(objeto, objeto.__mapper__.primary_key[0].key)
+            # Só o status já carregado: um atributo expirado de uma linha excluída não pode ser relido.
+            _anotar(session, nome, codigo, tipo, objeto.__dict__.get(status))
+
+
+@event.listens_for(Session, 'before_commit')
+def _gravar_eventos(session) -> None:
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+
+    pendentes = session.info.pop('eventos_pendentes', None)
+    if not pendentes:
+        return
+
+    agora  = datetime.utcnow()
+    linhas = session.execute(
+        insert(Eventos).returning(
+            Eventos.EVT_CODIGO, Eventos.EVT_ENTIDADE, Eventos.EVT_REGISTRO,
+            Eventos.EVT_TIPO, Eventos.EVT_STATUS, Eventos.EVT_DATA
+        ),
+        [
+            {
+                'EVT_ENTIDADE' : entidade,
+                'EVT_REGISTRO' : codigo,
+                'EVT_TIPO'     : tipo,
+                'EVT_STATUS'   : status,
+                'EVT_DATA'     : agora,
+            }
+            for (entidade, codigo), (tipo, status) in pendentes.items()
+        ]
+    ).all()
+    session.info.setdefault('eventos_gravados', []).extend(_evento(*linha) for linha in linhas)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publicar_eventos(session) -> None:
+    eventos = session.info.pop('eventos_gravados', None)
+    if eventos:
+        canal_eventos.publicar(sorted(eventos, key=lambda evento: evento['id']))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_eventos(session) -> None:
+    session.info.pop('eventos_pendentes', None)
+    session.info.pop('eventos_gravados', None)
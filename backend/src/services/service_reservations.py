@@ -0,0 +1,207 @@
+from datetime        import datetime, timedelta
+from flask           import current_app
+from sqlalchemy      import select, update, and_, or_
+from src             import db
+from src.models      import Veiculos, Clientes
+from src.enums       import VeiculoStatusEnum, EventoTipoEnum
+from src.utils       import log_info, para_inteiro, Esquema, Campo, corpo_erros, AgendadorPrazos
+from .service_events import EventosService
+
+
+class ReservasService:
+    """Reservas de veículos com prazo (`/api/veiculos/<id>/reserva`).
+
+    Reservar é um UPDATE condicional em VEICULOS, como a baixa na venda: o
+    veículo passa a Reservado, com cliente e prazo, só se estiver
+    disponível, com a reserva vencida ou reservado para o mesmo cliente
+    (que assim renova o prazo). Duas reservas simultâneas do mesmo veículo
+    não passam as duas: a segunda não encontra a linha no WHERE e recebe 409.
+
+    O prazo vale pelo próprio WHERE: uma reserva vencida já não segura a
+    venda nem uma nova reserva, mesmo antes de o agendador liberá-la. O
+    agendador (`agendador_reservas`) só devolve o status Disponivel às
+    vencidas, em lotes, sem varrer a tabela.
+    """
+    ESQUEMA = Esquema({
+        'cliente' : Campo(Veiculos.VEI_RESERVA_CLIENTE, obrigatorio=True, minimo=1),
+    })
+    # Valores que tiram a reserva do veículo e o devolvem ao estoque.
+    LIVRE   = {
+        'VEI_STATUS'          : VeiculoStatusEnum.Disponivel,
+        'VEI_RESERVA_CLIENTE' : None,
+        'VEI_RESERVA_ATE'     : None,
+    }
+
+    def __init__(self) -> None:
+        self.eventos = EventosService()
+
+    def reservar(self, veiculo_cod: int, dados: dict) -> tuple[dict, int]:
+        """`cliente` e, opcional, `minutos` de prazo (padrão RESERVAS_MINUTOS)."""
+        valores, erros = self.ESQUEMA.validar(dados)
+        try:
+            minutos = self._minutos(dados.get('minutos') if isinstance(dados, dict) else None)
+        except ValueError as erro:
+            erros['minutos'] = str(erro)
+        if erros:
+            return corpo_erros(erros), 400
+
+        cliente_cod = valores['VEI_RESERVA_CLIENTE']
+        if not db.session.get(Clientes, cliente_cod):
+            raise ValueError('Cliente não encontrado.')
+
+        agora = datetime.utcnow()
+        prazo = agora + timedelta(minutes=minutos)
+
+        reservado = db.session.execute(
+            update(Veiculos)
+            .where(Veiculos.VEI_CODIGO == veiculo_cod, self.reservavel(cliente_cod, agora))
+            .values(
+                VEI_STATUS          = VeiculoStatusEnum.Reservado,
+                VEI_RESERVA_CLIENTE = cliente_cod,
+                VEI_RESERVA_ATE     = prazo,
+                VEI_VERSAO          = Veiculos.VEI_VERSAO + 1
+            )
+            .returning(Veiculos.VEI_CODIGO)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+
+        if reservado is None:
+            return self._sem_reserva(veiculo_cod, 'Veículo indisponível para reserva.')
+
+        self.eventos.registrar(Veiculos, EventoTipoEnum.Alterado, [(veiculo_cod, VeiculoStatusEnum.Reservado)])
+        db.session.commit()
+        agendador_reservas.agendar(veiculo_cod, prazo)
+
+        log_info('reservar_veiculo', 'Veículo %s reservado para o cliente %s até %s.', veiculo_cod, cliente_cod, prazo.isoformat())
+        return {'message': 'Veículo reservado com sucesso.', 'cliente': cliente_cod, 'ate': prazo.isoformat()}, 201
+
+    def obter(self, veiculo_cod: int) -> tuple[dict, int]:
+        linha = db.session.execute(
+            select(Veiculos.VEI_STATUS, Veiculos.VEI_RESERVA_CLIENTE, Veiculos.VEI_RESERVA_ATE)
+            .where(Veiculos.VEI_CODIGO == veiculo_cod)
+        ).one_or_none()
+
+        if linha is None:
+            raise ValueError('Veículo não encontrado.')
+
+        status, cliente_cod, prazo = linha
+        if status != VeiculoStatusEnum.Reservado or prazo is None or prazo <= datetime.utcnow():
+            return {'error': 'Veículo sem reserva ativa.'}, 404
+
+        return {'veiculo': veiculo_cod, 'cliente': cliente_cod, 'ate': prazo.isoformat()}, 200
+
+    def liberar(self, veiculo_cod: int) -> tuple[dict, int]:
+        """Desfaz uma reserva com prazo antes de ela vencer."""
+        liberado = db.session.execute(
+            update(Veiculos)
+            .where(
+                Veiculos.VEI_CODIGO == veiculo_cod,
+                Veiculos.VEI_STATUS == VeiculoStatusEnum.Reservado,
+                Veiculos.VEI_RESERVA_ATE.isnot(None)
+            )
+            .values(**self.LIVRE, VEI_VERSAO=Veiculos.VEI_VERSAO + 1)
+            .returning(Veiculos.VEI_CODIGO)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+
+        if liberado is None:
+            return self._sem_reserva(veiculo_cod, 'Veículo sem reserva ativa.')
+
+        self.eventos.registrar(Veiculos, EventoTipoEnum.Alterado, [(veiculo_cod, VeiculoStatusEnum.Disponivel)])
+        db.session.commit()
+        agendador_reservas.cancelar(veiculo_cod)
+
+        log_info('liberar_reserva', 'Reserva do veículo %s liberada.', veiculo_cod)
+        return {'message': 'Reserva liberada com sucesso.'}, 200
+
+    def expirar(self, codigos: list[int]) -> int:
+        """Libera, com um único UPDATE, as reservas de `codigos` que já venceram.
+
+        O prazo é conferido no WHERE: uma reserva renovada depois de entrar
+        no heap, ou já liberada por outro processo, não é tocada.
+        """
+        linhas = db.session.execute(
+            update(Veiculos)
+            .where(
+                Veiculos.VEI_CODIGO.in_(codigos),
+                Veiculos.VEI_STATUS == VeiculoStatusEnum.Reservado,
+                Veiculos.VEI_RESERVA_ATE <= datetime.utcnow()
+            )
+            .values(**self.LIVRE, VEI_VERSAO=Veiculos.VEI_VERSAO + 1)
+            .returning(Veiculos.VEI_CODIGO, Veiculos.VEI_STATUS)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.eventos.registrar(Veiculos, EventoTipoEnum.Alterado, linhas)
+        db.session.commit()
+
+        if linhas:
+            log_info('expirar_reservas', '%s reservas vencidas liberadas.', len(linhas))
+        return len(linhas)
+
+    def vencendo(self, ate: datetime) -> list[tuple[int, datetime]]:
+        """(veículo, prazo) das reservas que vencem até `ate`, pelo índice parcial do prazo."""
+        return db.session.execute(
+            select(Veiculos.VEI_CODIGO, Veiculos.VEI_RESERVA_ATE)
+            .where(Veiculos.VEI_RESERVA_ATE <= ate, Veiculos.VEI_STATUS == VeiculoStatusEnum.Reservado)
+        ).all()
+
+    def expirar_vencidas(self) -> int:
+        """Libera todas as reservas vencidas (`flask liberar-reservas`, sem o agendador)."""
+        codigos = [codigo for codigo, _ in self.vencendo(datetime.utcnow())]
+        lote    = AgendadorPrazos.LOTE
+        return sum(self.expirar(codigos[inicio:inicio + lote]) for inicio in range(0, len(codigos), lote))
+
+    @staticmethod
+    def reservavel(cliente_cod: int, agora: datetime):
+        """Condição do WHERE para reservar: disponível, reserva vencida ou do próprio cliente."""
+        return or_(
+            Veiculos.VEI_STATUS == VeiculoStatusEnum.Disponivel,
+            and_(
+                Veiculos.VEI_STATUS == VeiculoStatusEnum.Reservado,
+                Veiculos.VEI_RESERVA_ATE.isnot(None),
+                or_(Veiculos.VEI_RESERVA_ATE <= agora, Veiculos.VEI_RESERVA_CLIENTE == cliente_cod)
+            )
+        )
+
+    @staticmethod
+    def vendavel(cliente_cod: int, agora: datetime):
+        """Condição do WHERE para vender: como `reservavel`, mais as reservas feitas à mão (sem prazo)."""
+        return or_(
+            Veiculos.VEI_STATUS == VeiculoStatusEnum.Disponivel,
+            and_(
+                Veiculos.VEI_STATUS == VeiculoStatusEnum.Reservado,
+                or_(
+                    Veiculos.VEI_RESERVA_ATE.is_(None),
+                    Veiculos.VEI_RESERVA_ATE <= agora,
+                    Veiculos.VEI_RESERVA_CLIENTE == cliente_cod
+                )
+            )
+        )
+
+    @staticmethod
+    def _minutos(valor) -> int:
+        padrao = int(current_app.config.get('RESERVAS_MINUTOS', 30))
+        maximo = int(current_app.config.get('RESERVAS_MINUTOS_MAXIMO', 1440))
+
+        if valor in (None, ''):
+            return padrao
+
+        minutos = para_inteiro(valor)
+        if not 1 <= minutos <= maximo:
+            raise ValueError(f'Prazo deve ser de 1 a {maximo} minutos.')
+        return minutos
+
+    def _sem_reserva(self, veiculo_cod: int, mensagem: str) -> tuple[dict, int]:
+        db.session.rollback()
+
+        if not db.session.get(Veiculos, veiculo_cod):
+            raise ValueError('Veículo não encontrado.')
+
+        return {'error': mensagem}, 409
+
+
+agendador_reservas = AgendadorPrazos(
+    'reservas',
+    vencer   = lambda codigos: ReservasService().expirar(codigos),
+    carregar = lambda ate: ReservasService().vencendo(ate),
+)
@@ -0,0 +1,348 @@
+import heapq
+
+from datetime       import datetime
+from typing         import Iterator
+from sqlalchemy     import select, update, or_, func
+from sqlalchemy.exc import SQLAlchemyError
+from src            import db
+from src.models     import Vendas, VendasArquivo, Veiculos, Clientes, Usuarios, MovimentosSaldo
+from src.enums      import VendaStatusEnum, VeiculoStatusEnum, EventoTipoEnum
+from src.utils      import log_info, log_error, validar_enum, paginar_particoes, LIMITE_PADRAO, LOTE_STREAM, em_cache
+from src.utils      import para_inteiro, para_data, Serializador, Esquema, Campo, corpo_erros
+from .service_sales_summary    import ResumoVendasService
+from .service_customer_balance import SaldosService
+from .service_sync             import SincroniaService
+from .service_events           import EventosService
+from .service_reservations     import ReservasService
+from .service_sales_archive    import ArquivoVendasService
+
+
+class VendasService:
+    LISTAGEM  = Serializador({
+        'id'       : Vendas.VEN_CODIGO,
+        'veiculo'  : Vendas.VEI_CODIGO,
+        'cliente'  : Vendas.CLI_CODIGO,
+        'vendedor' : Vendas.USU_CODIGO,
+        'data'     : Vendas.VEN_DATA,
+        'valor'    : Vendas.VEN_VALOR,
+        'status'   : Vendas.VEN_STATUS,
+    })
+    # A mesma listagem sobre VENDAS_ARQUIVO, para as vendas de meses arquivados.
+    ARQUIVO   = Serializador({
+        'id'       : VendasArquivo.VEN_CODIGO,
+        'veiculo'  : VendasArquivo.VEI_CODIGO,
+        'cliente'  : VendasArquivo.CLI_CODIGO,
+        'vendedor' : VendasArquivo.USU_CODIGO,
+        'data'     : VendasArquivo.VEN_DATA,
+        'valor'    : VendasArquivo.VEN_VALOR,
+        'status'   : VendasArquivo.VEN_STATUS,
+    })
+    ESQUEMA   = Esquema({
+        'veiculo'  : Campo(Vendas.VEI_CODIGO,           obrigatorio=True, minimo=1),
+        'cliente'  : Campo(Vendas.CLI_CODIGO,           obrigatorio=True, minimo=1),
+        'vendedor' : Campo(Vendas.USU_CODIGO,           minimo=1),
+        'data'     : Campo(Vendas.VEN_DATA),
+        'valor'    : Campo(Vendas.VEN_VALOR,            minimo=0),
+        'status'   : Campo(Vendas.VEN_STATUS),
+        # Parte do valor paga com o saldo do cliente (só no registro da venda).
+        'saldo'    : Campo(MovimentosSaldo.MOV_VALOR,   padrao=None),
+    })
+    # O que um PUT pode mudar; veículo e cliente são fixos depois da venda.
+    ALTERAVEIS     = {'vendedor', 'data', 'valor', 'status'}
+    PADRAO_VEICULO = {'valor', 'data'}
+
+    def __init__(self) -> None:
+        self.resumo    = ResumoVendasService()
+        self.saldos    = SaldosService()
+        self.sincronia = SincroniaService()
+        self.eventos   = EventosService()
+        self.arquivo   = ArquivoVendasService()
+
+    def criar_venda(self, dados: dict) -> tuple[dict, int]:
+        # Valor e data vazios no cadastro ficam com o preço do veículo e a data de hoje.
+        if isinstance(dados, dict):
+            dados = {
+                campo: valor for campo, valor in dados.items()
+                if campo not in self.PADRAO_VEICULO or valor not in (None, '')
+            }
+
+        valores, erros = self.ESQUEMA.validar(dados)
+        if erros:
+            return corpo_erros(erros), 400
+
+        veiculo_cod = valores['VEI_CODIGO']
+        cliente_cod = valores['CLI_CODIGO']
+        valor       = valores.get('VEN_VALOR')
+        data        = valores.get('VEN_DATA')
+        vendedor    = valores.get('USU_CODIGO')
+        pago_saldo  = valores['MOV_VALOR'] or None
+
+        if pago_saldo is not None and pago_saldo <= 0:
+            return {'error': 'Valor pago com saldo deve ser positivo.'}, 400
+
+        if not db.session.get(Clientes, cliente_cod):
+            raise ValueError('Cliente não encontrado.')
+
+        if vendedor and not db.session.get(Usuarios, vendedor):
+            raise ValueError('Vendedor não encontrado.')
+
+        try:
+            veiculo = self._baixar_veiculo(veiculo_cod, cliente_cod)
+            if veiculo is None:
+                return self._veiculo_indisponivel(veiculo_cod)
+
+            venda = Vendas(
+                veiculo_cod = veiculo_cod,
+                cliente_cod = cliente_cod,
+                data        = data,
+                valor       = veiculo.VEI_PRECO if valor is None else valor,
+                status      = VendaStatusEnum.Concluida,
+                vendedor    = vendedor,
+                marca       = veiculo.VEI_MARCA,
+                tipo        = veiculo.VEI_TIPO.name
+            )
+            db.session.add(venda)
+            self.resumo.incluir(venda)
+
+            # Parte paga com o saldo do cliente: débito ligado à venda, na
+            # mesma transação; sem saldo suficiente a venda inteira é desfeita.
+            if pago_saldo is not None:
+                if pago_saldo > venda.VEN_VALOR:
+                    db.session.rollback()
+                    return {'error': 'Valor pago com saldo maior que o valor da venda.'}, 400
+
+                db.session.flush()
+                descricao = f'Pagamento da venda {venda.VEN_CODIGO}'
+                if self.saldos.movimentar(cliente_cod, -pago_saldo, descricao, venda.VEN_CODIGO, vendedor) is None:
+                    db.session.rollback()
+                    return {'error': 'Saldo insuficiente.'}, 409
+
+            db.session.commit()
+
+            log_info('criar_venda', 'Venda %s registrada para o veículo %s.', venda.VEN_CODIGO, veiculo_cod)
+            return {'message': 'Venda registrada com sucesso.', 'id': venda.VEN_CODIGO}, 201
+
+        except SQLAlchemyError as erro:
+            db.session.rollback()
+            raise erro
+
+    def atualizar_venda(self, id: int, dados: dict) -> tuple[dict, int]:
+        venda = db.session.get(Vendas, id)
+
+        if not venda:
+            return self._venda_ausente(id)
+
+        alteracoes     = {campo: valor for campo, valor in (dados or {}).items() if campo in self.ALTERAVEIS}
+        valores, erros = self.ESQUEMA.validar(alteracoes, parcial=True)
+        if erros:
+            return corpo_erros(erros), 400
+
+        # O status passa pelo cancelamento ou pela baixa do veículo, não direto para a coluna.
+        status = valores.pop('VEN_STATUS', None)
+
+        # O resumo é ajustado tirando a venda como estava e somando como ficou.
+        altera_resumo = bool(valores) or status is not None
+        if altera_resumo:
+            self.resumo.retirar(venda)
+
+        for coluna, valor in valores.items():
+            setattr(venda, coluna, valor)
+
+        if status == VendaStatusEnum.Cancelada and venda.VEN_STATUS == VendaStatusEnum.Concluida:
+            if not self._cancelar(venda):
+                db.session.rollback()
+                return {'error': 'Venda alterada por outra operação. Tente novamente.'}, 409
+
+        elif status == VendaStatusEnum.Concluida and venda.VEN_STATUS == VendaStatusEnum.Cancelada:
+            if self._baixar_veiculo(venda.VEI_CODIGO, venda.CLI_CODIGO) is None:
+                return self._veiculo_indisponivel(venda.VEI_CODIGO)
+            # O que o cancelamento devolveu ao saldo volta a ser debitado.
+            if not self.saldos.recobrar_venda(venda):
+                db.session.rollback()
+                return {'error': 'Saldo insuficiente.'}, 409
+            venda.VEN_STATUS = VendaStatusEnum.Concluida
+
+        if altera_resumo:
+            self.resumo.incluir(venda)
+
+        db.session.commit()
+        log_info('atualizar_venda', 'Venda ID %s atualizada com sucesso.', id)
+        return {'message': 'Venda atualizada com sucesso.'}, 200
+
+    def cancelar_venda(self, id: int) -> tuple[dict, int]:
+        venda = db.session.get(Vendas, id)
+
+        if not venda:
+            return self._venda_ausente(id)
+
+        if venda.VEN_STATUS == VendaStatusEnum.Cancelada:
+            return {'error': 'Venda já cancelada.'}, 409
+
+        return self.atualizar_venda(id, {'status': VendaStatusEnum.Cancelada.value})
+
+    def excluir_venda(self, id: int) -> tuple[dict, int]:
+        venda = db.session.get(Vendas, id)
+
+        if not venda:
+            return self._venda_ausente(id)
+
+        # Os lançamentos de saldo são permanentes e apontam para a venda.
+        if self.saldos.tem_lancamentos(venda_cod=id):
+            return {'error': 'Venda com lançamentos de saldo não pode ser excluída; cancele a venda.'}, 409
+
+        self.resumo.retirar(venda)
+
+        if venda.VEN_STATUS == VendaStatusEnum.Concluida and not self._cancelar(venda):
+            db.session.rollback()
+            return {'error': 'Venda alterada por outra operação. Tente novamente.'}, 409
+
+        db.session.delete(venda)
+        self.sincronia.registrar_exclusao(Vendas, id)
+        db.session.commit()
+
+        log_info('excluir_venda', 'Venda %s deletada com sucesso.', id)
+        return {'message': 'Venda deletada com sucesso.'}, 200
+
+    def _baixar_veiculo(self, veiculo_cod: int, cliente_cod: int):
+        """Dá baixa do veículo no estoque (status Vendido) com um UPDATE condicional.
+
+        Só uma transação consegue mudar o status a partir de Disponivel ou
+        Reservado; a concorrente não encontra a linha no WHERE e recebe None.
+        Um veículo com reserva no prazo só é vendido ao cliente que o
+        reservou, e a venda encerra a reserva.
+        Não há SELECT ... FOR UPDATE nem lock de tabela: no SQLite a escrita
+        é serializada só durante o commit curto, no Postgres o lock é da linha.
+        Retorna preço, marca e tipo do veículo, lidos no mesmo comando.
+        """
+        veiculo = db.session.execute(
+            update(Veiculos)
+            .where(Veiculos.VEI_CODIGO == veiculo_cod, ReservasService.vendavel(cliente_cod, datetime.utcnow()))
+            .values(
+                VEI_STATUS          = VeiculoStatusEnum.Vendido,
+                VEI_RESERVA_CLIENTE = None,
+                VEI_RESERVA_ATE     = None,
+                VEI_VERSAO          = Veiculos.VEI_VERSAO + 1
+            )
+            .returning(Veiculos.VEI_PRECO, Veiculos.VEI_MARCA, Veiculos.VEI_TIPO)
+            .execution_options(synchronize_session=False)
+        ).first()
+
+        if veiculo is not None:
+            self.eventos.registrar(Veiculos, EventoTipoEnum.Alterado, [(veiculo_cod, VeiculoStatusEnum.Vendido)])
+        return veiculo
+
+    def _cancelar(self, venda: Vendas) -> bool:
+        """Cancela a venda, devolve o veículo ao estoque e estorna o saldo usado, na transação corrente."""
+        resultado = db.session.execute(
+            update(Vendas)
+            .where(Vendas.VEN_CODIGO == venda.VEN_CODIGO, Vendas.VEN_STATUS == VendaStatusEnum.Concluida)
+            .values(VEN_STATUS=VendaStatusEnum.Cancelada)
+            .execution_options(synchronize_session=False)
+        )
+        if resultado.rowcount == 0:
+            return False
+
+        devolvido = db.session.execute(
+            update(Veiculos)
+            .where(Veiculos.VEI_CODIGO == venda.VEI_CODIGO, Veiculos.VEI_STATUS == VeiculoStatusEnum.Vendido)
+            .values(VEI_STATUS=VeiculoStatusEnum.Disponivel, VEI_VERSAO=Veiculos.VEI_VERSAO + 1)
+            .execution_options(synchronize_session=False)
+        )
+        self.eventos.registrar(Vendas, EventoTipoEnum.Alterado, [(venda.VEN_CODIGO, VendaStatusEnum.Cancelada)])
+        if devolvido.rowcount:
+            self.eventos.registrar(Veiculos, EventoTipoEnum.Alterado, [(venda.VEI_CODIGO, VeiculoStatusEnum.Disponivel)])
+        self.saldos.estornar_venda(venda)
+        db.session.expire(venda, ['VEN_STATUS'])
+        return True
+
+    def _venda_ausente(self, id: int) -> tuple[dict, int]:
+        if self.arquivo.arquivada(id):
+            return {'error': 'Venda de período arquivado não pode ser alterada.'}, 409
+        raise ValueError('Venda não encontrada.')
+
+    def _veiculo_indisponivel(self, veiculo_cod: int) -> tuple[dict, int]:
+        db.session.rollback()
+
+        if not db.session.get(Veiculos, veiculo_cod):
+            raise ValueError('Veículo não encontrado.')
+
+        return {'error': 'Veículo indisponível para venda.'}, 409
+
+    def obter_venda(self, id: int, campos: tuple = None) -> tuple[dict, int]:
+        venda = self.LISTAGEM.restringir(campos).obter(id)
+        if venda is None:
+            venda = self.ARQUIVO.restringir(campos).obter(id)
+
+        if venda is None:
+            return {'error': 'Venda não encontrada.'}, 404
+        return venda, 200
+
+    @em_cache(Vendas, depende_de=(Clientes, Veiculos))
+    def listar_vendas(self, filtros: dict, limite: int = LIMITE_PADRAO, apos: str = None, campos: tuple = None) -> dict:
+        listagem        = self.LISTAGEM.restringir(campos)
+        linhas, proximo = paginar_particoes(self._particoes(filtros, campos), limite, apos)
+
+        return {
+            'dados'       : listagem.listar(linhas),
+            'next_cursor' : proximo
+        }
+
+    def iterar_vendas(self, filtros: dict, campos: tuple = None) -> Iterator[dict]:
+        """Mesma listagem de listar_vendas, lida em lotes para o modo streaming."""
+        listagem = self.LISTAGEM.restringir(campos)
+        leituras = [
+            db.session.execute(consulta.order_by(chave).execution_options(yield_per=LOTE_STREAM))
+            for consulta, chave in self._particoes(filtros, campos)
+        ]
+        yield from map(listagem, heapq.merge(*leituras, key=lambda linha: linha.VEN_CODIGO))
+
+    def _particoes(self, filtros: dict, campos: tuple = None) -> list:
+        """(consulta, chave) de VENDAS e, se o período pedido chega nele, de VENDAS_ARQUIVO.
+
+        Sem `de`, ou com `de` anterior à última venda arquivada, a listagem
+        junta as duas tabelas pelo código; no caso comum (meses recentes) só
+        VENDAS é lida, como antes do arquivamento.
+        """
+        particoes = [(self._consulta(filtros, self.LISTAGEM.restringir(campos), Vendas), Vendas.VEN_CODIGO)]
+
+        de = para_data(filtros['de']) if filtros.get('de') else None
+        if self.arquivo.alcanca(de):
+            particoes.append((self._consulta(filtros, self.ARQUIVO.restringir(campos), VendasArquivo), VendasArquivo.VEN_CODIGO))
+        return particoes
+
+    def _consulta(self, filtros: dict, listagem: Serializador, modelo=Vendas):
+        consulta = listagem.consulta()
+
+        termo = (filtros.get('busca') or '').strip().lower()
+        if termo:
+            clientes = select(Clientes.CLI_CODIGO).where(
+                func.lower(Clientes.CLI_NOME).contains(termo, autoescape=True)
+            )
+            veiculos = select(Veiculos.VEI_CODIGO).where(or_(
+                func.lower(Veiculos.VEI_PLACA).contains(termo, autoescape=True),
+                func.lower(Veiculos.VEI_MODELO).contains(termo, autoescape=True)
+            ))
+            consulta = consulta.where(or_(modelo.CLI_CODIGO.in_(clientes), modelo.VEI_CODIGO.in_(veiculos)))
+
+        if filtros.get('status'):
+            status = validar_enum(VendaStatusEnum, filtros['status'])
+            if not status:
+                raise ValueError('Status inválido.')
+            consulta = consulta.where(modelo.VEN_STATUS == status)
+
+        if filtros.get('cliente'):
+            consulta = consulta.where(modelo.CLI_CODIGO == para_inteiro(filtros['cliente']))
+
+        if filtros.get('vendedor'):
+            consulta = consulta.where(modelo.USU_CODIGO == para_inteiro(filtros['vendedor']))
+
+        if filtros.get('veiculo'):
+            consulta = consulta.where(modelo.VEI_CODIGO == para_inteiro(filtros['veiculo']))
+
+        if filtros.get('de'):
+            consulta = consulta.where(modelo.VEN_DATA >= para_data(filtros['de']))
+
+        if filtros.get('ate'):
+            consulta = consulta.where(modelo.VEN_DATA <= para_data(filtros['ate']))
+
+        return consulta
@@ -0,0 +1,78 @@
+from datetime       import date, datetime
+from flask          import current_app
+from sqlalchemy     import select, insert, delete, func, exists
+from src            import db
+from src.models     import Vendas, VendasArquivo, MovimentosSaldo
+from src.utils      import log_info
+
+
+class ArquivoVendasService:
+    """Vendas de meses fechados saem de VENDAS para VENDAS_ARQUIVO.
+
+    VENDAS fica só com os meses recentes (VENDAS_MESES_QUENTES), e com ela
+    os seus índices. `flask arquivar-vendas`, agendado uma vez por mês, move
+    o restante em lotes de LOTE: cada lote é um INSERT ... SELECT e um
+    DELETE na mesma transação. As listagens só leem o arquivo quando o
+    período pedido chega nele, e os relatórios não mudam: leem
+    RESUMO_VENDAS, que não depende de onde a venda está.
+
+    Ficam em VENDAS, mesmo antigas, as vendas com lançamentos de saldo
+    (o livro aponta para elas) e a de maior código, que o SQLite
+    reaproveitaria numa venda nova se ela saísse da tabela.
+    """
+    LOTE    = 5000
+    COLUNAS = [coluna.key for coluna in VendasArquivo.__table__.columns]
+
+    def __init__(self) -> None:
+        pass
+
+    def corte(self, hoje: date = None) -> date:
+        """Primeiro dia do mês mais antigo que fica em VENDAS."""
+        hoje  = hoje or datetime.utcnow().date()
+        meses = hoje.year * 12 + hoje.month - 1 - int(current_app.config.get('VENDAS_MESES_QUENTES', 12))
+        return date(meses // 12, meses % 12 + 1, 1)
+
+    def arquivar(self, antes: date = None) -> int:
+        """Move para o arquivo as vendas anteriores a `antes` (padrão: `corte()`); retorna quantas."""
+        antes = antes or self.corte()
+        if antes > datetime.utcnow().date().replace(day=1):
+            raise ValueError('Só meses encerrados podem ser arquivados.')
+
+        maior     = select(func.max(Vendas.VEN_CODIGO)).scalar_subquery()
+        com_saldo = exists().where(MovimentosSaldo.VEN_CODIGO == Vendas.VEN_CODIGO)
+        colunas   = [getattr(Vendas, nome) for nome in self.COLUNAS]
+        total     = 0
+
+        while True:
+            codigos = db.session.scalars(
+                select(Vendas.VEN_CODIGO)
+                .where(Vendas.VEN_DATA < antes, Vendas.VEN_CODIGO < maior, ~com_saldo)
+                .order_by(Vendas.VEN_CODIGO)
+                .limit(self.LOTE)
+            ).all()
+            if not codigos:
+                break
+
+            db.session.execute(
+                insert(VendasArquivo).from_select(self.COLUNAS, select(*colunas).where(Vendas.VEN_CODIGO.in_(codigos)))
+            )
+            db.session.execute(
+                delete(Vendas).where(Vendas.VEN_CODIGO.in_(codigos)).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            total += len(codigos)
+
+        log_info('arquivar_vendas', '%s vendas anteriores a %s arquivadas.', total, antes.isoformat())
+        return total
+
+    def alcanca(self, de: date | None) -> bool:
+        """Se uma consulta a partir de `de` (None: todo o histórico) precisa ler o arquivo.
+
+        Uma busca pelo índice de VEN_DATA: o arquivo entra só se não estiver
+        vazio e tiver vendas a partir de `de`.
+        """
+        ultima = db.session.scalar(select(func.max(VendasArquivo.VEN_DATA)))
+        return ultima is not None and (de is None or de <= ultima)
+
+    def arquivada(self, codigo: int) -> bool:
+        return db.session.get(VendasArquivo, codigo) is not None
@@ -0,0 +1,206 @@
+import calendar
+
+from decimal                        import Decimal
+from sqlalchemy                     import select, insert, update, delete, func, case, cast, literal, union_all, Date
+from sqlalchemy.dialects.sqlite     import insert as insert_sqlite
+from sqlalchemy.dialects.postgresql import insert as insert_postgres
+from src                            import db
+from src.models                     import Vendas, VendasArquivo, ResumoVendas
+from src.enums                      import VendaStatusEnum, VeiculoTipoEnum
+from src.utils                      import log_info, em_cache, para_data
+
+
+class ResumoVendasService:
+    CHAVE     = ('RES_PERIODO', 'RES_DATA', 'RES_MARCA', 'RES_TIPO', 'USU_CODIGO')
+    TOTAIS    = ('RES_QTD_VENDAS', 'RES_VALOR_BRUTO', 'RES_QTD_CANCELADAS', 'RES_VALOR_CANCELADO')
+    FORMATOS  = {
+        'dia' : None,
+        'mes' : (7, 'YYYY-MM'),
+        'ano' : (4, 'YYYY'),
+    }
+    DIMENSOES = ('marca', 'tipo', 'vendedor')
+
+    def __init__(self) -> None:
+        pass
+
+    def incluir(self, venda: Vendas) -> None:
+        """Soma a venda no resumo, na transação corrente."""
+        self._movimentar(venda, 1)
+
+    def retirar(self, venda: Vendas) -> None:
+        """Tira a venda do resumo; chamado antes de alterar ou excluir a venda."""
+        self._movimentar(venda, -1)
+
+    def _movimentar(self, venda: Vendas, sinal: int) -> None:
+        valor     = Decimal(venda.VEN_VALOR or 0)
+        cancelada = 1 if venda.VEN_STATUS == VendaStatusEnum.Cancelada else 0
+
+        # Marca e tipo gravados na venda: o veículo pode ter mudado desde
+        # então, e a venda sai do resumo pela mesma chave em que entrou.
+        base   = {
+            'RES_MARCA'  : venda.VEN_MARCA or '',
+            'RES_TIPO'   : venda.VEN_TIPO or VeiculoTipoEnum.Indefinido.name,
+            'USU_CODIGO' : venda.USU_CODIGO or 0,
+        }
+        totais = {
+            'RES_QTD_VENDAS'      : sinal,
+            'RES_VALOR_BRUTO'     : sinal * valor,
+            'RES_QTD_CANCELADAS'  : sinal * cancelada,
+            'RES_VALOR_CANCELADO' : sinal * cancelada * valor,
+        }
+
+        for periodo, data in ((ResumoVendas.DIA, venda.VEN_DATA), (ResumoVendas.MES, venda.VEN_DATA.replace(day=1))):
+            chave = {'RES_PERIODO': periodo, 'RES_DATA': data, **base}
+            self._somar(chave, totais)
+
+            # Uma linha que ficou sem vendas sai da tabela, como se nunca tivesse existido.
+            if sinal < 0:
+                db.session.execute(
+                    delete(ResumoVendas)
+                    .where(*(getattr(ResumoVendas, nome) == campo for nome, campo in chave.items()))
+                    .where(ResumoVendas.RES_QTD_VENDAS == 0)
+                    .execution_options(synchronize_session=False)
+                )
+
+    def _somar(self, chave: dict, totais: dict) -> None:
+        """Upsert de incremento: `coluna = coluna + delta`, sem ler a linha antes."""
+        insert_dialeto = {'sqlite': insert_sqlite, 'postgresql': insert_postgres}.get(db.engine.dialect.name)
+
+        if insert_dialeto:
+            comando = insert_dialeto(ResumoVendas).values(**chave, **totais)
+            comando = comando.on_conflict_do_update(
+                index_elements = list(self.CHAVE),
+                set_           = {nome: getattr(ResumoVendas, nome) + comando.excluded[nome] for nome in self.TOTAIS}
+            )
+            db.session.execute(comando)
+            return
+
+        resultado = db.session.execute(
+            update(ResumoVendas)
+            .where(*(getattr(ResumoVendas, nome) == campo for nome, campo in chave.items()))
+            .values({nome: getattr(ResumoVendas, nome) + valor for nome, valor in totais.items()})
+            .execution_options(synchronize_session=False)
+        )
+        if resultado.rowcount == 0:
+            db.session.execute(insert(ResumoVendas).values(**chave, **totais))
+
+    def reconstruir(self) -> int:
+        """Recalcula o resumo inteiro a partir de VENDAS e VENDAS_ARQUIVO (backfill); retorna o número de linhas."""
+        colunas   = ('VEN_MARCA', 'VEN_TIPO', 'USU_CODIGO', 'VEN_DATA', 'VEN_VALOR', 'VEN_STATUS')
+        vendas    = union_all(*(
+            select(*(getattr(modelo, nome) for nome in colunas)) for modelo in (Vendas, VendasArquivo)
+        )).subquery()
+        cancelada = case((vendas.c.VEN_STATUS == VendaStatusEnum.Cancelada, 1), else_=0)
+        dimensoes = (
+            func.coalesce(vendas.c.VEN_MARCA, ''),
+            func.coalesce(vendas.c.VEN_TIPO, VeiculoTipoEnum.Indefinido.name),
+            func.coalesce(vendas.c.USU_CODIGO, 0),
+        )
+
+        db.session.execute(delete(ResumoVendas))
+
+        for periodo, data in ((ResumoVendas.DIA, vendas.c.VEN_DATA), (ResumoVendas.MES, self._inicio_do_mes(vendas.c.VEN_DATA))):
+            chave    = (literal(periodo), data, *dimensoes)
+            consulta = (
+                select(
+                    *chave, func.count(), func.sum(vendas.c.VEN_VALOR),
+                    func.sum(cancelada), func.sum(cancelada * vendas.c.VEN_VALOR)
+                )
+                .select_from(vendas)
+                .group_by(*chave)
+            )
+            db.session.execute(insert(ResumoVendas).from_select([*self.CHAVE, *self.TOTAIS], consulta))
+
+        db.session.commit()
+
+        total = db.session.scalar(select(func.count()).select_from(ResumoVendas))
+        log_info('reconstruir_resumo_vendas', 'Resumo de vendas reconstruído com %s linhas.', total)
+        return total
+
+    @em_cache(ResumoVendas)
+    def relatorio(self, agrupar: str = 'mes', de: str = None, ate: str = None) -> list[dict]:
+        """Totais agrupados por período (dia, mes, ano) e/ou marca, tipo e vendedor.
+
+        Lê só RESUMO_VENDAS, filtrado pela janela [de, ate]: o custo depende
+        do tamanho da janela, não do histórico de vendas. Sem agrupamento por
+        dia e com a janela em meses inteiros, usa as linhas mensais.
+        """
+        nomes = [nome.strip() for nome in (agrupar or 'mes').split(',') if nome.strip()]
+        for nome in nomes:
+            if nome not in self.FORMATOS and nome not in self.DIMENSOES:
+                raise ValueError(f'Agrupamento inválido: {nome}.')
+
+        de  = para_data(de)  if de  else None
+        ate = para_data(ate) if ate else None
+
+        mensal   = 'dia' not in nomes and (not de or de.day == 1) and (not ate or self._fim_do_mes(ate))
+        colunas  = [self._coluna(nome, mensal).label(nome) for nome in nomes]
+        consulta = select(
+            *colunas,
+            func.sum(ResumoVendas.RES_QTD_VENDAS).label('vendas'),
+            func.sum(ResumoVendas.RES_VALOR_BRUTO).label('valor_bruto'),
+            func.sum(ResumoVendas.RES_QTD_CANCELADAS).label('canceladas'),
+            func.sum(ResumoVendas.RES_VALOR_CANCELADO).label('valor_cancelado'),
+        )
+
+        consulta = consulta.where(ResumoVendas.RES_PERIODO == (ResumoVendas.MES if mensal else ResumoVendas.DIA))
+
+        if de:
+            consulta = consulta.where(ResumoVendas.RES_DATA >= de)
+        if ate:
+            consulta = consulta.where(ResumoVendas.RES_DATA <= ate)
+
+        if colunas:
+            consulta = consulta.group_by(*colunas).order_by(*colunas)
+
+        return [self._serializar(linha, nomes) for linha in db.session.execute(consulta)]
+
+    def _coluna(self, nome: str, mensal: bool):
+        if nome == 'marca':
+            return ResumoVendas.RES_MARCA
+        if nome == 'tipo':
+            return ResumoVendas.RES_TIPO
+        if nome == 'vendedor':
+            return ResumoVendas.USU_CODIGO
+
+        # Nas linhas mensais RES_DATA já é o mês: agrupa pela coluna e formata
+        # na serialização, sem calcular uma expressão por linha.
+        formato = self.FORMATOS[nome]
+        if formato is None or (nome == 'mes' and mensal):
+            return ResumoVendas.RES_DATA
+        if db.engine.dialect.name == 'postgresql':
+            return func.to_char(ResumoVendas.RES_DATA, formato[1])
+        return func.substr(ResumoVendas.RES_DATA, 1, formato[0])
+
+    @staticmethod
+    def _fim_do_mes(data) -> bool:
+        return data.day == calendar.monthrange(data.year, data.month)[1]
+
+    @staticmethod
+    def _inicio_do_mes(coluna):
+        if db.engine.dialect.name == 'postgresql':
+            return cast(func.date_trunc('month', coluna), Date)
+        return func.date(coluna, 'start of month')
+
+    def _serializar(self, linha, nomes: list) -> dict:
+        dados = {}
+        for nome in nomes:
+            valor = getattr(linha, nome)
+            if nome == 'dia':
+                valor = valor.isoformat()
+            elif nome == 'mes' and not isinstance(valor, str):
+                valor = valor.isoformat()[:7]
+            elif nome == 'vendedor':
+                valor = valor or None
+            dados[nome] = valor
+
+        bruto     = Decimal(linha.valor_bruto or 0)
+        cancelado = Decimal(linha.valor_cancelado or 0)
+        dados.update({
+            'vendas'          : int(linha.vendas or 0),
+            'canceladas'      : int(linha.canceladas or 0),
+            'valor_bruto'     : float(bruto),
+            'valor_cancelado' : float(cancelado),
+            'valor_liquido'   : float(bruto - cancelado),
+        })
+        return dados
@@ -0,0 +1,131 @@
+from datetime       import datetime, timedelta
+from flask          import current_app
+from sqlalchemy     import select, delete, tuple_
+from src            import db
+from src.models     import Exclusoes
+from src.utils      import log_info, codificar_cursor, decodificar_cursor, LIMITE_PADRAO, Serializador
+from src.utils      import contar_linhas_lidas
+
+
+class SincroniaService:
+    """Sincronização incremental (`GET /api/<entidade>/changes?since=`).
+
+    O cliente guarda uma cópia da listagem e pede só o que mudou desde o
+    cursor da última chamada: as linhas criadas ou alteradas, lidas em
+    keyset sobre (updated_at, chave), e as lápides das excluídas, lidas de
+    EXCLUSOES a partir do último EXC_CODIGO visto. Sem `since` a primeira
+    chamada traz a tabela toda, em páginas.
+
+    Uma linha só entra depois de passada a margem (`_margem`): o updated_at
+    é gravado antes do commit, e uma transação ainda aberta não pode ficar
+    para trás de um cursor que já a passou. Por isso a margem precisa cobrir
+    a transação de escrita mais longa, espera pela trava incluída.
+    """
+
+    def registrar_exclusao(self, modelo, codigo: int) -> None:
+        """Lápide do registro, gravada na transação da exclusão."""
+        db.session.add(Exclusoes(modelo.__tablename__, codigo))
+
+    def alteracoes(
+        self,
+        listagem : Serializador,
+        desde    : str   = None,
+        limite   : int   = LIMITE_PADRAO,
+        campos   : tuple = None
+    ) -> tuple[dict, int]:
+        data, codigo, exclusao, lido_em = self._ler_cursor(desde)
+        agora = datetime.utcnow()
+
+        # As lápides mais antigas que a retenção já podem ter sido apagadas.
+        if lido_em and lido_em < agora - timedelta(days=self._retencao()):
+            return {'error': 'Cursor expirado; baixe a listagem completa.'}, 410
+
+        # Sem a chave o cliente não teria como casar a linha com a sua cópia.
+        chave = listagem.chave
+        if campos:
+            campos = (*campos, next(nome for nome, coluna in listagem.campos.items() if coluna is chave))
+
+        ate      = agora - timedelta(seconds=self._margem())
+        restrito = listagem.restringir(campos)
+        alterado = chave.table.c.updated_at
+
+        consulta = restrito.consulta().add_columns(alterado).where(alterado <= ate)
+        if data is not None:
+            consulta = consulta.where(tuple_(alterado, chave) > tuple_(data, codigo))
+
+        linhas = db.session.execute(consulta.order_by(alterado, chave).limit(limite + 1)).all()
+        mais   = len(linhas) > limite
+        linhas = linhas[:limite]
+        contar_linhas_lidas(len(linhas))
+        if linhas:
+            data, codigo = linhas[-1][-1], linhas[-1]._mapping[chave]
+
+        lapides = db.session.execute(
+            select(Exclusoes.EXC_CODIGO, Exclusoes.EXC_REGISTRO)
+            .where(
+                Exclusoes.EXC_TABELA == chave.table.name,
+                Exclusoes.EXC_CODIGO > exclusao,
+                Exclusoes.EXC_DATA   <= ate
+            )
+            .order_by(Exclusoes.EXC_CODIGO)
+            .limit(limite + 1)
+        ).all()
+        mais    = mais or len(lapides) > limite
+        lapides = lapides[:limite]
+        if lapides:
+            exclusao = lapides[-1].EXC_CODIGO
+
+        return {
+            'dados'      : [restrito(linha[:-1]) for linha in linhas],
+            'excluidos'  : self._excluidos(chave, [lapide.EXC_REGISTRO for lapide in lapides]),
+            'cursor'     : codificar_cursor(data and data.isoformat(), codigo, exclusao, ate.isoformat()),
+            'mais'       : mais
+        }, 200
+
+    def limpar(self) -> int:
+        """Apaga as lápides mais antigas que SINCRONIA_RETENCAO_DIAS."""
+        limite    = datetime.utcnow() - timedelta(days=self._retencao())
+        resultado = db.session.execute(delete(Exclusoes).where(Exclusoes.EXC_DATA < limite))
+        db.session.commit()
+
+        log_info('limpar_exclusoes', '%s lápides anteriores a %s apagadas.', resultado.rowcount, limite.isoformat())
+        return resultado.rowcount
+
+    @staticmethod
+    def _excluidos(chave, registros: list[int]) -> list[int]:
+        # Um código que voltou a existir (SQLite reaproveita o maior código
+        # apagado) vem pelo updated_at; a lápide antiga não pode apagá-lo.
+        if not registros:
+            return []
+        existentes = set(db.session.scalars(select(chave).where(chave.in_(registros))))
+        return [registro for registro in dict.fromkeys(registros) if registro not in existentes]
+
+    @staticmethod
+    def _ler_cursor(desde: str | None) -> tuple[datetime | None, int | None, int, datetime | None]:
+        if not desde:
+            return None, None, 0, None
+
+        valores = decodificar_cursor(desde)
+        try:
+            data, codigo, exclusao, lido_em = valores
+            return (
+                datetime.fromisoformat(data) if data is not None else None,
+                int(codigo) if codigo is not None else None,
+                int(exclusao),
+                datetime.fromisoformat(lido_em)
+            )
+        except (ValueError, TypeError):
+            raise ValueError('Cursor inválido.')
+
+    @staticmethod
+    def _margem() -> float:
+        """SINCRONIA_MARGEM, e nunca menos que o dobro do busy_timeout do
+        SQLite: uma escrita pode passar esse tempo esperando a trava antes
+        do commit, com o updated_at já gravado."""
+        margem = float(current_app.config.get('SINCRONIA_MARGEM', 30))
+        espera = current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).get('connect_args', {}).get('timeout', 0)
+        return max(margem, 2 * float(espera))
+
+    @staticmethod
+    def _retencao() -> int:
+        return int(current_app.config.get('SINCRONIA_RETENCAO_DIAS', 30))
@@ -1,38 +1,50 @@
+from typing            import Iterator
+from sqlalchemy        import select, or_, func
 from sqlalchemy.exc    import SQLAlchemyError
 from src               import db
 from src.models        import Usuarios
-from src.enums         import UsuariosStatusEnum, UsuariosTipoEnum
-from src.utils         import log_info, log_error, validar_enum, remover_acentos
-from werkzeug.security import generate_password_hash
+from src.enums         import UsuariosTipoEnum
+from src.utils         import log_info, log_error, paginar, LIMITE_PADRAO, LOTE_STREAM, em_cache
+from src.utils         import gerar_hash_senha, Serializador, Esquema, Campo, corpo_erros
+from .service_sync     import SincroniaService
 
 
 class UsuariosService:
+    LISTAGEM = Serializador({
+        'id'         : Usuarios.USU_CODIGO,
+        'email'      : Usuarios.USU_EMAIL,
+        'nome'       : Usuarios.USU_NOME,
+        'tipo'       : Usuarios.USU_TIPO,
+        'status'     : Usuarios.USU_STATUS,
+        'created_at' : Usuarios.created_at,
+    })
+    ESQUEMA  = Esquema({
+        'email'  : Campo(Usuarios.USU_EMAIL,  obrigatorio=True),
+        'nome'   : Campo(Usuarios.USU_NOME,   obrigatorio=True),
+        'senha'  : Campo(Usuarios.USU_SENHA,  obrigatorio=True, aparar=False),
+        'tipo'   : Campo(Usuarios.USU_TIPO,   obrigatorio=True),
+        'status' : Campo(Usuarios.USU_STATUS, obrigatorio=True),
+    })
+
     def __init__(self) -> None:
-        pass
+        self.sincronia = SincroniaService()
         
     def criar_usuario(self, dados: dict) -> tuple[dict, int]:
-        obrigatorios = ['email', 'nome', 'senha', 'tipo', 'status']
-        
-        if not dados or not all(dados.get(campo) for campo in obrigatorios):
-            return {'error': 'Campos obrigatórios ausentes.'}, 400
+        valores, erros = self.ESQUEMA.validar(dados)
+        if erros:
+            return corpo_erros(erros), 400
 
-        tipo_rmv   = remover_acentos(dados['tipo'])
-        status_rmv = remover_acentos(dados['status'])
-        
-        tipo   = validar_enum(UsuariosTipoEnum,   tipo_rmv)
-        status = validar_enum(UsuariosStatusEnum, status_rmv)
+        # O KDF é lento de propósito: roda no pool de senhas enquanto esta
+        # thread consulta o e-mail no banco.
+        hash_senha = gerar_hash_senha(valores['USU_SENHA'])
 
-        if not tipo or not status:
-            return {'error': 'Tipo ou status inválido.'}, 400
+        if db.session.scalars(select(Usuarios.USU_CODIGO).where(Usuarios.USU_EMAIL == valores['USU_EMAIL'])).first():
+            hash_senha.cancel()
+            return {'error': 'E-mail já cadastrado.'}, 409
 
         try:       
-            usuario = Usuarios(
-                nome   = dados['nome'],
-                email  = dados['email'],
-                senha  = generate_password_hash(dados['senha']),
-                tipo   = tipo,
-                status = status
-            )
+            valores['USU_SENHA'] = hash_senha.result()
+            usuario = Usuarios(**self.ESQUEMA.argumentos(valores))
             db.session.add(usuario)
             db.session.commit()
             
@@ -44,33 +56,30 @@ class UsuariosService:
             raise e    
            
     def atualizar_usuario(self, id: int, dados: dict) -> tuple[dict, int]:
-        usuario = Usuarios.query.get(id)
+        # Senha vazia na edição mantém a atual.
+        if isinstance(dados, dict) and dados.get('senha') in (None, ''):
+            dados = {campo: valor for campo, valor in dados.items() if campo != 'senha'}
+
+        valores, erros = self.ESQUEMA.validar(dados, parcial=True)
+        if erros:
+            return corpo_erros(erros), 400
+
+        hash_senha = gerar_hash_senha(valores['USU_SENHA']) if 'USU_SENHA' in valores else None
+        usuario    = Usuarios.query.get(id)
 
         if not usuario:
+            if hash_senha:
+                hash_senha.cancel()
             raise ValueError('Usuário não encontrado.')
-        
-        tipo = None
-        if 'tipo' in dados:
-            tipo_rmv = remover_acentos(dados['tipo'])
-            tipo = validar_enum(UsuariosTipoEnum, tipo_rmv)
-            if not tipo:
-                return {'error': 'Tipo inválido.'}, 400
-
-        status = None
-        if 'status' in dados:
-            status_rmv = remover_acentos(dados['status'])
-            status = validar_enum(UsuariosStatusEnum, status_rmv)
-            if not status:
-                return {'error': 'Status inválido.'}, 400
-
-        if 'email'  in dados: usuario.USU_EMAIL  = dados['email']
-        if 'nome'   in dados: usuario.USU_NOME   = dados['nome']
-        if 'senha'  in dados: usuario.USU_SENHA  = generate_password_hash(dados['senha'])
-        if 'tipo'   in dados: usuario.USU_TIPO   = tipo
-        if 'status' in dados: usuario.USU_STATUS = status
+
+        if hash_senha:
+            valores['USU_SENHA'] = hash_senha.result()
+
+        for coluna, valor in valores.items():
+            setattr(usuario, coluna, valor)
 
         db.session.commit()
-        log_info('atualizar_usuario', f'Usuário ID {id} atualizado com sucesso.')
+        log_info('atualizar_usuario', 'Usuário ID %s atualizado com sucesso.', id)
         return {'message': 'Usuário atualizado com sucesso.'}, 200
     
     def excluir_usuario(self, id: int) -> tuple[dict, int]:
@@ -80,30 +89,48 @@ class UsuariosService:
             raise ValueError('Usuário não encontrado.')
 
         db.session.delete(usuario)
+        self.sincronia.registrar_exclusao(Usuarios, id)
         db.session.commit()
 
-        log_info('excluir_usuario', f'Usuário {id} deletado com sucesso.')
+        log_info('excluir_usuario', 'Usuário %s deletado com sucesso.', id)
         return {'message': 'Usuário deletado com sucesso.'}, 200
     
-    def listar_usuarios(self, termo: str = '') -> list[dict]:
-        termo    = termo.lower()
-        usuarios = Usuarios.query.all()
-
-        lista = []
-        for usuario in usuarios:
-            if (
-                termo in usuario.USU_NOME.lower() or
-                termo in usuario.USU_EMAIL.lower() or 
-                termo in usuario.USU_TIPO.lower()
-            ):
-                lista.append({
-                    'id'         : usuario.USU_CODIGO,
-                    'email'      : usuario.USU_EMAIL,
-                    'nome'       : usuario.USU_NOME,
-                    'senha'      : usuario.USU_SENHA,
-                    'tipo'       : usuario.USU_TIPO.value,
-                    'status'     : usuario.USU_STATUS.value,
-                    'created_at' : usuario.created_at
-                })
-
-        return lista
\ No newline at end of file
+    def obter_usuario(self, id: int, campos: tuple = None) -> tuple[dict, int]:
+        usuario = self.LISTAGEM.restringir(campos).obter(id)
+
+        if usuario is None:
+            return {'error': 'Usuário não encontrado.'}, 404
+        return usuario, 200
+
+    @em_cache(Usuarios)
+    def listar_usuarios(self, termo: str = '', limite: int = LIMITE_PADRAO, apos: str = None, campos: tuple = None) -> dict:
+        listagem        = self.LISTAGEM.restringir(campos)
+        linhas, proximo = paginar(self._consulta(termo, listagem), Usuarios.USU_CODIGO, limite, apos)
+
+        return {
+            'dados'       : listagem.listar(linhas),
+            'next_cursor' : proximo
+        }
+
+    def iterar_usuarios(self, termo: str = '', campos: tuple = None) -> Iterator[dict]:
+        """Mesma listagem de listar_usuarios, lida em lotes para o modo streaming."""
+        listagem = self.LISTAGEM.restringir(campos)
+        consulta = self._consulta(termo, listagem).order_by(Usuarios.USU_CODIGO).execution_options(yield_per=LOTE_STREAM)
+        yield from map(listagem, db.session.execute(consulta))
+
+    def _consulta(self, termo: str, listagem: Serializador):
+        termo    = termo.strip().lower()
+        consulta = listagem.consulta()
+
+        if termo:
+            # O tipo é um enum: resolve os valores que casam com o termo aqui
+            # e filtra com IN, sem converter a coluna linha a linha no banco.
+            tipos = [tipo for tipo in UsuariosTipoEnum if termo in tipo.value.lower()]
+
+            consulta = consulta.where(or_(
+                func.lower(Usuarios.USU_NOME).contains(termo, autoescape=True),
+                func.lower(Usuarios.USU_EMAIL).contains(termo, autoescape=True),
+                Usuarios.USU_TIPO.in_(tipos)
+            ))
+
+        return consulta
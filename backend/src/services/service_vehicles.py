@@ -1,42 +1,69 @@
-from sqlalchemy.exc import SQLAlchemyError
+from typing         import Iterable, Iterator
+from sqlalchemy     import select, insert, update, func
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from src            import db
-from src.models     import Veiculos
-from src.enums      import VeiculoStatusEnum, VeiculoTipoEnum
-from src.utils      import log_info, log_error, validar_enum, remover_acentos
+from src.models     import Veiculos, indice_veiculos, facetas_veiculos
+from src.enums      import VeiculoStatusEnum, VeiculoTipoEnum, EventoTipoEnum
+from src.utils      import log_info, log_error, validar_enum, paginar, LIMITE_PADRAO, LOTE_STREAM, em_cache
+from src.utils      import em_lotes, para_decimal, para_inteiro, codificar_cursor, decodificar_cursor, ler_ids, Serializador
+from src.utils      import Esquema, Campo, corpo_erros, resumir_erros
+from .service_sync  import SincroniaService
+from .service_events import EventosService
 
 
 class VeiculosService:
+    FAIXAS_BUSCA  = {'ano': para_inteiro, 'preco': para_decimal, 'km': para_decimal}
+    FILTROS_LOTE  = {'marca', 'modelo', 'tipo', 'status', *(f'{nome}_{lado}' for nome in FAIXAS_BUSCA for lado in ('min', 'max'))}
+    COLUNAS_LOTE  = {
+        'marca'  : Veiculos.VEI_MARCA,
+        'modelo' : Veiculos.VEI_MODELO,
+        'tipo'   : Veiculos.VEI_TIPO,
+        'status' : Veiculos.VEI_STATUS,
+        'ano'    : Veiculos.VEI_ANO,
+        'preco'  : Veiculos.VEI_PRECO,
+        'km'     : Veiculos.VEI_KM,
+    }
+    ENUMS_LOTE    = {'tipo': VeiculoTipoEnum, 'status': VeiculoStatusEnum}
+    CAMPOS_LOTE   = {'tipo', 'status', 'cor', 'preco'}
+    ESQUEMA       = Esquema({
+        'placa'  : Campo(Veiculos.VEI_PLACA,  obrigatorio=True, ajuste=str.upper),
+        'marca'  : Campo(Veiculos.VEI_MARCA,  obrigatorio=True),
+        'modelo' : Campo(Veiculos.VEI_MODELO, obrigatorio=True),
+        'preco'  : Campo(Veiculos.VEI_PRECO,  obrigatorio=True, minimo=0),
+        'ano'    : Campo(Veiculos.VEI_ANO,    obrigatorio=True, minimo=1900),
+        'cor'    : Campo(Veiculos.VEI_COR,    padrao=''),
+        'km'     : Campo(Veiculos.VEI_KM,     padrao=0, minimo=0),
+        'tipo'   : Campo(Veiculos.VEI_TIPO,   obrigatorio=True),
+        'status' : Campo(Veiculos.VEI_STATUS, obrigatorio=True),
+    })
+    LISTAGEM      = Serializador({
+        'id'     : Veiculos.VEI_CODIGO,
+        'marca'  : Veiculos.VEI_MARCA,
+        'modelo' : Veiculos.VEI_MODELO,
+        'placa'  : Veiculos.VEI_PLACA,
+        'preco'  : Veiculos.VEI_PRECO,
+        'ano'    : Veiculos.VEI_ANO,
+        'km'     : Veiculos.VEI_KM,
+        'cor'    : Veiculos.VEI_COR,
+        'tipo'   : Veiculos.VEI_TIPO,
+        'status' : Veiculos.VEI_STATUS,
+    })
+
     def __init__(self) -> None:
-        pass
+        self.sincronia = SincroniaService()
+        self.eventos   = EventosService()
         
     def criar_veiculo(self, dados: dict) -> tuple[dict, int]:
-        obrigatorios = ['placa', 'marca', 'modelo', 'preco', 'ano', 'tipo', 'status']
-        
-        if not dados or not all(dados.get(campo) for campo in obrigatorios):
-            return {'error': 'Campos obrigatórios ausentes.'}, 400
-
-        status_rmv = remover_acentos(dados['status'])
-        tipo_rmv   = remover_acentos(dados['tipo'])
+        valores, erros = self.ESQUEMA.validar(dados)
+        if erros:
+            return corpo_erros(erros), 400
 
-        status = validar_enum(VeiculoStatusEnum, status_rmv)
-        tipo   = validar_enum(VeiculoTipoEnum, tipo_rmv)
-        
-        if not status or not tipo:
-            return {'error': 'Status ou Tipo inválido.'}, 400
-        
         try:
-            veiculo = Veiculos(
-                placa  = dados['placa'],
-                marca  = dados['marca'],
-                modelo = dados['modelo'],
-                preco  = dados['preco'],
-                ano    = dados['ano'],
-                cor    = dados.get('cor', ''),
-                km     = dados.get('km', 0),
-                tipo   = tipo,
-                status = status
-            )
+            veiculo = Veiculos(**self.ESQUEMA.argumentos(valores))
             db.session.add(veiculo)
+            db.session.flush()
+
+            indice_veiculos.indexar(veiculo, novos=True)
             db.session.commit()
             
             log_info('criar_veiculo', 'Veículo adicionado com sucesso.')
@@ -52,31 +79,19 @@ class VeiculosService:
         if not veiculo:
             raise ValueError('Veículo não encontrado.')
 
-        tipo = None
-        if 'tipo' in dados:
-            tipo_rmv = remover_acentos(dados['tipo'])
-            tipo = validar_enum(VeiculoTipoEnum, tipo_rmv)
-            if not tipo:
-                return {'error': 'Tipo inválido.'}, 400
-
-        status = None
-        if 'status' in dados:
-            status_rmv = remover_acentos(dados['status'])
-            status = validar_enum(VeiculoStatusEnum, status_rmv)
-            if not status:
-                return {'error': 'Status inválido.'}, 400
-
-        if 'placa'  in dados: veiculo.VEI_PLACA  = dados['placa']
-        if 'marca'  in dados: veiculo.VEI_MARCA  = dados['marca']
-        if 'modelo' in dados: veiculo.VEI_MODELO = dados['modelo']
-        if 'preco'  in dados: veiculo.VEI_PRECO  = dados['preco']
-        if 'ano'    in dados: veiculo.VEI_ANO    = dados['ano']
-        if 'cor'    in dados: veiculo.VEI_COR    = dados['cor']
-        if 'tipo'   in dados: veiculo.VEI_TIPO   = tipo
-        if 'status' in dados: veiculo.VEI_STATUS = status
+        valores, erros = self.ESQUEMA.validar(dados, parcial=True)
+        if erros:
+            return corpo_erros(erros), 400
+        self._sem_prazo(valores)
+
+        for coluna, valor in valores.items():
+            setattr(veiculo, coluna, valor)
+
+        if valores.keys() & {'VEI_PLACA', 'VEI_MARCA', 'VEI_MODELO'}:
+            indice_veiculos.indexar(veiculo)
 
         db.session.commit()
-        log_info('atualizar_veiculo', f'Veículo ID {id} atualizado com sucesso.')
+        log_info('atualizar_veiculo', 'Veículo ID %s atualizado com sucesso.', id)
         return {'message': 'Veículo atualizado com sucesso.'}, 200
     
     def excluir_veiculo(self, id: int) -> tuple[dict, int]:
@@ -86,32 +101,278 @@ class VeiculosService:
             raise ValueError('Veículo não encontrado.')
 
         db.session.delete(veiculo)
+        indice_veiculos.remover(id)
+        self.sincronia.registrar_exclusao(Veiculos, id)
         db.session.commit()
+        facetas_veiculos.remover(id)
 
-        log_info('excluir_veiculo', f'Veículo {id} deletado com sucesso.')
+        log_info('excluir_veiculo', 'Veículo %s deletado com sucesso.', id)
         return {'message': 'Veículo deletado com sucesso.'}, 200
     
-    def listar_veiculos(self, termo: str = '') -> list[dict]:
-        termo    = termo.lower()
-        veiculos = Veiculos.query.all()
-
-        lista = []
-        for veiculo in veiculos:
-            if (
-                termo in veiculo.VEI_MARCA.lower() or
-                termo in veiculo.VEI_MODELO.lower()
-            ):
-                lista.append({
-                    'id'     : veiculo.VEI_CODIGO,
-                    'marca'  : veiculo.VEI_MARCA,
-                    'modelo' : veiculo.VEI_MODELO,
-                    'placa'  : veiculo.VEI_PLACA,
-                    'preco'  : float(veiculo.VEI_PRECO),
-                    'ano'    : veiculo.VEI_ANO,
-                    'km'     : float(veiculo.VEI_KM),
-                    'cor'    : veiculo.VEI_COR,
-                    'tipo'   : veiculo.VEI_TIPO.value,
-                    'status' : veiculo.VEI_STATUS.value
-                })
-
-        return lista
\ No newline at end of file
+    def atualizar_em_lote(self, dados: dict) -> tuple[dict, int]:
+        """Aplica as mesmas alterações a vários veículos com um único UPDATE.
+
+        `ids` e/ou `filtro` (os mesmos filtros da busca facetada) escolhem os
+        veículos; `alteracoes` aceita status, tipo, cor e preco, este como
+        valor fixo ou {"multiplicar": fator} / {"somar": valor}. A versão de
+        cada linha é incrementada, então edições individuais em andamento
+        sobre esses veículos falham com conflito em vez de sobrescrever o lote.
+
+        Veículos vendidos ficam de fora, e Vendido não é um status de destino:
+        a venda e o cancelamento são o único caminho para entrar e sair dele.
+        """
+        if not dados:
+            return {'error': 'Informe ids ou filtro e as alterações.'}, 400
+
+        condicoes = self._condicoes_lote(dados)
+        valores   = self._valores_lote(dados.get('alteracoes'))
+
+        linhas = db.session.execute(
+            update(Veiculos)
+            .where(*condicoes, Veiculos.VEI_STATUS != VeiculoStatusEnum.Vendido)
+            .values(**valores, VEI_VERSAO=Veiculos.VEI_VERSAO + 1)
+            .returning(Veiculos.VEI_CODIGO, Veiculos.VEI_STATUS)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.eventos.registrar(Veiculos, EventoTipoEnum.Alterado, linhas)
+        db.session.commit()
+
+        log_info('atualizar_veiculos_em_lote', '%s veículos atualizados em lote.', len(linhas))
+        return {'message': 'Veículos atualizados com sucesso.', 'atualizados': len(linhas)}, 200
+
+    def _condicoes_lote(self, dados: dict) -> list:
+        condicoes = []
+        if 'ids' in dados:
+            condicoes.append(Veiculos.VEI_CODIGO.in_(ler_ids(dados['ids'])))
+
+        filtro = dados.get('filtro') or {}
+        if not isinstance(filtro, dict):
+            raise ValueError('filtro deve ser um objeto.')
+
+        invalidos = filtro.keys() - self.FILTROS_LOTE
+        if invalidos:
+            raise ValueError(f"Filtro inválido: {', '.join(sorted(invalidos))}.")
+
+        parametros = {
+            chave: ','.join(map(str, valor)) if isinstance(valor, list) else str(valor)
+            for chave, valor in filtro.items()
+        }
+        for nome, valores in self._filtros_busca(parametros).items():
+            coluna = self.COLUNAS_LOTE[nome]
+            if isinstance(valores, tuple):
+                minimo, maximo = valores
+                if minimo is not None: condicoes.append(coluna >= minimo)
+                if maximo is not None: condicoes.append(coluna <= maximo)
+            elif nome in self.ENUMS_LOTE:
+                condicoes.append(coluna.in_([self.ENUMS_LOTE[nome](valor) for valor in valores]))
+            else:
+                condicoes.append(coluna.in_(valores))
+
+        if not condicoes:
+            raise ValueError('Informe ids ou filtro.')
+        return condicoes
+
+    def _valores_lote(self, alteracoes) -> dict:
+        if not isinstance(alteracoes, dict) or not alteracoes:
+            raise ValueError('Informe as alterações.')
+
+        invalidos = alteracoes.keys() - self.CAMPOS_LOTE
+        if invalidos:
+            raise ValueError(f"Campo não pode ser alterado em lote: {', '.join(sorted(invalidos))}.")
+
+        # Valores fixos passam pelo mesmo esquema do cadastro; o ajuste de preço vira uma expressão.
+        ajuste = alteracoes.get('preco')
+        if isinstance(ajuste, dict):
+            alteracoes = {campo: valor for campo, valor in alteracoes.items() if campo != 'preco'}
+
+        valores, erros = self.ESQUEMA.validar(alteracoes, parcial=True)
+        if erros:
+            raise ValueError(resumir_erros(erros))
+        if valores.get('VEI_STATUS') == VeiculoStatusEnum.Vendido:
+            raise ValueError('Vendido não pode ser definido em lote; registre a venda.')
+
+        if isinstance(ajuste, dict):
+            valores['VEI_PRECO'] = self._ajuste_preco(ajuste)
+        return self._sem_prazo(valores)
+
+    @staticmethod
+    def _sem_prazo(valores: dict) -> dict:
+        # Status definido à mão encerra a reserva com prazo; um Reservado assim não vence.
+        if 'VEI_STATUS' in valores:
+            valores.update(VEI_RESERVA_CLIENTE=None, VEI_RESERVA_ATE=None)
+        return valores
+
+    def _ajuste_preco(self, valor: dict):
+        if len(valor) != 1:
+            raise ValueError('Ajuste de preço deve ter só "multiplicar" ou "somar".')
+
+        operacao, fator = next(iter(valor.items()))
+        fator = para_decimal(fator)
+
+        if operacao == 'multiplicar':
+            if fator <= 0:
+                raise ValueError('Fator de multiplicação deve ser positivo.')
+            return func.round(Veiculos.VEI_PRECO * fator, 2)
+        if operacao == 'somar':
+            return Veiculos.VEI_PRECO + fator
+
+        raise ValueError(f'Ajuste de preço inválido: {operacao}.')
+
+    def importar_veiculos(self, linhas: Iterable[tuple[int, dict]]) -> dict:
+        """Importação em lote: valida cada bloco de linhas, insere com um único
+        INSERT multi-linha e faz um commit por bloco. Linhas inválidas entram
+        no relatório de erros sem interromper o restante do arquivo."""
+        relatorio = {'total': 0, 'inseridos': 0, 'erros': []}
+
+        for lote in em_lotes(linhas):
+            relatorio['total'] += len(lote)
+
+            validos, erros = self.ESQUEMA.validar_lote(lote)
+            relatorio['erros'].extend(erros)
+
+            validos = self._descartar_placas_repetidas(validos, relatorio['erros'])
+            relatorio['inseridos'] += self._inserir_lote(validos, relatorio['erros'])
+
+        relatorio['erros'].sort(key=lambda erro: erro['linha'])
+
+        log_info('importar_veiculos', '%s de %s veículos importados.', relatorio['inseridos'], relatorio['total'])
+        return relatorio
+
+    def _descartar_placas_repetidas(self, validos: list, erros: list) -> list:
+        placas      = [valores['VEI_PLACA'] for _, valores in validos]
+        existentes  = set(db.session.scalars(select(Veiculos.VEI_PLACA).where(Veiculos.VEI_PLACA.in_(placas))))
+        restantes   = []
+
+        for numero, valores in validos:
+            if valores['VEI_PLACA'] in existentes:
+                erros.append({'linha': numero, 'error': f"Placa {valores['VEI_PLACA']} já cadastrada."})
+                continue
+            existentes.add(valores['VEI_PLACA'])
+            restantes.append((numero, valores))
+
+        return restantes
+
+    def _inserir_lote(self, validos: list, erros: list) -> int:
+        if not validos:
+            return 0
+
+        inserir = insert(Veiculos).returning(
+            Veiculos.VEI_CODIGO, Veiculos.VEI_PLACA, Veiculos.VEI_MARCA, Veiculos.VEI_MODELO, Veiculos.VEI_STATUS
+        )
+        try:
+            linhas = db.session.execute(inserir, [valores for _, valores in validos]).all()
+            indice_veiculos.indexar(*linhas, novos=True)
+            self.eventos.registrar(Veiculos, EventoTipoEnum.Criado, ((linha.VEI_CODIGO, linha.VEI_STATUS) for linha in linhas))
+            db.session.commit()
+            return len(linhas)
+
+        except IntegrityError:
+            # Outra requisição cadastrou uma das placas entre a checagem e o
+            # INSERT: refaz o bloco linha a linha para achar quem falhou.
+            db.session.rollback()
+
+        inseridos = 0
+        for numero, valores in validos:
+            try:
+                with db.session.begin_nested():
+                    linha = db.session.execute(inserir, valores).one()
+                    indice_veiculos.indexar(linha, novos=True)
+                self.eventos.registrar(Veiculos, EventoTipoEnum.Criado, [(linha.VEI_CODIGO, linha.VEI_STATUS)])
+                inseridos += 1
+            except IntegrityError:
+                erros.append({'linha': numero, 'error': f"Placa {valores['VEI_PLACA']} já cadastrada."})
+
+        db.session.commit()
+        return inseridos
+
+    def obter_veiculo(self, id: int, campos: tuple = None) -> tuple[dict, int]:
+        veiculo = self.LISTAGEM.restringir(campos).obter(id)
+
+        if veiculo is None:
+            return {'error': 'Veículo não encontrado.'}, 404
+        return veiculo, 200
+
+    @em_cache(Veiculos)
+    def listar_veiculos(self, termo: str = '', limite: int = LIMITE_PADRAO, apos: str = None, campos: tuple = None) -> dict:
+        listagem = self.LISTAGEM.restringir(campos)
+
+        if termo.strip():
+            codigos, proximo = indice_veiculos.buscar(termo, limite, apos)
+            dados            = listagem.por_codigos(codigos)
+        else:
+            linhas, proximo = paginar(listagem.consulta(), Veiculos.VEI_CODIGO, limite, apos)
+            dados           = listagem.listar(linhas)
+
+        return {
+            'dados'       : dados,
+            'next_cursor' : proximo
+        }
+
+    def buscar_veiculos(self, parametros, limite: int = LIMITE_PADRAO, apos: str = None, campos: tuple = None) -> dict:
+        """Busca facetada do estoque: a página, o total e as contagens por faceta.
+
+        Filtros: marca, modelo, tipo e status (valores separados por vírgula)
+        e as faixas ano_min/ano_max, preco_min/preco_max e km_min/km_max. Tudo
+        é resolvido no índice de facetas em memória; do banco só se lê a
+        página, pela chave primária.
+        """
+        filtros = self._filtros_busca(parametros)
+
+        inicio = None
+        if apos:
+            inicio = decodificar_cursor(apos)[0]
+            if not isinstance(inicio, int):
+                raise ValueError('Cursor inválido.')
+
+        codigos, proximo, total, facetas = facetas_veiculos.consultar(filtros, limite, inicio)
+
+        return {
+            'dados'       : self.LISTAGEM.restringir(campos).por_codigos(codigos),
+            'next_cursor' : codificar_cursor(proximo) if proximo else None,
+            'total'       : total,
+            'facetas'     : facetas
+        }
+
+    def _filtros_busca(self, parametros) -> dict:
+        filtros = {}
+
+        for nome in ('marca', 'modelo'):
+            valores = {valor.strip() for valor in parametros.get(nome, '').split(',') if valor.strip()}
+            if valores:
+                filtros[nome] = valores
+
+        for nome, enum in (('tipo', VeiculoTipoEnum), ('status', VeiculoStatusEnum)):
+            valores = set()
+            for valor in (valor.strip() for valor in parametros.get(nome, '').split(',') if valor.strip()):
+                membro = validar_enum(enum, valor)
+                if not membro:
+                    raise ValueError(f'{nome.capitalize()} inválido: {valor}.')
+                valores.add(membro.value)
+            if valores:
+                filtros[nome] = valores
+
+        for nome, converter in self.FAIXAS_BUSCA.items():
+            minimo = parametros.get(f'{nome}_min')
+            maximo = parametros.get(f'{nome}_max')
+            if minimo or maximo:
+                filtros[nome] = (
+                    float(converter(minimo)) if minimo else None,
+                    float(converter(maximo)) if maximo else None
+                )
+
+        return filtros
+
+    def iterar_veiculos(self, termo: str = '', campos: tuple = None) -> Iterator[dict]:
+        """Mesma listagem de listar_veiculos, lida em lotes para o modo streaming."""
+        listagem = self.LISTAGEM.restringir(campos)
+
+        if termo.strip():
+            apos = None
+            while True:
+                codigos, apos = indice_veiculos.buscar(termo, LOTE_STREAM, apos)
+                yield from listagem.por_codigos(codigos)
+                if not apos:
+                    return
+
+        consulta = listagem.consulta().order_by(Veiculos.VEI_CODIGO).execution_options(yield_per=LOTE_STREAM)
+        yield from map(listagem, db.session.execute(consulta))
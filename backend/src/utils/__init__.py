@@ -1,3 +1,15 @@
-from .log import log_critical, log_error, log_info, log_warning
-from .validations import validar_enum
-from .utils import remover_acentos
\ No newline at end of file
+from .log import log_critical, log_error, log_info, log_warning, registrar_requisicoes
+from .validations import validar_enum, Esquema, Campo, corpo_erros, resumir_erros
+from .utils import remover_acentos, normalizar_busca
+from .pagination import (
+    LIMITE_PADRAO, LIMITE_MAXIMO, LISTA_COMPLETA_MAXIMO,
+    codificar_cursor, decodificar_cursor, ler_paginacao, paginar, paginar_particoes, corpo_listagem
+)
+from .streaming import LOTE_STREAM, quer_stream, resposta_ndjson, mensagem_sse, resposta_sse
+from .importacao import LOTE_IMPORTACAO, MAXIMO_IDS_LOTE, ler_importacao, em_lotes, para_decimal, para_inteiro, para_data, ler_ids
+from .cache import cache, em_cache
+from .senhas import gerar_hash_senha, verificar_senha
+from .metrics import metricas, contar_linhas_lidas
+from .serialization import Serializador, ProvedorJson, ler_campos
+from .pubsub import canal_eventos, Assinante
+from .prazos import AgendadorPrazos
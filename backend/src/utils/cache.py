@@ -0,0 +1,261 @@
+import json
+import pickle
+import threading
+import time
+
+from collections    import OrderedDict
+from functools      import wraps
+from itertools      import chain
+from sqlalchemy     import event
+from sqlalchemy.orm import Session
+
+
+class CacheLRU:
+    """Backend em memória do processo: LRU com expiração por TTL."""
+
+    def __init__(self, tamanho: int = 1024, ttl: float = 30.0) -> None:
+        self.tamanho   = tamanho
+        self.ttl       = ttl
+        self._itens    = OrderedDict()
+        self._versoes  = {}
+        self._trava    = threading.Lock()
+        self.despejos  = 0
+        self.expirados = 0
+
+    def obter(self, chave: str) -> tuple[bool, object]:
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is None:
+                return False, None
+
+            valor, expira_em = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                self.expirados += 1
+                return False, None
+
+            self._itens.move_to_end(chave)
+            return True, valor
+
+    def gravar(self, chave: str, valor) -> None:
+        with self._trava:
+            self._itens[chave] = (valor, time.monotonic() + self.ttl)
+            self._itens.move_to_end(chave)
+
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+                self.despejos += 1
+
+    def versao(self, entidade: str) -> int:
+        return self._versoes.get(entidade, 0)
+
+    def incrementar_versao(self, entidade: str) -> None:
+        with self._trava:
+            self._versoes[entidade] = self._versoes.get(entidade, 0) + 1
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._itens.clear()
+
+    def estatisticas(self) -> dict:
+        return {'itens': len(self._itens), 'despejos': self.despejos, 'expirados': self.expirados}
+
+
+class ClienteCacheLocal:
+    """Substituto local de um servidor de cache compartilhado (ex.: Redis).
+
+    Implementa só o subconjunto de comandos usado por CacheCompartilhado,
+    com a mesma semântica, para desenvolvimento e testes sem o servidor.
+    """
+
+    def __init__(self) -> None:
+        self._dados = {}
+        self._trava = threading.Lock()
+
+    def get(self, chave: str):
+        with self._trava:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em is not None and expira_em < time.monotonic():
+                del self._dados[chave]
+                return None
+            return valor
+
+    def set(self, chave: str, valor, ex: float = None) -> None:
+        with self._trava:
+            self._dados[chave] = (valor, time.monotonic() + ex if ex else None)
+
+    def incr(self, chave: str) -> int:
+        with self._trava:
+            valor = int(self._dados.get(chave, (0, None))[0]) + 1
+            self._dados[chave] = (valor, None)
+            return valor
+
+    def flushdb(self) -> None:
+        with self._trava:
+            self._dados.clear()
+
+
+class CacheCompartilhado:
+    """Backend compartilhado entre processos, sobre um cliente estilo Redis.
+
+    As versões das entidades também ficam no servidor, então um commit em um
+    worker invalida as listagens em cache de todos os outros.
+    """
+
+    PREFIXO = 'concessionaria:'
+
+    def __init__(self, cliente, ttl: float = 30.0) -> None:
+        self.cliente = cliente
+        self.ttl     = ttl
+
+    def obter(self, chave: str) -> tuple[bool, object]:
+        bruto = self.cliente.get(self.PREFIXO + chave)
+        if bruto is None:
+            return False, None
+        return True, pickle.loads(bruto)
+
+    def gravar(self, chave: str, valor) -> None:
+        self.cliente.set(self.PREFIXO + chave, pickle.dumps(valor), ex=self.ttl)
+
+    def versao(self, entidade: str) -> int:
+        return int(self.cliente.get(self.PREFIXO + 'versao:' + entidade) or 0)
+
+    def incrementar_versao(self, entidade: str) -> None:
+        self.cliente.incr(self.PREFIXO + 'versao:' + entidade)
+
+    def limpar(self) -> None:
+        self.cliente.flushdb()
+
+    def estatisticas(self) -> dict:
+        return {}
+
+
+class CacheListagens:
+    """Cache de resultados das listagens, na frente dos métodos listar_*.
+
+    A chave é (método, parâmetros) mais a versão de cada tabela da qual a
+    listagem depende. Um commit que escreve em uma tabela incrementa a versão
+    dela, de modo que só as listagens afetadas deixam de ser encontradas; as
+    entradas antigas saem pelo LRU ou pelo TTL. A versão é lida antes de
+    consultar o banco, então um resultado calculado durante um commit
+    concorrente fica gravado sob a versão anterior e nunca é servido depois.
+    """
+
+    def __init__(self, backend=None) -> None:
+        self.backend       = backend
+        self.acertos       = 0
+        self.falhas        = 0
+        self.invalidacoes  = 0
+
+    def init_app(self, app) -> None:
+        tipo    = app.config.get('CACHE_BACKEND', 'memoria')
+        tamanho = int(app.config.get('CACHE_TAMANHO', 1024))
+        ttl     = float(app.config.get('CACHE_TTL', 30))
+
+        if tipo == 'desligado':
+            self.backend = None
+        elif tipo == 'compartilhado':
+            self.backend = CacheCompartilhado(self._cliente_compartilhado(app.config.get('CACHE_URL')), ttl)
+        else:
+            self.backend = CacheLRU(tamanho, ttl)
+
+        app.extensions['cache_listagens'] = self
+
+    @staticmethod
+    def _cliente_compartilhado(url: str):
+        if not url:
+            return ClienteCacheLocal()
+
+        import redis
+        return redis.Redis.from_url(url)
+
+    def obter_ou_calcular(self, tabelas: tuple, nome: str, params, calcular):
+        if self.backend is None:
+            return calcular()
+
+        versoes = '.'.join(str(self.backend.versao(tabela)) for tabela in tabelas)
+        chave   = f"{nome}|{versoes}|{json.dumps(params, sort_keys=True, default=str)}"
+
+        achou, valor = self.backend.obter(chave)
+        if achou:
+            self.acertos += 1
+            return valor
+
+        self.falhas += 1
+        valor = calcular()
+        self.backend.gravar(chave, valor)
+        return valor
+
+    def invalidar(self, *tabelas: str) -> None:
+        if self.backend is None:
+            return
+
+        for tabela in tabelas:
+            self.backend.incrementar_versao(tabela)
+            self.invalidacoes += 1
+
+    def limpar(self) -> None:
+        if self.backend is not None:
+            self.backend.limpar()
+
+    def estatisticas(self) -> dict:
+        return {
+            'backend'      : type(self.backend).__name__ if self.backend else None,
+            'acertos'      : self.acertos,
+            'falhas'       : self.falhas,
+            'invalidacoes' : self.invalidacoes,
+            **(self.backend.estatisticas() if self.backend else {})
+        }
+
+
+cache = CacheListagens()
+
+
+def em_cache(modelo, depende_de: tuple = ()):
+    """Guarda em cache o retorno de um método listar_* do service.
+
+    `depende_de` lista outros modelos que alteram o resultado (por exemplo a
+    busca de vendas pelo nome do cliente).
+    """
+    tabelas = tuple(m.__tablename__ for m in (modelo, *depende_de))
+
+    def decorador(metodo):
+        @wraps(metodo)
+        def wrapper(self, *args, **kwargs):
+            return cache.obter_ou_calcular(
+                tabelas, metodo.__qualname__, [args, kwargs], lambda: metodo(self, *args, **kwargs)
+            )
+        return wrapper
+    return decorador
+
+
+# Invalidação dirigida pelas escritas: a sessão anota as tabelas tocadas em
+# cada flush (ORM) ou comando INSERT/UPDATE/DELETE, e só depois do commit as
+# versões são incrementadas. Um rollback descarta as anotações.
+
+@event.listens_for(Session, 'after_flush')
+def _anotar_flush(session, contexto) -> None:
+    tabelas = session.info.setdefault('tabelas_alteradas', set())
+    for objeto in chain(session.new, session.dirty, session.deleted):
+        tabelas.add(objeto.__table__.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _anotar_comando(estado) -> None:
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        estado.session.info.setdefault('tabelas_alteradas', set()).add(estado.statement.table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_no_commit(session) -> None:
+    tabelas = session.info.pop('tabelas_alteradas', None)
+    if tabelas:
+        cache.invalidar(*tabelas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_no_rollback(session) -> None:
+    session.info.pop('tabelas_alteradas', None)
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+
+from datetime  import date
+from decimal   import Decimal, InvalidOperation
+from itertools import chain, islice
+from typing    import Iterable, Iterator
+from flask     import Request
+
+LOTE_IMPORTACAO = 1000
+MAXIMO_IDS_LOTE = 5000
+
+
+def ler_importacao(req: Request) -> Iterator[tuple[int, dict | None]]:
+    """Lê o corpo de uma importação em CSV ou NDJSON sem carregá-lo inteiro.
+
+    Gera (número da linha, registro). Uma linha NDJSON que não é um objeto
+    JSON vem com registro None, para entrar no relatório de erros.
+    """
+    tipo  = req.mimetype
+    texto = io.TextIOWrapper(req.stream, encoding='utf-8-sig', newline='')
+
+    if tipo in ('text/csv', 'application/csv'):
+        return _ler_csv(texto)
+
+    if tipo in ('application/x-ndjson', 'application/jsonl', 'application/json-lines'):
+        return _ler_ndjson(texto)
+
+    raise ValueError('Formato não suportado. Envie text/csv ou application/x-ndjson.')
+
+
+def _ler_csv(texto: io.TextIOBase) -> Iterator[tuple[int, dict | None]]:
+    cabecalho = texto.readline()
+    separador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    leitor    = csv.DictReader(chain([cabecalho], texto), delimiter=separador)
+
+    for numero, linha in enumerate(leitor, start=2):
+        yield numero, {
+            (campo or '').strip().lower(): (valor.strip() if isinstance(valor, str) else valor)
+            for campo, valor in linha.items()
+            if valor not in (None, '')
+        }
+
+
+def _ler_ndjson(texto: io.TextIOBase) -> Iterator[tuple[int, dict | None]]:
+    for numero, linha in enumerate(texto, start=1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except ValueError:
+            registro = None
+        yield numero, registro if isinstance(registro, dict) else None
+
+
+def em_lotes(itens: Iterable, tamanho: int = LOTE_IMPORTACAO) -> Iterator[list]:
+    itens = iter(itens)
+    while lote := list(islice(itens, tamanho)):
+        yield lote
+
+
+def para_decimal(valor) -> Decimal:
+    """Aceita número ou texto, inclusive no formato brasileiro ("1.234,50")."""
+    if isinstance(valor, bool):
+        raise ValueError(f'Valor numérico inválido: {valor}.')
+
+    if isinstance(valor, str) and ',' in valor:
+        valor = valor.replace('.', '').replace(',', '.')
+
+    try:
+        decimal = Decimal(str(valor).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError(f'Valor numérico inválido: {valor}.')
+
+    if not decimal.is_finite():
+        raise ValueError(f'Valor numérico inválido: {valor}.')
+
+    return decimal
+
+
+def para_inteiro(valor) -> int:
+    try:
+        decimal = para_decimal(valor)
+    except ValueError:
+        raise ValueError(f'Valor inteiro inválido: {valor}.')
+
+    if decimal != decimal.to_integral_value():
+        raise ValueError(f'Valor inteiro inválido: {valor}.')
+
+    return int(decimal)
+
+
+def para_data(valor) -> date:
+    """Data no formato ISO (AAAA-MM-DD)."""
+    if isinstance(valor, date):
+        return valor
+    try:
+        return date.fromisoformat(str(valor).strip())
+    except ValueError:
+        raise ValueError(f'Data inválida: {valor}. Use o formato AAAA-MM-DD.')
+
+
+def ler_ids(valor) -> list[int]:
+    """Lista de códigos de uma alteração em lote."""
+    if not isinstance(valor, list) or not valor:
+        raise ValueError('ids deve ser uma lista não vazia.')
+
+    if len(valor) > MAXIMO_IDS_LOTE:
+        raise ValueError(f'No máximo {MAXIMO_IDS_LOTE} ids por alteração em lote.')
+
+    return [para_inteiro(codigo) for codigo in valor]
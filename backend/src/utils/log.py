@@ -1,36 +1,159 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import time
+import uuid
 
-from datetime import datetime
+from datetime         import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from flask            import g, has_request_context, request
+from src.utils.utils  import trava_arquivo
 
-os.makedirs('logs', exist_ok=True)
+DIRETORIO = os.getenv('LOG_DIR', 'logs')
+RETENCAO  = int(os.getenv('LOG_RETENCAO_DIAS', 30))
+NIVEL     = os.getenv('LOG_NIVEL', 'INFO').upper()
+
+os.makedirs(DIRETORIO, exist_ok=True)
 
 logger = logging.getLogger('logger')
-logger.setLevel(logging.DEBUG)
+logger.setLevel(NIVEL)
+logger.propagate = False
+
+
+class FormatoJson(logging.Formatter):
+    """Uma linha JSON por registro. Roda na thread do QueueListener."""
+
+    CAMPOS_EXTRAS = ('origem', 'request_id', 'metodo', 'rota', 'status', 'latencia_ms', 'sql')
+
+    def format(self, record: logging.LogRecord) -> str:
+        linha = {
+            'ts'       : datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel'    : record.levelname,
+            'mensagem' : record.getMessage(),
+        }
+        for campo in self.CAMPOS_EXTRAS:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                linha[campo] = valor
+
+        return json.dumps(linha, ensure_ascii=False, default=str)
+
+
+class FiltroRequisicao(logging.Filter):
+    """Anexa o id da requisição corrente ao registro, na thread que loga."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, 'request_id', None) is None and has_request_context():
+            record.request_id = g.get('request_id')
+        return True
+
+
+class RotacaoCompartilhada(TimedRotatingFileHandler):
+    """Rotação à meia-noite de um arquivo escrito por vários processos.
+
+    Cada worker do gunicorn tem o seu handler sobre o mesmo sistema.log, e
+    cada um passa da meia-noite no seu próprio log seguinte. Sob uma trava
+    de arquivo, o primeiro renomeia sistema.log para sistema.log.AAAA-MM-DD;
+    os demais encontram o arquivo do dia já criado e só reabrem sistema.log,
+    em vez de apagá-lo e renomear o arquivo novo por cima dele.
+    """
+
+    def doRollover(self) -> None:
+        with trava_arquivo(os.path.join(os.path.dirname(self.baseFilename), '.rotacao.trava')):
+            if not os.path.exists(self._destino()):
+                return super().doRollover()
+
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            if not self.delay:
+                self.stream = self._open()
+            self.rolloverAt = self.computeRollover(int(time.time()))
 
-formato = logging.Formatter(
-    fmt='%(asctime)s | %(levelname)s | %(message)s',
-    datefmt='%d/%m/%Y %H:%M:%S'
-)
+    def _destino(self) -> str:
+        # O meio do período que terminou dá a mesma data que a rotação usa,
+        # sem depender do horário de verão.
+        periodo = time.localtime(self.rolloverAt - self.interval // 2)
+        return self.rotation_filename(f'{self.baseFilename}.{time.strftime(self.suffix, periodo)}')
 
-arquivo_handler = logging.FileHandler(
-    f'logs/sistema_{datetime.now().strftime("%d-%m-%Y")}.log',
-    encoding='utf-8'
-)
-arquivo_handler.setFormatter(formato)
+
+def _arquivo_handler() -> logging.Handler:
+    # Rotação à meia-noite, também em processos que ficam dias no ar; os
+    # arquivos antigos (sistema.log.AAAA-MM-DD) além da retenção são apagados.
+    handler = RotacaoCompartilhada(
+        os.path.join(DIRETORIO, 'sistema.log'),
+        when        = 'midnight',
+        backupCount = RETENCAO,
+        encoding    = 'utf-8',
+        delay       = True
+    )
+    handler.setFormatter(FormatoJson())
+    return handler
+
+
+fila     = queue.SimpleQueue()
+listener = QueueListener(fila, _arquivo_handler(), respect_handler_level=True)
 
 if not logger.handlers:
-    logger.addHandler(arquivo_handler)
+    fila_handler = QueueHandler(fila)
+    fila_handler.addFilter(FiltroRequisicao())
+    logger.addHandler(fila_handler)
+
+listener.start()
+# Depois de um fork o listener é outro: para o que estiver rodando na saída.
+atexit.register(lambda: listener.stop())
+
+
+def _reiniciar_apos_fork() -> None:
+    # A thread do listener não sobrevive ao fork (ex.: gunicorn com preload).
+    global listener
+    listener = QueueListener(fila, _arquivo_handler(), respect_handler_level=True)
+    listener.start()
+
 
-def log_info(origem: str, mensagem: str):
-    logger.info(f'{origem} | {mensagem}')
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_apos_fork)
 
-def log_warning(origem: str, mensagem: str):
-    logger.warning(f'{origem} | {mensagem}')
+
+# A mensagem aceita argumentos no estilo %s, que só são formatados se o nível
+# estiver habilitado: log_info('origem', 'Cliente %s atualizado.', id).
+
+def log_info(origem: str, mensagem: str, *args, **extras):
+    logger.info(mensagem, *args, extra={'origem': origem, **extras})
+
+def log_warning(origem: str, mensagem: str, *args, **extras):
+    logger.warning(mensagem, *args, extra={'origem': origem, **extras})
 
 def log_error(origem: str, erro: Exception):
-    logger.error(f'\n{origem} | {type(erro).__name__} | {erro}\n')
+    logger.error('%s: %s', type(erro).__name__, erro, exc_info=erro, extra={'origem': origem})
+
+def log_critical(origem: str, mensagem: str, *args, **extras):
+    logger.critical(mensagem, *args, extra={'origem': origem, **extras})
+
+
+def registrar_requisicoes(app) -> None:
+    """Gera/propaga o X-Request-ID e registra uma linha de acesso com a latência."""
+
+    @app.before_request
+    def _inicio_requisicao():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.inicio     = time.perf_counter()
 
-def log_critical(origem: str, mensagem: str):
-    logger.critical(f'\n{origem} | {mensagem}\n')
+    @app.after_request
+    def _fim_requisicao(response):
+        response.headers['X-Request-ID'] = g.get('request_id', '')
 
+        if logger.isEnabledFor(logging.INFO) and app.config.get('LOG_ACESSO', True):
+            logger.info(
+                '%s %s %s', request.method, request.path, response.status_code,
+                extra={
+                    'origem'      : 'acesso',
+                    'metodo'      : request.method,
+                    'rota'        : request.url_rule.rule if request.url_rule else request.path,
+                    'status'      : response.status_code,
+                    'latencia_ms' : round((time.perf_counter() - g.get('inicio', time.perf_counter())) * 1000, 3)
+                }
+            )
+        return response
@@ -0,0 +1,355 @@
+import atexit
+import os
+import pickle
+import threading
+import time
+
+from bisect            import bisect_left
+from collections       import defaultdict
+from flask             import g, has_request_context, request
+from sqlalchemy        import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm    import Session
+from src.utils.log     import log_warning
+from src.utils.utils   import trava_arquivo
+
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SQL  = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Requisições acima deste tempo (ms) vão para o log com o SQL executado; 0 desliga.
+LENTA_MS       = float(os.getenv('METRICAS_LENTA_MS', 0))
+MAXIMO_SQL_LOG = 50
+
+# Com vários workers, cada um grava o seu estado neste diretório a cada
+# INTERVALO_GRAVACAO segundos e a coleta soma todos (o gunicorn.conf.py o define).
+DIRETORIO          = os.getenv('METRICAS_DIR')
+INTERVALO_GRAVACAO = float(os.getenv('METRICAS_INTERVALO', 5))
+ENCERRADOS         = 'encerrados.pickle'
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus, com uma série por rótulo."""
+
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.series  = {}
+
+    def observar(self, rotulos: tuple, valor: float) -> None:
+        serie = self.series.get(rotulos)
+        if serie is None:
+            serie = self.series[rotulos] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+        serie[0][bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+        serie[2] += 1
+
+    def somar(self, series: dict) -> None:
+        """Acrescenta as séries de outro histograma com os mesmos buckets."""
+        for rotulos, (contagens, soma, total) in series.items():
+            serie = self.series.get(rotulos)
+            if serie is None:
+                serie = self.series[rotulos] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+            serie[0] = [atual + outra for atual, outra in zip(serie[0], contagens)]
+            serie[1] += soma
+            serie[2] += total
+
+
+class ConsumoRequisicao:
+    """O que uma requisição gastou no banco, acumulado pelos eventos do engine."""
+
+    __slots__ = ('inicio', 'consultas', 'tempo_sql', 'linhas_lidas', 'linhas_escritas', 'sqls')
+
+    def __init__(self, capturar_sql: bool) -> None:
+        self.inicio          = time.perf_counter()
+        self.consultas       = 0
+        self.tempo_sql       = 0.0
+        self.linhas_lidas    = 0
+        self.linhas_escritas = 0
+        self.sqls            = [] if capturar_sql else None
+
+
+class Metricas:
+    """Métricas do processo, exportadas em texto no formato do Prometheus.
+
+    Tudo fica em memória, protegido por uma trava só; cada requisição faz uma
+    atualização no fim, e cada comando SQL só soma no objeto da requisição.
+
+    Com METRICAS_DIR, cada processo grava uma cópia do seu estado em
+    `<pid>.pickle`, e `/api/metrics`, atendido por qualquer worker, exporta
+    a soma de todos. Contadores de workers encerrados (reciclados pelo
+    max_requests) continuam na soma, em `encerrados.pickle`, para os totais
+    não voltarem para trás; as requisições em andamento contam só os vivos.
+    """
+
+    def __init__(self) -> None:
+        self._trava        = threading.Lock()
+        self.em_andamento  = 0
+        self.requisicoes   = defaultdict(int)
+        self.duracao       = Histograma(BUCKETS_HTTP)
+        self.consultas     = defaultdict(int)
+        self.linhas        = defaultdict(int)
+        self.duracao_sql   = Histograma(BUCKETS_SQL)
+        self._pid          = None
+        self._gravacao     = threading.Lock()
+
+    def init_app(self, app) -> None:
+        app.before_request(self._inicio_requisicao)
+        app.after_request(self._fim_requisicao)
+        app.teardown_request(self._encerrar_requisicao)
+        app.extensions['metricas'] = self
+
+    def _inicio_requisicao(self) -> None:
+        if DIRETORIO and self._pid != os.getpid():
+            self._iniciar_gravacao()
+
+        g.consumo = ConsumoRequisicao(LENTA_MS > 0)
+        with self._trava:
+            self.em_andamento += 1
+
+    def _fim_requisicao(self, response):
+        consumo = g.get('consumo')
+        if consumo is None:
+            return response
+
+        duracao = time.perf_counter() - consumo.inicio
+        rota    = request.url_rule.rule if request.url_rule else 'desconhecida'
+        metodo  = request.method
+
+        with self._trava:
+            self.requisicoes[(metodo, rota, str(response.status_code))] += 1
+            self.duracao.observar((metodo, rota), duracao)
+            if consumo.consultas:
+                self.consultas[(metodo, rota)]                += consumo.consultas
+                self.linhas[(metodo, rota, 'lidas')]          += consumo.linhas_lidas
+                self.linhas[(metodo, rota, 'escritas')]       += consumo.linhas_escritas
+                self.duracao_sql.observar((metodo, rota), consumo.tempo_sql)
+
+        if LENTA_MS and duracao * 1000 >= LENTA_MS:
+            log_warning(
+                'requisicao_lenta', '%s %s levou %.1f ms (%s consultas, %.1f ms de SQL).',
+                metodo, request.path, duracao * 1000, consumo.consultas, consumo.tempo_sql * 1000,
+                rota=rota, latencia_ms=round(duracao * 1000, 3), sql=consumo.sqls
+            )
+        return response
+
+    def _encerrar_requisicao(self, erro) -> None:
+        if g.pop('consumo', None) is not None:
+            with self._trava:
+                self.em_andamento -= 1
+
+    def exportar(self, medidores: dict = None) -> str:
+        """Texto de exposição do Prometheus; `medidores` soma gauges avulsos (nome → valor)."""
+        if DIRETORIO:
+            return self._todos_os_processos()._exportar(medidores)
+        return self._exportar(medidores)
+
+    def _exportar(self, medidores: dict) -> str:
+        linhas = []
+
+        with self._trava:
+            linhas += self._cabecalho('http_requisicoes_em_andamento', 'gauge', 'Requisições em processamento.')
+            linhas.append(f'http_requisicoes_em_andamento {self.em_andamento}')
+
+            linhas += self._cabecalho('http_requisicoes_total', 'counter', 'Requisições por rota e status.')
+            for (metodo, rota, status), total in sorted(self.requisicoes.items()):
+                linhas.append(f'http_requisicoes_total{self._rotulos(metodo=metodo, rota=rota, status=status)} {total}')
+
+            linhas += self._cabecalho('http_requisicao_duracao_segundos', 'histogram', 'Latência por rota.')
+            linhas += self._histograma('http_requisicao_duracao_segundos', self.duracao)
+
+            linhas += self._cabecalho('sql_consultas_total', 'counter', 'Comandos SQL executados por rota.')
+            for (metodo, rota), total in sorted(self.consultas.items()):
+                linhas.append(f'sql_consultas_total{self._rotulos(metodo=metodo, rota=rota)} {total}')
+
+            linhas += self._cabecalho('sql_linhas_total', 'counter', 'Linhas lidas e escritas por rota.')
+            for (metodo, rota, tipo), total in sorted(self.linhas.items()):
+                linhas.append(f'sql_linhas_total{self._rotulos(metodo=metodo, rota=rota, tipo=tipo)} {total}')
+
+            linhas += self._cabecalho('sql_duracao_segundos', 'histogram', 'Tempo de SQL por requisição.')
+            linhas += self._histograma('sql_duracao_segundos', self.duracao_sql)
+
+        for nome, valor in (medidores or {}).items():
+            linhas += self._cabecalho(nome, 'gauge', None)
+            linhas.append(f'{nome} {valor}')
+
+        return '\n'.join(linhas) + '\n'
+
+    # Agregação entre processos (METRICAS_DIR). O estado é gravado por uma
+    # thread de cada processo, iniciada na primeira requisição depois do fork.
+
+    def _iniciar_gravacao(self) -> None:
+        with self._trava:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+
+        os.makedirs(DIRETORIO, exist_ok=True)
+        threading.Thread(target=self._gravar_periodicamente, name='metricas', daemon=True).start()
+        atexit.register(self._encerrar_processo)
+
+    def _gravar_periodicamente(self) -> None:
+        while True:
+            time.sleep(INTERVALO_GRAVACAO)
+            self._gravar()
+
+    def _estado(self) -> bytes:
+        with self._trava:
+            return pickle.dumps({
+                'em_andamento' : self.em_andamento,
+                'requisicoes'  : self.requisicoes,
+                'duracao'      : self.duracao.series,
+                'consultas'    : self.consultas,
+                'linhas'       : self.linhas,
+                'duracao_sql'  : self.duracao_sql.series,
+            })
+
+    def _somar(self, estado: dict, vivo: bool) -> None:
+        if vivo:
+            self.em_andamento += estado['em_andamento']
+        for nome in ('requisicoes', 'consultas', 'linhas'):
+            totais = getattr(self, nome)
+            for rotulos, total in estado[nome].items():
+                totais[rotulos] += total
+        self.duracao.somar(estado['duracao'])
+        self.duracao_sql.somar(estado['duracao_sql'])
+
+    def _gravar(self) -> None:
+        with self._gravacao:
+            _gravar_arquivo(os.path.join(DIRETORIO, f'{os.getpid()}.pickle'), self._estado())
+
+    def _todos_os_processos(self) -> 'Metricas':
+        # O processo que atende a coleta grava o seu estado antes, para ele
+        # entrar atualizado na soma.
+        if self._pid == os.getpid():
+            self._gravar()
+
+        # A trava é a do encerramento: um processo que sai não é somado duas
+        # vezes (no seu arquivo e em encerrados.pickle) nem nenhuma.
+        total = Metricas()
+        with trava_arquivo(os.path.join(DIRETORIO, '.trava')):
+            for nome in os.listdir(DIRETORIO):
+                if not nome.endswith('.pickle'):
+                    continue
+                estado = _ler_estado(os.path.join(DIRETORIO, nome))
+                if estado is not None:
+                    pid = nome.removesuffix('.pickle')
+                    total._somar(estado, pid.isdigit() and _processo_vivo(int(pid)))
+        return total
+
+    def _encerrar_processo(self) -> None:
+        """Passa os contadores do processo que sai para `encerrados.pickle`."""
+        if self._pid != os.getpid():
+            return
+
+        caminho = os.path.join(DIRETORIO, ENCERRADOS)
+        with trava_arquivo(os.path.join(DIRETORIO, '.trava')):
+            encerrados = Metricas()
+            for estado in (_ler_estado(caminho), pickle.loads(self._estado())):
+                if estado is not None:
+                    encerrados._somar(estado, False)
+
+            _gravar_arquivo(caminho, encerrados._estado())
+            try:
+                os.remove(os.path.join(DIRETORIO, f'{os.getpid()}.pickle'))
+            except FileNotFoundError:
+                pass
+
+    def _histograma(self, nome: str, histograma: Histograma) -> list:
+        linhas = []
+        for (metodo, rota), (contagens, soma, total) in sorted(histograma.series.items()):
+            acumulado = 0
+            for limite, contagem in zip((*histograma.buckets, '+Inf'), contagens):
+                acumulado += contagem
+                linhas.append(f'{nome}_bucket{self._rotulos(metodo=metodo, rota=rota, le=limite)} {acumulado}')
+            linhas.append(f'{nome}_sum{self._rotulos(metodo=metodo, rota=rota)} {soma:.6f}')
+            linhas.append(f'{nome}_count{self._rotulos(metodo=metodo, rota=rota)} {total}')
+        return linhas
+
+    @staticmethod
+    def _cabecalho(nome: str, tipo: str, ajuda: str) -> list:
+        return ([f'# HELP {nome} {ajuda}'] if ajuda else []) + [f'# TYPE {nome} {tipo}']
+
+    @staticmethod
+    def _rotulos(**rotulos) -> str:
+        pares = (f'{chave}="{_escapar_rotulo(valor)}"' for chave, valor in rotulos.items())
+        return '{' + ','.join(pares) + '}'
+
+
+def _escapar_rotulo(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _gravar_arquivo(caminho: str, conteudo: bytes) -> None:
+    # Escreve ao lado e troca de uma vez: quem lê nunca vê o arquivo pela metade.
+    with open(caminho + '.tmp', 'wb') as arquivo:
+        arquivo.write(conteudo)
+    os.replace(caminho + '.tmp', caminho)
+
+
+def _ler_estado(caminho: str) -> dict | None:
+    # Um arquivo pode sumir entre a listagem e a leitura (processo encerrado).
+    try:
+        with open(caminho, 'rb') as arquivo:
+            return pickle.load(arquivo)
+    except (FileNotFoundError, EOFError):
+        return None
+
+
+def _processo_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+metricas = Metricas()
+
+
+# Os eventos do engine só somam no consumo da requisição corrente; fora de uma
+# requisição (comandos de CLI, threads de fundo) não fazem nada além do teste.
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _antes_do_sql(conexao, cursor, sql, parametros, contexto, executemany) -> None:
+    conexao.info['sql_inicio'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _depois_do_sql(conexao, cursor, sql, parametros, contexto, executemany) -> None:
+    if not has_request_context():
+        return
+
+    consumo = g.get('consumo')
+    if consumo is None:
+        return
+
+    duracao = time.perf_counter() - conexao.info.pop('sql_inicio', time.perf_counter())
+    consumo.consultas += 1
+    consumo.tempo_sql += duracao
+
+    if cursor.description is None and cursor.rowcount > 0:
+        consumo.linhas_escritas += cursor.rowcount
+
+    if consumo.sqls is not None and len(consumo.sqls) < MAXIMO_SQL_LOG:
+        consumo.sqls.append({'sql': sql, 'ms': round(duracao * 1000, 3)})
+
+
+@event.listens_for(Session, 'loaded_as_persistent')
+def _contar_leitura(session, objeto) -> None:
+    contar_linhas_lidas(1)
+
+
+def contar_linhas_lidas(quantidade: int) -> None:
+    """Soma linhas lidas na requisição corrente.
+
+    Objetos do ORM são contados pelo `loaded_as_persistent`; as listagens
+    lidas como tuplas (Core) não passam por ele e contam aqui, onde são
+    buscadas (`paginar`, `Serializador`).
+    """
+    if quantidade and has_request_context():
+        consumo = g.get('consumo')
+        if consumo is not None:
+            consumo.linhas_lidas += quantidade
@@ -0,0 +1,106 @@
+import base64
+import json
+
+from sqlalchemy        import Select
+from src.database      import db
+from src.utils.metrics import contar_linhas_lidas
+
+LIMITE_PADRAO          = 50
+LIMITE_MAXIMO          = 500
+LISTA_COMPLETA_MAXIMO  = 1000
+
+
+def codificar_cursor(*valores) -> str:
+    bruto = json.dumps(valores, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> list:
+    try:
+        preenchido = cursor + '=' * (-len(cursor) % 4)
+        valores    = json.loads(base64.urlsafe_b64decode(preenchido.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Cursor inválido.')
+
+    if not isinstance(valores, list) or not valores:
+        raise ValueError('Cursor inválido.')
+
+    return valores
+
+
+def ler_paginacao(args) -> tuple[int, str | None, bool]:
+    """Lê `limit` e `after` da query string.
+
+    Retorna (limite, cursor, paginado). Sem nenhum dos dois parâmetros a
+    listagem não é paginada e o limite passa a ser LISTA_COMPLETA_MAXIMO.
+    """
+    limite = args.get('limit')
+    apos   = args.get('after') or None
+
+    if limite is None and apos is None:
+        return LISTA_COMPLETA_MAXIMO, None, False
+
+    if limite is None:
+        return LIMITE_PADRAO, apos, True
+
+    try:
+        limite = int(limite)
+    except ValueError:
+        raise ValueError('Parâmetro limit inválido.')
+
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ValueError(f'Parâmetro limit deve estar entre 1 e {LIMITE_MAXIMO}.')
+
+    return limite, apos, True
+
+
+def paginar(consulta: Select, chave, limite: int, apos: str = None) -> tuple[list, str | None]:
+    """Paginação por chave (keyset) sobre uma coluna única e crescente.
+
+    Busca `limite + 1` linhas para saber se existe uma próxima página sem
+    precisar de um COUNT. A consulta é de colunas (Core) e precisa selecionar
+    a própria `chave`; as linhas voltam como Row.
+    """
+    if apos:
+        ultimo, = decodificar_cursor(apos)
+        consulta = consulta.where(chave > ultimo)
+
+    linhas  = db.session.execute(consulta.order_by(chave).limit(limite + 1)).all()
+    proximo = None
+    contar_linhas_lidas(len(linhas))
+
+    if len(linhas) > limite:
+        linhas  = linhas[:limite]
+        proximo = codificar_cursor(linhas[-1]._mapping[chave])
+
+    return linhas, proximo
+
+
+def paginar_particoes(consultas: list[tuple[Select, object]], limite: int, apos: str = None) -> tuple[list, str | None]:
+    """`paginar` sobre várias tabelas com a mesma chave, sem códigos repetidos entre elas.
+
+    Cada consulta, com a sua `chave`, pagina pelo próprio índice; a página
+    da união são as `limite` menores chaves das páginas juntas. Há próxima
+    página se sobrou linha na junção ou se alguma tabela tinha mais.
+    """
+    pares = []
+    mais  = False
+    for consulta, chave in consultas:
+        linhas, proximo = paginar(consulta, chave, limite, apos)
+        pares.extend((linha._mapping[chave], linha) for linha in linhas)
+        mais = mais or proximo is not None
+
+    pares.sort(key=lambda par: par[0])
+    if len(pares) > limite:
+        pares = pares[:limite]
+        mais  = True
+
+    return [linha for _, linha in pares], codificar_cursor(pares[-1][0]) if mais else None
+
+
+def corpo_listagem(pagina: dict, paginado: bool) -> list | dict:
+    """Sem `limit`/`after` a rota mantém a resposta antiga (lista simples),
+    mas só enquanto o resultado couber em uma única página."""
+    if not paginado and not pagina['next_cursor']:
+        return pagina['dados']
+    return pagina
@@ -0,0 +1,112 @@
+import heapq
+import threading
+
+from datetime      import datetime, timedelta
+from src.utils.log import log_error
+
+
+class AgendadorPrazos:
+    """Prazos num min-heap e uma thread que vence, em lotes, os que passaram.
+
+    `agendar(chave, prazo)` custa O(log n) e só acorda a thread quando o
+    novo prazo passa a ser o mais próximo. A thread dorme até o topo do heap
+    vencer, retira tudo o que já passou e chama `vencer(chaves)` em lotes de
+    LOTE, dentro de um app context. Reagendar uma chave deixa a entrada
+    antiga no heap; ela é ignorada ao sair, porque `_prazos` guarda só o
+    prazo mais recente de cada chave.
+
+    Cada processo só agenda o que ele mesmo criou. Para vencer também os
+    prazos criados por outros workers ou antes de um restart, a cada
+    `<NOME>_SINCRONIA` segundos `carregar(ate)` devolve do banco (por
+    índice) os prazos que vencem até `ate`. Vários processos podem então
+    vencer a mesma chave: `vencer` tem de conferir o prazo no próprio UPDATE.
+    """
+
+    LOTE = 500
+
+    def __init__(self, nome: str, vencer, carregar) -> None:
+        self.nome      = nome
+        self.vencer    = vencer
+        self.carregar  = carregar
+        self.app       = None
+        self.ativo     = False
+        self.intervalo = 60.0
+        self._heap     = []
+        self._prazos   = {}
+        self._condicao = threading.Condition()
+        self._thread   = None
+        self._carga    = datetime.min
+
+    def init_app(self, app) -> None:
+        prefixo        = self.nome.upper()
+        self.app       = app
+        self.ativo     = app.config.get(f'{prefixo}_AGENDADOR', True)
+        self.intervalo = float(app.config.get(f'{prefixo}_SINCRONIA', 60))
+
+        app.extensions[f'agendador_{self.nome}'] = self
+        if self.ativo:
+            # A thread nasce na primeira requisição, já dentro do worker (depois do fork).
+            app.before_request(self.iniciar)
+
+    def iniciar(self) -> None:
+        if not self.ativo or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._condicao:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name=f'agendador-{self.nome}', daemon=True)
+                self._thread.start()
+
+    def agendar(self, chave, prazo: datetime) -> None:
+        with self._condicao:
+            if self._prazos.get(chave) == prazo:
+                return
+            self._prazos[chave] = prazo
+            heapq.heappush(self._heap, (prazo, chave))
+            if self._heap[0] == (prazo, chave):
+                self._condicao.notify()
+        self.iniciar()
+
+    def cancelar(self, chave) -> None:
+        with self._condicao:
+            self._prazos.pop(chave, None)
+
+    def _executar(self) -> None:
+        while True:
+            try:
+                vencidos, carregar = self._esperar()
+                with self.app.app_context():
+                    for inicio in range(0, len(vencidos), self.LOTE):
+                        self.vencer(vencidos[inicio:inicio + self.LOTE])
+                    if carregar:
+                        ate = datetime.utcnow() + timedelta(seconds=self.intervalo)
+                        for chave, prazo in self.carregar(ate):
+                            self.agendar(chave, prazo)
+
+            except Exception as erro:
+                # As chaves que falharam continuam vencidas no banco e voltam na próxima carga.
+                log_error(f'agendador_{self.nome}', erro)
+                with self._condicao:
+                    self._condicao.wait(1)
+
+    def _esperar(self) -> tuple[list, bool]:
+        """Bloqueia até haver prazos vencidos ou dar a hora da carga; (vencidos, se carrega)."""
+        with self._condicao:
+            while True:
+                agora = datetime.utcnow()
+                if agora >= self._carga:
+                    self._carga = agora + timedelta(seconds=self.intervalo)
+                    return self._retirar(agora), True
+                if self._heap and self._heap[0][0] <= agora:
+                    return self._retirar(agora), False
+
+                limite = min(self._heap[0][0], self._carga) if self._heap else self._carga
+                self._condicao.wait((limite - agora).total_seconds())
+
+    def _retirar(self, agora: datetime) -> list:
+        vencidos = []
+        while self._heap and self._heap[0][0] <= agora:
+            prazo, chave = heapq.heappop(self._heap)
+            if self._prazos.get(chave) == prazo:
+                del self._prazos[chave]
+                vencidos.append(chave)
+        return vencidos
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import queue
+import threading
+
+from collections   import deque
+from src.utils.log import log_error
+
+
+class Assinante:
+    """Fila de eventos de uma conexão de `GET /api/eventos`.
+
+    `entregar` roda na thread de quem publica; a conexão espera com
+    `esperar` (thread do WSGI) ou `aguardar` (event loop do ASGI, quando
+    criada com `loop`) e leva tudo o que chegou com `retirar`. Se a conexão
+    não acompanhar e a fila passar de LIMITE, os eventos pendentes são
+    descartados e `retirar` avisa: a conexão relê do banco o que perdeu.
+    """
+
+    LIMITE = 1000
+
+    def __init__(self, entidades: set = None, status: set = None, loop=None) -> None:
+        self.entidades = entidades
+        self.status    = status
+        self._fila     = deque()
+        self._perdeu   = False
+        self._trava    = threading.Lock()
+        self._loop     = loop
+        self._sinal    = threading.Event() if loop is None else asyncio.Event()
+
+    def aceita(self, evento: dict) -> bool:
+        if self.entidades and evento['entidade'] not in self.entidades:
+            return False
+        return not self.status or evento['status'] in self.status
+
+    def entregar(self, eventos: list[dict]) -> None:
+        aceitos = [evento for evento in eventos if self.aceita(evento)]
+        if not aceitos:
+            return
+
+        with self._trava:
+            if len(self._fila) + len(aceitos) > self.LIMITE:
+                self._fila.clear()
+                self._perdeu = True
+            else:
+                self._fila.extend(aceitos)
+
+        if self._loop is None:
+            self._sinal.set()
+        else:
+            self._loop.call_soon_threadsafe(self._sinal.set)
+
+    def retirar(self) -> tuple[list[dict], bool]:
+        """(eventos pendentes, se algum foi descartado desde a última retirada)."""
+        with self._trava:
+            eventos, perdeu = list(self._fila), self._perdeu
+            self._fila.clear()
+            self._perdeu = False
+            self._sinal.clear()
+        return eventos, perdeu
+
+    def esperar(self, segundos: float) -> None:
+        self._sinal.wait(segundos)
+
+    async def aguardar(self, segundos: float) -> None:
+        try:
+            await asyncio.wait_for(self._sinal.wait(), segundos)
+        except asyncio.TimeoutError:
+            pass
+
+
+class ClienteEventosLocal:
+    """Substituto local de um broker de pub/sub compartilhado (ex.: Redis).
+
+    Implementa só o subconjunto usado por CanalEventos (`publish` e
+    `pubsub().subscribe/get_message/close`), com a mesma semântica, para
+    desenvolvimento e testes sem o servidor.
+    """
+
+    def __init__(self) -> None:
+        self._inscricoes = []
+        self._trava      = threading.Lock()
+
+    def publish(self, canal: str, mensagem) -> int:
+        with self._trava:
+            inscricoes = [inscricao for inscricao in self._inscricoes if canal in inscricao.canais]
+        for inscricao in inscricoes:
+            inscricao.fila.put({'type': 'message', 'channel': canal, 'data': mensagem})
+        return len(inscricoes)
+
+    def pubsub(self) -> 'InscricaoLocal':
+        inscricao = InscricaoLocal(self)
+        with self._trava:
+            self._inscricoes.append(inscricao)
+        return inscricao
+
+    def _cancelar(self, inscricao: 'InscricaoLocal') -> None:
+        with self._trava:
+            self._inscricoes.remove(inscricao)
+
+
+class InscricaoLocal:
+    def __init__(self, cliente: ClienteEventosLocal) -> None:
+        self.cliente = cliente
+        self.canais  = set()
+        self.fila    = queue.Queue()
+
+    def subscribe(self, *canais: str) -> None:
+        self.canais.update(canais)
+
+    def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0):
+        try:
+            return self.fila.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.cliente._cancelar(self)
+
+
+class CanalEventos:
+    """Pub/sub dos eventos de alteração entre quem grava e as conexões SSE.
+
+    Com EVENTOS_BACKEND=memoria cada commit entrega seus eventos direto às
+    conexões do próprio processo; as dos outros workers e do app ASGI os
+    recebem na leitura do banco que cada conexão faz a cada `sondagem`
+    segundos. Com `compartilhado` os eventos passam por um broker estilo
+    Redis (EVENTOS_URL), e uma thread por processo repassa às conexões
+    locais o que chega de qualquer worker. Sem EVENTOS_URL o broker é o
+    ClienteEventosLocal, que só alcança o próprio processo.
+    """
+
+    NOME = 'concessionaria:eventos'
+
+    def __init__(self) -> None:
+        self.cliente     = None
+        self.sondagem    = 0.0
+        self._assinantes = set()
+        self._trava      = threading.Lock()
+        self._ouvinte    = None
+
+    def init_app(self, app) -> None:
+        # Intervalo em que cada conexão relê do banco o que o canal não entregou
+        # (com `memoria`, os eventos de outros processos); 0 desliga.
+        self.sondagem = float(app.config.get('EVENTOS_SONDAGEM', 2))
+
+        if app.config.get('EVENTOS_BACKEND', 'memoria') == 'compartilhado':
+            self.cliente = self._cliente_compartilhado(app.config.get('EVENTOS_URL'))
+        else:
+            self.cliente = None
+
+        app.extensions['canal_eventos'] = self
+
+    @staticmethod
+    def _cliente_compartilhado(url: str):
+        if not url:
+            return ClienteEventosLocal()
+
+        import redis
+        return redis.Redis.from_url(url)
+
+    def publicar(self, eventos: list[dict]) -> None:
+        """Um commit, uma mensagem: os eventos vão juntos e em ordem."""
+        if not eventos:
+            return
+
+        if self.cliente is None:
+            self._distribuir(eventos)
+            return
+
+        try:
+            self.cliente.publish(self.NOME, json.dumps(eventos, default=str))
+        except Exception as erro:
+            # O commit já aconteceu; quem perdeu a mensagem relê do banco ao reconectar.
+            log_error('publicar_eventos', erro)
+
+    def assinar(self, entidades: set = None, status: set = None, loop=None) -> Assinante:
+        assinante = Assinante(entidades, status, loop)
+        with self._trava:
+            self._assinantes.add(assinante)
+            # A thread nasce na primeira conexão, já dentro do worker (depois do fork).
+            if self.cliente is not None and (self._ouvinte is None or not self._ouvinte.is_alive()):
+                self._ouvinte = threading.Thread(target=self._ouvir, name='canal-eventos', daemon=True)
+                self._ouvinte.start()
+        return assinante
+
+    def cancelar(self, assinante: Assinante) -> None:
+        with self._trava:
+            self._assinantes.discard(assinante)
+
+    def _distribuir(self, eventos: list[dict]) -> None:
+        with self._trava:
+            assinantes = list(self._assinantes)
+        for assinante in assinantes:
+            assinante.entregar(eventos)
+
+    def _ouvir(self) -> None:
+        inscricao = self.cliente.pubsub()
+        inscricao.subscribe(self.NOME)
+        try:
+            while True:
+                mensagem = inscricao.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if mensagem and mensagem.get('type') == 'message':
+                    self._distribuir(json.loads(mensagem['data']))
+        except Exception as erro:
+            log_error('ouvir_eventos', erro)
+        finally:
+            inscricao.close()
+
+
+canal_eventos = CanalEventos()
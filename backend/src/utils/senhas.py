@@ -0,0 +1,39 @@
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from flask              import current_app
+from werkzeug.security  import generate_password_hash, check_password_hash
+
+_executor = None
+_trava    = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    """Pool dedicado ao hash das senhas novas (cadastro e troca de senha).
+
+    hashlib (scrypt/pbkdf2) libera o GIL durante o cálculo, então o hash roda
+    de fato em paralelo com a thread da requisição, que segue com o resto do
+    cadastro. SENHA_WORKERS limita quantos desses hashes rodam ao mesmo tempo
+    no processo. Criado uma vez, sob a trava: requisições simultâneas não
+    montam cada uma o seu pool.
+    """
+    global _executor
+    if _executor is None:
+        with _trava:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers        = current_app.config.get('SENHA_WORKERS', 2),
+                    thread_name_prefix = 'senhas'
+                )
+    return _executor
+
+
+def gerar_hash_senha(senha: str) -> Future:
+    """Dispara o hash em segundo plano; use `.result()` quando precisar dele."""
+    return _pool().submit(generate_password_hash, senha, method=current_app.config['SENHA_METODO'])
+
+
+def verificar_senha(hash_senha: str, senha: str) -> bool:
+    """Roda na thread da requisição, que não teria o que fazer enquanto espera:
+    os logins não fazem fila atrás do pool de SENHA_WORKERS."""
+    return check_password_hash(hash_senha, senha)
@@ -0,0 +1,174 @@
+from decimal             import Decimal
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy          import Select, Enum, Numeric, Date, DateTime, String, select, type_coerce
+from src.database        import db
+from src.utils.metrics   import contar_linhas_lidas
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Serializador:
+    """Converte as linhas de uma listagem em dicts sem instanciar o modelo.
+
+    `campos` liga cada chave da resposta a uma coluna. A consulta seleciona só
+    essas colunas e devolve tuplas (Row), sem identity map nem estado de ORM.
+    A conversão de cada linha é uma função gerada uma vez por listagem: um
+    literal de dict em que só as colunas que precisam chamam alguma coisa.
+    Numeric vira float, enums saem do nome gravado direto para o valor (sem
+    passar pela classe do enum) e datas viram texto ISO.
+
+    Os campos da listagem são também a lista do que `?fields=` pode pedir:
+    `restringir` devolve um serializador só com os campos pedidos, que
+    seleciona só essas colunas (mais a chave primária, que a paginação usa).
+    """
+
+    def __init__(self, campos: dict, chave=None) -> None:
+        selecionadas    = list(campos.values())
+        self.campos     = campos
+        self.chave      = chave if chave is not None else next(coluna for coluna in selecionadas if coluna.primary_key)
+        if self.chave not in selecionadas:
+            selecionadas.append(self.chave)
+        self._posicao   = selecionadas.index(self.chave)
+        self.colunas    = [self._coluna(coluna) for coluna in selecionadas]
+        self.converter  = self._compilar(len(selecionadas))
+        self._restritos = {}
+
+    def restringir(self, nomes) -> 'Serializador':
+        """Serializador com só os campos em `nomes`, na ordem da listagem.
+
+        Um por combinação de campos, compilado na primeira vez que é pedido.
+        """
+        if not nomes:
+            return self
+
+        invalidos = [nome for nome in nomes if nome not in self.campos]
+        if invalidos:
+            raise ValueError(f"Campo inválido: {', '.join(invalidos)}.")
+
+        pedidos = tuple(nome for nome in self.campos if nome in nomes)
+        if len(pedidos) == len(self.campos):
+            return self
+
+        restrito = self._restritos.get(pedidos)
+        if restrito is None:
+            restrito = self._restritos.setdefault(
+                pedidos, Serializador({nome: self.campos[nome] for nome in pedidos}, self.chave)
+            )
+        return restrito
+
+    def consulta(self) -> Select:
+        return select(*self.colunas)
+
+    def __call__(self, linha) -> dict:
+        return self.converter(linha)
+
+    def listar(self, linhas) -> list[dict]:
+        return list(map(self.converter, linhas))
+
+    def por_codigos(self, codigos: list) -> list[dict]:
+        """As linhas dos códigos, na ordem recebida (páginas de busca por índice)."""
+        if not codigos:
+            return []
+
+        linhas     = db.session.execute(self.consulta().where(self.chave.in_(codigos)))
+        por_codigo = {linha[self._posicao]: linha for linha in linhas}
+        contar_linhas_lidas(len(por_codigo))
+        return [self.converter(por_codigo[codigo]) for codigo in codigos if codigo in por_codigo]
+
+    def obter(self, codigo) -> dict | None:
+        linha = db.session.execute(self.consulta().where(self.chave == codigo)).first()
+        if linha is None:
+            return None
+        contar_linhas_lidas(1)
+        return self.converter(linha)
+
+    @staticmethod
+    def _coluna(coluna):
+        # O enum vem como o texto gravado; a troca pelo valor é um dict no conversor.
+        if isinstance(coluna.type, Enum):
+            return type_coerce(coluna, String).label(coluna.name)
+        return coluna
+
+    def _compilar(self, selecionadas: int):
+        ambiente = {}
+        valores  = []
+
+        for posicao, (nome, coluna) in enumerate(self.campos.items()):
+            variavel = f'c{posicao}'
+            tipo     = coluna.type
+
+            if isinstance(tipo, Enum) and tipo.enum_class:
+                ambiente[f'e{posicao}'] = {membro.name: membro.value for membro in tipo.enum_class}
+                valor = f'e{posicao}[{variavel}]'
+            elif isinstance(tipo, Numeric) and tipo.asdecimal:
+                valor = f'float({variavel})'
+            elif isinstance(tipo, (Date, DateTime)):
+                valor = f'{variavel}.isoformat()'
+            else:
+                valor = variavel
+
+            if valor != variavel and coluna.nullable:
+                valor = f'(None if {variavel} is None else {valor})'
+            valores.append(f'{nome!r}: {valor}')
+
+        # A chave primária fora dos campos pedidos é desempacotada e descartada.
+        variaveis = ', '.join(f'c{posicao}' for posicao in range(selecionadas))
+        codigo    = f"def converter(linha):\n    {variaveis}, = linha\n    return {{{', '.join(valores)}}}\n"
+
+        exec(compile(codigo, f'<serializador {self.chave.table.name}>', 'exec'), ambiente)
+        return ambiente['converter']
+
+
+def ler_campos(args, listagem: Serializador) -> tuple[str, ...] | None:
+    """Lê `fields` da query string (`?fields=id,placa,preco`).
+
+    Retorna os campos validados contra a listagem, na ordem dela, ou None
+    quando a resposta é a completa. A tupla entra na chave do cache das
+    listagens.
+    """
+    texto = args.get('fields')
+    if texto is None:
+        return None
+
+    nomes = [nome.strip() for nome in texto.split(',') if nome.strip()]
+    if not nomes:
+        raise ValueError('Parâmetro fields vazio.')
+
+    restrito = listagem.restringir(nomes)
+    return None if restrito is listagem else tuple(restrito.campos)
+
+
+class ProvedorJson(DefaultJSONProvider):
+    """Provider JSON do app: orjson quando instalado, senão o padrão do Flask.
+
+    As chaves saem na ordem dos dicts, sem ordenação, e Decimal vira número.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_padrao, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_padrao, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE),
+            mimetype=self.mimetype
+        )
+
+
+def _padrao(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return DefaultJSONProvider.default(obj)
@@ -0,0 +1,68 @@
+from typing        import Iterable
+from flask         import Request, Response, current_app, stream_with_context
+from src.utils.log import log_error
+
+TIPO_NDJSON      = 'application/x-ndjson'
+TIPO_SSE         = 'text/event-stream'
+LOTE_STREAM      = 500
+LINHAS_POR_ENVIO = 100
+
+# Proxies não seguram (nem fecham por ociosidade) um stream de eventos.
+CABECALHOS_SSE   = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def quer_stream(req: Request) -> bool:
+    """Streaming é opt-in: `?stream=1` ou `Accept: application/x-ndjson`."""
+    if req.args.get('stream', '').lower() in ('1', 'true', 'sim'):
+        return True
+    return req.accept_mimetypes.best == TIPO_NDJSON
+
+
+def resposta_ndjson(origem: str, linhas: Iterable[dict]) -> Response:
+    """Envia uma linha JSON por registro, à medida que são lidas do banco.
+
+    As linhas são agrupadas em blocos de LINHAS_POR_ENVIO para não fazer uma
+    escrita no socket por registro. Depois que o primeiro byte saiu não dá mais
+    para trocar o status da resposta, então um erro no meio do caminho é
+    registrado no log e encerra o stream com uma linha `{"error": ...}`.
+    """
+    def gerar():
+        dumps = current_app.json.dumps
+        bloco = []
+        try:
+            for linha in linhas:
+                bloco.append(dumps(linha))
+                if len(bloco) >= LINHAS_POR_ENVIO:
+                    yield '\n'.join(bloco) + '\n'
+                    bloco = []
+
+        except Exception as erro:
+            log_error(origem, erro)
+            bloco.append(dumps({'error': 'Listagem interrompida.'}))
+
+        if bloco:
+            yield '\n'.join(bloco) + '\n'
+
+    return Response(stream_with_context(gerar()), mimetype=TIPO_NDJSON)
+
+
+def mensagem_sse(dados: str = None, evento: str = None, codigo: int = None, comentario: str = None) -> str:
+    """Uma mensagem de Server-Sent Events. `dados` já vem serializado (uma linha).
+
+    Uma mensagem só com `codigo` não dispara evento no navegador, mas avança
+    o Last-Event-ID que o EventSource envia ao reconectar.
+    """
+    linhas = []
+    if comentario is not None:
+        linhas.append(f': {comentario}')
+    if codigo is not None:
+        linhas.append(f'id: {codigo}')
+    if evento is not None:
+        linhas.append(f'event: {evento}')
+    if dados is not None:
+        linhas.append(f'data: {dados}')
+    return '\n'.join(linhas) + '\n\n'
+
+
+def resposta_sse(mensagens: Iterable[str]) -> Response:
+    return Response(stream_with_context(mensagens), mimetype=TIPO_SSE, headers=CABECALHOS_SSE)
@@ -1,4 +1,28 @@
+import contextlib
+
 from unicodedata import normalize
 
+try:
+    import fcntl
+except ImportError:  # Windows: um processo só, sem disputa entre processos.
+    fcntl = None
+
 def remover_acentos(texto: str) -> str:
-    return normalize('NFKD', texto).encode('ASCII', 'ignore').decode('ASCII')
\ No newline at end of file
+    return normalize('NFKD', texto).encode('ASCII', 'ignore').decode('ASCII')
+
+def normalizar_busca(texto: str) -> str:
+    return remover_acentos(texto or '').lower()
+
+@contextlib.contextmanager
+def trava_arquivo(caminho: str):
+    """Trava exclusiva entre processos sobre o arquivo `caminho` (criado se faltar)."""
+    if fcntl is None:
+        yield
+        return
+
+    with open(caminho, 'a') as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
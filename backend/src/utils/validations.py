@@ -1,5 +1,254 @@
+from decimal              import Decimal
+from functools            import cache
+from typing               import Iterable, Hashable
+from sqlalchemy           import Enum, Numeric, Integer, Date, String
+from src.utils.utils      import normalizar_busca
+from src.utils.importacao import para_decimal, para_inteiro, para_data
+
+AUSENTE     = object()
+OBRIGATORIO = 'Campo obrigatório.'
+
+
+@cache
+def _tabela_enum(enum_class) -> dict:
+    """Nome, valor e as formas sem acento e em minúsculas de cada membro."""
+    tabela = {}
+    for membro in enum_class:
+        tabela[membro] = membro
+        for texto in (membro.value, membro.name):
+            tabela[texto]                   = membro
+            tabela[normalizar_busca(texto)] = membro
+    return tabela
+
+
 def validar_enum(enum_class, valor):
-    try:
-        return enum_class(valor)
-    except ValueError:
-        return None
\ No newline at end of file
+    """Membro do enum pelo valor ou nome, sem diferenciar acentos nem maiúsculas; None se não houver."""
+    return _buscar_enum(_tabela_enum(enum_class), valor)
+
+
+def _buscar_enum(tabela: dict, valor):
+    if isinstance(valor, str):
+        membro = tabela.get(valor)
+        return membro if membro is not None else tabela.get(normalizar_busca(valor))
+    return tabela.get(valor) if isinstance(valor, Hashable) else None
+
+
+class Campo:
+    """Um campo de um Esquema, ligado à coluna onde o valor é gravado.
+
+    O tipo e o tamanho máximo vêm da coluna. Um campo ausente no cadastro
+    recebe `padrao` (ou fica com o default do banco); `null` ou vazio só é
+    aceito em colunas que aceitam nulo, ou quando há `padrao`. `minimo` vale
+    para números, `ajuste` é aplicado ao valor já convertido e `aparar=False`
+    mantém os espaços das pontas de um texto (senhas).
+    """
+
+    def __init__(
+        self,
+        coluna,
+        obrigatorio : bool = False,
+        padrao             = AUSENTE,
+        minimo             = None,
+        ajuste             = None,
+        aparar      : bool = True
+    ) -> None:
+        self.coluna      = coluna
+        self.obrigatorio = obrigatorio
+        self.padrao      = padrao
+        self.minimo      = minimo
+        self.ajuste      = ajuste
+        self.aparar      = aparar
+
+    @property
+    def aceita_vazio(self) -> bool:
+        return not self.obrigatorio and (self.coluna.nullable or self.padrao is not AUSENTE)
+
+    def conversor(self):
+        """Função que recebe o valor enviado e devolve o valor da coluna ou levanta ValueError."""
+        tipo = self.coluna.type
+
+        if isinstance(tipo, Enum) and tipo.enum_class:
+            converter = _conversor_enum(tipo.enum_class)
+        elif isinstance(tipo, Numeric):
+            converter = _conversor_decimal(tipo.precision, tipo.scale)
+        elif isinstance(tipo, Integer):
+            converter = para_inteiro
+        elif isinstance(tipo, Date):
+            converter = para_data
+        elif isinstance(tipo, String):
+            converter = _conversor_texto(tipo.length, self.aparar)
+        else:
+            raise TypeError(f'Tipo sem conversor: {tipo!r}.')
+
+        if self.minimo is not None:
+            converter = _com_minimo(converter, self.minimo)
+        if self.ajuste is not None:
+            converter = _com_ajuste(converter, self.ajuste)
+        return converter
+
+
+class Esquema:
+    """Validação e conversão dos dados de cadastro e alteração de uma entidade.
+
+    `campos` liga cada chave do corpo a um Campo. Como no Serializador, o
+    esquema vira funções geradas uma vez (na importação do service): cada
+    campo é um trecho de código com o seu conversor, sem laço sobre a
+    declaração nem testes de tipo em tempo de requisição. O resultado é um
+    dict pronto para o INSERT/UPDATE, com as chaves nos nomes das colunas, e
+    os erros por campo. Cadastro, alteração (`parcial`, só o que veio) e
+    importação em lote (`validar_lote`, o bloco inteiro numa chamada) usam
+    as mesmas funções.
+    """
+
+    def __init__(self, campos: dict[str, Campo]) -> None:
+        self.campos     = campos
+        self._nomes     = {campo.coluna.key: nome for nome, campo in campos.items()}
+        self._ambiente  = {
+            'AUSENTE'     : AUSENTE,
+            'OBRIGATORIO' : OBRIGATORIO,
+            'resumir'     : resumir_erros,
+            **{f'c{posicao}': campo.conversor() for posicao, campo in enumerate(campos.values())},
+            **{f'p{posicao}': campo.padrao      for posicao, campo in enumerate(campos.values())},
+        }
+        self._completo  = self._compilar('validar',      self._corpo(parcial=False, recuo=1))
+        self._parcial   = self._compilar('validar',      self._corpo(parcial=True,  recuo=1))
+        self._lote      = self._compilar('validar_lote', self._corpo(parcial=False, recuo=2))
+
+    def validar(self, dados, parcial: bool = False) -> tuple[dict, dict]:
+        """(valores por coluna, erros por campo); um corpo que não é objeto conta como vazio."""
+        if not isinstance(dados, dict):
+            dados = {}
+        return (self._parcial if parcial else self._completo)(dados)
+
+    def validar_lote(self, linhas: Iterable[tuple[int, dict]]) -> tuple[list, list]:
+        """(válidos como (linha, valores), erros como {'linha', 'error', 'campos'})."""
+        return self._lote(linhas)
+
+    def argumentos(self, valores: dict) -> dict:
+        """Os valores com os nomes do corpo, para o construtor do modelo."""
+        return {self._nomes[coluna]: valor for coluna, valor in valores.items()}
+
+    def _corpo(self, parcial: bool, recuo: int) -> list[str]:
+        linhas = []
+        for posicao, (nome, campo) in enumerate(self.campos.items()):
+            coluna = campo.coluna.key
+
+            if parcial:
+                ausente = 'pass'
+            elif campo.obrigatorio:
+                ausente = f'erros[{nome!r}] = OBRIGATORIO'
+            elif campo.padrao is not AUSENTE:
+                ausente = f'valores[{coluna!r}] = p{posicao}'
+            else:
+                ausente = 'pass'
+
+            if not campo.aceita_vazio:
+                vazio = f'erros[{nome!r}] = OBRIGATORIO'
+            elif campo.padrao is not AUSENTE:
+                vazio = f'valores[{coluna!r}] = p{posicao}'
+            else:
+                vazio = f'valores[{coluna!r}] = None'
+
+            linhas += [
+                f'v = dados.get({nome!r}, AUSENTE)',
+                'if v is AUSENTE:',
+                f'    {ausente}',
+                "elif v is None or v == '':",
+                f'    {vazio}',
+                'else:',
+                '    try:',
+                f'        valores[{coluna!r}] = c{posicao}(v)',
+                '    except ValueError as erro:',
+                f'        erros[{nome!r}] = str(erro)',
+            ]
+        return ['    ' * recuo + linha for linha in linhas]
+
+    def _compilar(self, funcao: str, corpo: list[str]):
+        if funcao == 'validar':
+            codigo = [
+                'def validar(dados):',
+                '    valores = {}',
+                '    erros   = {}',
+                *corpo,
+                '    return valores, erros',
+            ]
+        else:
+            codigo = [
+                'def validar_lote(linhas):',
+                '    validos = []',
+                '    falhas  = []',
+                '    for numero, dados in linhas:',
+                '        if not isinstance(dados, dict):',
+                "            falhas.append({'linha': numero, 'error': 'Linha inválida.'})",
+                '            continue',
+                '        valores = {}',
+                '        erros   = {}',
+                *corpo,
+                '        if erros:',
+                "            falhas.append({'linha': numero, 'error': resumir(erros), 'campos': erros})",
+                '        else:',
+                '            validos.append((numero, valores))',
+                '    return validos, falhas',
+            ]
+
+        tabela = next(iter(self.campos.values())).coluna.table.name
+        exec(compile('\n'.join(codigo) + '\n', f'<esquema {tabela}>', 'exec'), self._ambiente)
+        return self._ambiente.pop(funcao)
+
+
+def resumir_erros(erros: dict) -> str:
+    return ' '.join(f'{campo}: {mensagem}' for campo, mensagem in erros.items())
+
+
+def corpo_erros(erros: dict) -> dict:
+    """Corpo da resposta 400 de uma validação: a mensagem e os erros por campo."""
+    return {'error': resumir_erros(erros), 'campos': erros}
+
+
+def _conversor_enum(enum_class):
+    tabela = _tabela_enum(enum_class)
+    opcoes = ', '.join(membro.value for membro in enum_class)
+
+    def converter(valor):
+        membro = _buscar_enum(tabela, valor)
+        if membro is None:
+            raise ValueError(f'Valor inválido: {valor}. Use: {opcoes}.')
+        return membro
+    return converter
+
+
+def _conversor_decimal(precisao: int | None, escala: int | None):
+    limite = Decimal(10) ** ((precisao or 0) - (escala or 0)) if precisao else None
+
+    def converter(valor) -> Decimal:
+        decimal = para_decimal(valor)
+        if limite is not None and abs(decimal) >= limite:
+            raise ValueError(f'Valor fora do limite: {valor}.')
+        return decimal
+    return converter
+
+
+def _conversor_texto(tamanho: int | None, aparar: bool):
+    def converter(valor) -> str:
+        if isinstance(valor, bool) or not isinstance(valor, (str, int, float, Decimal)):
+            raise ValueError('Texto inválido.')
+        texto = str(valor).strip() if aparar else str(valor)
+        if tamanho and len(texto) > tamanho:
+            raise ValueError(f'Máximo de {tamanho} caracteres.')
+        return texto
+    return converter
+
+
+def _com_minimo(converter, minimo):
+    def converter_com_minimo(valor):
+        convertido = converter(valor)
+        if convertido < minimo:
+            raise ValueError(f'Valor mínimo: {minimo}.')
+        return convertido
+    return converter_com_minimo
+
+
+def _com_ajuste(converter, ajuste):
+    def converter_com_ajuste(valor):
+        return ajuste(converter(valor))
+    return converter_com_ajuste
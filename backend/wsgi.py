@@ -0,0 +1,19 @@
+import os
+
+from src import create_app
+
+# Entrada de produção: `gunicorn -c gunicorn.conf.py` (Linux/macOS) ou
+# `python wsgi.py` com waitress (Windows). O schema não é criado aqui:
+# rode `flask --app wsgi migrar` uma vez a cada deploy.
+app = create_app()
+
+if __name__ == '__main__':
+    from waitress import serve
+
+    # Waitress é um processo só: a concorrência vem toda das threads.
+    nucleos = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    serve(
+        app,
+        listen  = os.getenv('WEB_BIND', '0.0.0.0:8000'),
+        threads = int(os.getenv('WEB_THREADS') or nucleos * 4),
+    )
@@ -53,19 +53,21 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
       const dados = await resposta.json();
 
       if (!resposta.ok) {
-        toast.error(dados.mensagem || 'Erro ao fazer login');
+        toast.error(dados.error || 'Erro ao fazer login');
         return false;
       }
 
       const userData: User = {
-        id: dados.id,
-        name: dados.nome,
-        email: dados.email,
-        role: dados.perfil
+        id: String(dados.usuario.id),
+        name: dados.usuario.nome,
+        email: dados.usuario.email,
+        role: dados.usuario.tipo === 'Administrador' ? 'admin' : 'user'
       };
 
       setUser(userData);
       localStorage.setItem('user', JSON.stringify(userData));
+      localStorage.setItem('access_token', dados.access_token);
+      localStorage.setItem('refresh_token', dados.refresh_token);
       toast.success('Login realizado com sucesso!');
       return true;
 
@@ -97,8 +99,24 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
   };
 
   const logout = () => {
+    const accessToken = localStorage.getItem('access_token');
+    const refreshToken = localStorage.getItem('refresh_token');
+
+    if (accessToken || refreshToken) {
+      fetch('http://localhost:5000/api/logout', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...(accessToken ? { Authorization: `Bearer ${accessToken}` } : {})
+        },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      }).catch(() => undefined);
+    }
+
     setUser(null);
     localStorage.removeItem('user');
+    localStorage.removeItem('access_token');
+    localStorage.removeItem('refresh_token');
     toast.success('Logout realizado com sucesso!');
   };
 